@@ -35,12 +35,15 @@ class GeneradorInformeAuditoria:
         if "is_anomaly" in self.df_deudas.columns:
             anomalias = (self.df_deudas["is_anomaly"] == -1).sum()
 
-        porcentaje_deteccion = 87  # Valor por defecto
+        # Recall medido sobre anomalías inyectadas
+        from evaluacion_detectores import porcentaje_deteccion_medido
+
+        porcentaje_deteccion = porcentaje_deteccion_medido("deudas")
 
         # Distribución por tipo de deuda
         tipos_deuda = []
         if "tipo_deuda" in self.df_deudas.columns:
-            agrupado = self.df_deudas.groupby("tipo_deuda")[
+            agrupado = self.df_deudas.groupby("tipo_deuda", observed=True)[
                 "saldo_pendiente_simulado"
             ].sum()
             total_saldo = agrupado.sum()
@@ -57,7 +60,7 @@ class GeneradorInformeAuditoria:
         # Distribución por estado
         estados = []
         if "estado_deuda" in self.df_deudas.columns:
-            conteo = self.df_deudas["estado_deuda"].value_counts()
+            conteo = self.df_deudas["estado_deuda"].value_counts().loc[lambda c: c > 0]
             for estado, cantidad in conteo.items():
                 porcentaje = (cantidad / total * 100) if total > 0 else 0
                 estados.append(
@@ -92,12 +95,14 @@ class GeneradorInformeAuditoria:
         if "es_anomalia" in self.df_previsiones.columns:
             anomalias = (self.df_previsiones["es_anomalia"] == -1).sum()
 
-        porcentaje_deteccion = 85  # Valor por defecto
+        from evaluacion_detectores import porcentaje_deteccion_medido
+
+        porcentaje_deteccion = porcentaje_deteccion_medido("previsiones")
 
         # Distribución por tipo de previsión
         tipos_provision = []
         if "tipo_prevision" in self.df_previsiones.columns:
-            agrupado = self.df_previsiones.groupby("tipo_prevision")[
+            agrupado = self.df_previsiones.groupby("tipo_prevision", observed=True)[
                 "monto_estimado_ars"
             ].sum()
             total_monto = agrupado.sum()
@@ -114,7 +119,9 @@ class GeneradorInformeAuditoria:
         # Distribución por estado
         estados = []
         if "estado_actual" in self.df_previsiones.columns:
-            conteo = self.df_previsiones["estado_actual"].value_counts()
+            conteo = self.df_previsiones["estado_actual"].value_counts().loc[
+                lambda c: c > 0
+            ]
             for estado, cantidad in conteo.items():
                 porcentaje = (cantidad / total * 100) if total > 0 else 0
                 estados.append(
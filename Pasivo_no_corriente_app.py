@@ -4,34 +4,166 @@
 import pandas as pd
 import numpy as np
 import random
-from faker import Faker
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.ensemble import IsolationForest
 import streamlit as st
 import os
-import PyPDF2
+from importacion_diferida import ModuloDiferido
+from amortizacion import saldos_a_fecha
+from generacion_datos import (
+    FECHA_REFERENCIA_PREVISIONES,
+    PROBABILIDAD_INCUMPLIMIENTO_ACTIVA,
+    generar_deudas_vectorizado,
+    generar_paralelo,
+    generar_previsiones_vectorizado,
+)
+from padron_empresas import cargar_padron_empresas, unir_empresas
+from ingesta_datos import cargar_archivo
+from cache_datasets import CacheDatasets, clave_dataset, huella_archivo
+from registro_modelos import RegistroModelos
+from explicacion_anomalias import ETIQUETAS_FEATURES
+from generar_informes_pdf import DIRECTORIO_INFORMES, generar_informe_desde_analisis
+from clasificacion_corriente import clasificar_a_fechas, fechas_cierre_mensuales
+from escenarios_estres import (
+    CAMINOS,
+    DESVIO_SHOCK_TASA,
+    Escenario,
+    simular_estres,
+)
+from motor_analisis import (
+    FEATURES_DEUDAS,
+    FEATURES_PREVISIONES,
+    SEGMENTOS_DEUDAS,
+    SEGMENTOS_PREVISIONES,
+    calcular_analisis_deudas,
+    calcular_analisis_previsiones,
+    calcular_resumen_consolidado,
+    vigentes_por_ejercicio,
+)
+
+# Dependencias pesadas: se importan recién cuando se dibuja un gráfico o se
+# lee un informe, no en el arranque
+plt = ModuloDiferido("matplotlib.pyplot")
+sns = ModuloDiferido("seaborn")
+PyPDF2 = ModuloDiferido("PyPDF2")
 
 # =================================================================
 # CONFIGURACIÓN GENERAL
 # =================================================================
 st.set_page_config(layout="wide", page_title="Análisis de Pasivo No Corriente")
 
+# Puntos dibujados como máximo en los gráficos de dispersión
+MAX_PUNTOS_DISPERSION = 20_000
+
+# Fecha "hoy" de las deudas simuladas y fecha de cierre inicial: fija, para
+# que los datos y el análisis no cambien de un día para otro
+FECHA_REFERENCIA_DEUDAS = FECHA_REFERENCIA_PREVISIONES.date()
+
+# Celdas caminos x deudas a partir de las cuales la simulación de estrés
+# usa el pool de procesos (por debajo, arrancar procesos cuesta más)
+CELDAS_POOL_ESTRES = 50_000_000
+
+# Aporte de cada feature al desvío de las anomalías, como barra de progreso
+COLUMNAS_APORTE_DEUDAS = [f"aporte_{f}" for f in FEATURES_DEUDAS]
+COLUMNAS_APORTE_PREVISIONES = [f"aporte_{f}" for f in FEATURES_PREVISIONES]
+CONFIG_COLUMNAS_APORTE = {
+    f"aporte_{f}": st.column_config.ProgressColumn(
+        f"Aporte {etiqueta}", format="percent", min_value=0.0, max_value=1.0
+    )
+    for f, etiqueta in ETIQUETAS_FEATURES.items()
+}
+
 # =================================================================
 # FUNCIONES DE GENERACIÓN DE DATOS
 # =================================================================
 
 
+@st.cache_resource
+def obtener_cache_datasets():
+    """Caché en disco de datasets, compartida por todas las sesiones"""
+    return CacheDatasets()
+
+
 @st.cache_data
-def generate_debt_dataframe():
-    """Genera datos simulados de Deudas No Corrientes"""
-    np.random.seed(1011)
-    random.seed(1011)
-    fake = Faker("es_AR")
-    Faker.seed(1011)
-
-    num_deudas = 30
+def generate_debt_dataframe(
+    num_deudas=30,
+    modo="clasico",
+    semilla=1011,
+    max_workers=None,
+    num_empresas=25,
+    fecha_referencia=FECHA_REFERENCIA_DEUDAS,
+):
+    """
+    Genera datos simulados de Deudas No Corrientes
+
+    El resultado se guarda además en la caché persistente en disco, por lo
+    que otros procesos y réplicas lo reutilizan sin regenerarlo. La cantidad
+    de workers no forma parte de la clave: no altera el resultado.
+    """
+    clave = clave_dataset(
+        entidad="deudas",
+        filas=num_deudas,
+        modo=modo,
+        semilla=semilla,
+        num_empresas=num_empresas,
+        fecha_referencia=fecha_referencia,
+    )
+    return obtener_cache_datasets().obtener_o_generar(
+        clave,
+        lambda: _generar_deudas(
+            num_deudas, modo, semilla, max_workers, num_empresas, fecha_referencia
+        ),
+    )
+
+
+def _generar_deudas(
+    num_deudas,
+    modo,
+    semilla,
+    max_workers,
+    num_empresas,
+    fecha_referencia=FECHA_REFERENCIA_DEUDAS,
+):
+    """
+    Genera datos simulados de Deudas No Corrientes (sin caché)
+
+    Args:
+        num_deudas: Cantidad de deudas a generar
+        modo: "clasico" (fila por fila), "vectorizado" (NumPy columnar,
+            recomendado para carteras de millones de instrumentos) o
+            "paralelo" (bloques vectorizados en un pool de procesos)
+        semilla: Semilla de la simulación
+        max_workers: Procesos del modo paralelo (None = todos los núcleos)
+        num_empresas: Tamaño del padrón de empresas deudoras
+        fecha_referencia: Fecha "hoy" de la simulación (estados y saldos)
+
+    En todos los modos las deudas referencian el padrón por `empresa_id` y
+    nombre y CUIT se agregan con `unir_empresas` (categóricas).
+    """
+    if modo == "vectorizado":
+        df = generar_deudas_vectorizado(
+            num_deudas=num_deudas,
+            semilla=semilla,
+            fecha_referencia=fecha_referencia,
+            num_empresas=num_empresas,
+        )
+        return unir_empresas(df, cargar_padron_empresas(num_empresas))
+    if modo == "paralelo":
+        df = generar_paralelo(
+            "deudas",
+            num_deudas,
+            semilla_maestra=semilla,
+            fecha_referencia=fecha_referencia,
+            max_workers=max_workers,
+            num_empresas=num_empresas,
+        )
+        return unir_empresas(df, cargar_padron_empresas(num_empresas))
+    if modo != "clasico":
+        raise ValueError(f"Modo de generación desconocido: {modo}")
+
+    random.seed(semilla)
+    padron = cargar_padron_empresas(num_empresas)
+    ids_empresas = padron["empresa_id"].tolist()
+
     tipos_deuda_no_corriente = [
         "Préstamo Bancario a Largo Plazo",
         "Bonos Emitidos",
@@ -42,21 +174,12 @@ def generate_debt_dataframe():
     ]
     plazos_anios = [3, 5, 7, 10, 15, 20]
 
-    num_empresas_deudoras = 25
-    empresas_deudoras = [
-        {
-            "empresa_id": 5000 + i,
-            "nombre_empresa": fake.company(),
-            "cuit": fake.unique.bothify(text="30-########-#"),
-        }
-        for i in range(num_empresas_deudoras)
-    ]
-
+    hoy = pd.Timestamp(fecha_referencia).date()
     deudas_no_corrientes = []
     for i in range(num_deudas):
-        deudora = random.choice(empresas_deudoras)
+        empresa_id = random.choice(ids_empresas)
         tipo = random.choice(tipos_deuda_no_corriente)
-        fecha_emision = fake.date_between(start_date="-10y", end_date="-90d")
+        fecha_emision = hoy - timedelta(days=random.randint(90, 3652))
         plazo_anios_elegido = random.choice(plazos_anios)
         fecha_vencimiento = fecha_emision + timedelta(days=plazo_anios_elegido * 365.25)
         monto_original = round(random.uniform(500000, 10000000), 2)
@@ -68,10 +191,7 @@ def generate_debt_dataframe():
         else:
             tasa_interes_anual = round(random.uniform(0.03, 0.10), 4)
 
-        today = datetime.now().date()
-        days_passed = (today - fecha_emision).days
-
-        if fecha_vencimiento < today:
+        if fecha_vencimiento < hoy:
             estado = random.choices(
                 ["Pagada", "Incumplida", "Refinanciada"], weights=[0.6, 0.2, 0.2]
             )[0]
@@ -82,27 +202,15 @@ def generate_debt_dataframe():
             )
         else:
             estado = "Activa"
-            total_days = (fecha_vencimiento - fecha_emision).days
-            saldo_pendiente_simulado = (
-                round(monto_original * (1 - (days_passed / total_days)), 2)
-                if total_days > 0
-                else monto_original
-            )
-            if saldo_pendiente_simulado < 0:
-                saldo_pendiente_simulado = 0.0
+            # Saldo según el cronograma de amortización (se calcula abajo)
+            saldo_pendiente_simulado = np.nan
             if random.random() < 0.02:
                 estado = "Incumplida"
 
-        intereses_acumulados_simulados = round(
-            monto_original * tasa_interes_anual * (days_passed / 365.25), 2
-        )
-        if intereses_acumulados_simulados < 0:
-            intereses_acumulados_simulados = 0.0
-
         deudas_no_corrientes.append(
             {
                 "deuda_id": f"DNC-{50000 + i}",
-                "empresa_id": deudora["empresa_id"],
+                "empresa_id": empresa_id,
                 "tipo_deuda": tipo,
                 "fecha_emision": fecha_emision,
                 "fecha_vencimiento": fecha_vencimiento,
@@ -110,28 +218,86 @@ def generate_debt_dataframe():
                 "monto_original": monto_original,
                 "tasa_interes_anual": tasa_interes_anual,
                 "saldo_pendiente_simulado": saldo_pendiente_simulado,
-                "intereses_acumulados_simulados": intereses_acumulados_simulados,
+                "intereses_acumulados_simulados": 0.0,
                 "estado_deuda": estado,
-                "nombre_empresa_deudora": deudora["nombre_empresa"],
-                "cuit_empresa_deudora": deudora["cuit"],
             }
         )
 
     df = pd.DataFrame(deudas_no_corrientes)
+
+    # Saldo de las vigentes e intereses devengados según el cronograma de
+    # cada deuda (sistema, frecuencia de pagos y convención de días de su tipo)
+    saldos = saldos_a_fecha(df, hoy)
+    vigente = df["saldo_pendiente_simulado"].isna()
+    df.loc[vigente, "saldo_pendiente_simulado"] = saldos["saldo_capital"]
+    df["intereses_acumulados_simulados"] = saldos["intereses_devengados"]
+
     df.sort_values(by="fecha_emision", inplace=True)
-    return df
+    return unir_empresas(df, padron)
 
 
 @st.cache_data
-def generar_dataframe_previsiones():
-    """Genera datos simulados de Previsiones"""
-    np.random.seed(42)
-    random.seed(42)
-    fake = Faker("es_AR")
-    Faker.seed(42)
+def generar_dataframe_previsiones(
+    num_previsiones=30,
+    fecha_referencia=FECHA_REFERENCIA_PREVISIONES,
+    modo="clasico",
+    semilla=42,
+    max_workers=None,
+):
+    """
+    Genera datos simulados de Previsiones
+
+    Igual que `generate_debt_dataframe`, pasa por la caché persistente en disco.
+    """
+    clave = clave_dataset(
+        entidad="previsiones",
+        filas=num_previsiones,
+        modo=modo,
+        semilla=semilla,
+        fecha_referencia=pd.Timestamp(fecha_referencia).date(),
+    )
+    return obtener_cache_datasets().obtener_o_generar(
+        clave,
+        lambda: _generar_previsiones(
+            num_previsiones, fecha_referencia, modo, semilla, max_workers
+        ),
+    )
+
 
-    num_previsiones = 30
-    fecha_actual_referencia = datetime(2025, 7, 10)
+def _generar_previsiones(num_previsiones, fecha_referencia, modo, semilla, max_workers):
+    """
+    Genera datos simulados de Previsiones (sin caché)
+
+    Args:
+        num_previsiones: Cantidad de previsiones a generar
+        fecha_referencia: Fecha de corte de la simulación
+        modo: "clasico" (fila por fila), "vectorizado" (NumPy columnar) o
+            "paralelo" (bloques vectorizados en un pool de procesos)
+        semilla: Semilla de la simulación
+        max_workers: Procesos del modo paralelo (None = todos los núcleos)
+    """
+    if modo == "vectorizado":
+        return generar_previsiones_vectorizado(
+            num_previsiones=num_previsiones,
+            fecha_referencia=fecha_referencia,
+            semilla=semilla,
+        )
+    if modo == "paralelo":
+        return generar_paralelo(
+            "previsiones",
+            num_previsiones,
+            semilla_maestra=semilla,
+            fecha_referencia=fecha_referencia,
+            max_workers=max_workers,
+        )
+    if modo != "clasico":
+        raise ValueError(f"Modo de generación desconocido: {modo}")
+
+    random.seed(semilla)
+
+    fecha_actual_referencia = datetime.combine(
+        pd.Timestamp(fecha_referencia).date(), datetime.min.time()
+    )
 
     tipos_prevision = [
         "Garantías",
@@ -196,62 +362,275 @@ def generar_dataframe_previsiones():
     return df_previsiones
 
 
+@st.cache_data
+def cargar_extracto_erp(
+    ruta, entidad, fecha_modificacion, separador=",", formato_fecha="%Y-%m-%d"
+):
+    """
+    Carga un extracto del ERP (CSV, Parquet o Excel) con tipos declarados
+
+    `fecha_modificacion` forma parte de la clave de caché para que un
+    archivo actualizado se vuelva a leer. En disco, la clave usa la huella
+    del contenido del archivo.
+
+    Returns:
+        tuple: (datos válidos, rechazos, filas leídas)
+    """
+    cache = obtener_cache_datasets()
+    clave = clave_dataset(
+        entidad=entidad,
+        origen=huella_archivo(ruta),
+        separador=separador,
+        formato_fecha=formato_fecha,
+    )
+    datos = cache.obtener(clave)
+    rechazos = cache.obtener(f"{clave}-rechazos")
+    if datos is None or rechazos is None:
+        resultado = cargar_archivo(
+            ruta, entidad, separador=separador, formato_fecha=formato_fecha
+        )
+        datos, rechazos = resultado.datos, resultado.rechazos
+        cache.guardar(clave, datos)
+        cache.guardar(f"{clave}-rechazos", rechazos)
+    filas_leidas = len(datos) + (rechazos["fila"].nunique() if len(rechazos) else 0)
+    return datos, rechazos, filas_leidas
+
+
+def seleccionar_origen_datos():
+    """Muestra en la barra lateral la elección de origen de datos y los carga"""
+    st.sidebar.header("📂 Origen de Datos")
+    origen = st.sidebar.radio(
+        "Fuente de los datos:", ["Datos simulados", "Extractos del ERP"]
+    )
+
+    if origen == "Datos simulados":
+        with st.spinner("Generando datos..."):
+            return generate_debt_dataframe(), generar_dataframe_previsiones()
+
+    separador = st.sidebar.text_input("Separador de campos (CSV)", ",")
+    formato_fecha = st.sidebar.text_input("Formato de fecha", "%Y-%m-%d")
+    rutas = {
+        "deudas": st.sidebar.text_input("Archivo de deudas (CSV/Parquet/Excel)"),
+        "previsiones": st.sidebar.text_input(
+            "Archivo de previsiones (CSV/Parquet/Excel)"
+        ),
+    }
+
+    datos = {}
+    for entidad, ruta in rutas.items():
+        if not ruta or not os.path.exists(ruta):
+            st.sidebar.warning(f"⚠️ Indique un archivo existente de {entidad}.")
+            st.stop()
+        with st.spinner(f"Cargando {entidad}..."):
+            df, rechazos, filas_leidas = cargar_extracto_erp(
+                ruta, entidad, os.path.getmtime(ruta), separador, formato_fecha
+            )
+        datos[entidad] = df
+        st.sidebar.success(f"✅ {entidad.title()}: {len(df):,} de {filas_leidas:,} filas")
+        if not rechazos.empty:
+            with st.sidebar.expander(f"❌ Rechazos en {entidad} ({len(rechazos):,})"):
+                st.dataframe(rechazos.head(1000))
+
+    return datos["deudas"], datos["previsiones"]
+
+
 # =================================================================
 # FUNCIONES DE ANÁLISIS Y VISUALIZACIÓN
 # =================================================================
+# Los cálculos viven en motor_analisis.py; estas funciones solo muestran
+# los resultados.
 
 
-def analizar_deudas_no_corrientes(df):
-    """Análisis completo de Deudas No Corrientes"""
-    st.subheader("📊 Análisis de Deudas No Corrientes")
+@st.cache_resource
+def obtener_registro_modelos():
+    """Registro de modelos ajustados, compartido por todas las sesiones"""
+    return RegistroModelos()
 
-    # Data Preprocessing
-    df["fecha_emision"] = pd.to_datetime(df["fecha_emision"])
-    df["fecha_vencimiento"] = pd.to_datetime(df["fecha_vencimiento"])
-    numeric_cols = [
-        "plazo_anios",
-        "monto_original",
-        "tasa_interes_anual",
-        "saldo_pendiente_simulado",
-        "intereses_acumulados_simulados",
-    ]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df.fillna(0, inplace=True)
+
+@st.cache_data
+def analisis_deudas_cacheado(
+    df, por_segmento=False, fecha_cierre=FECHA_REFERENCIA_DEUDAS
+):
+    """Resultado del análisis de deudas, cacheado por contenido del DataFrame"""
+    return calcular_analisis_deudas(
+        df,
+        registro=obtener_registro_modelos(),
+        segmentar_por=SEGMENTOS_DEUDAS if por_segmento else None,
+        fecha_corte=fecha_cierre,
+    )
+
+
+@st.cache_data
+def clasificacion_mensual_cacheada(df, fecha_cierre=FECHA_REFERENCIA_DEUDAS):
+    """Corriente / no corriente a los 60 cierres mensuales hasta la fecha"""
+    return clasificar_a_fechas(df, fechas_cierre_mensuales(fecha_cierre))
+
+
+@st.cache_data
+def analisis_previsiones_cacheado(
+    df, fecha_referencia=FECHA_REFERENCIA_PREVISIONES, por_segmento=False
+):
+    """Resultado del análisis de previsiones, cacheado por contenido"""
+    return calcular_analisis_previsiones(
+        df,
+        fecha_referencia,
+        registro=obtener_registro_modelos(),
+        segmentar_por=SEGMENTOS_PREVISIONES if por_segmento else None,
+    )
+
+
+@st.cache_data
+def estres_cacheado(
+    df, fecha_cierre, caminos, media_shock_pb, desvio_shock_pb, multiplicador_pd
+):
+    """Simulación de estrés, cacheada por contenido y parámetros"""
+    escenario = Escenario(
+        media_shock_tasa=media_shock_pb / 10_000,
+        desvio_shock_tasa=desvio_shock_pb / 10_000,
+        probabilidad_incumplimiento=PROBABILIDAD_INCUMPLIMIENTO_ACTIVA
+        * multiplicador_pd,
+    )
+    return simular_estres(
+        df,
+        fecha_cierre,
+        escenario,
+        caminos=caminos,
+        max_workers=None if len(df) * caminos > CELDAS_POOL_ESTRES else 1,
+    )
+
+
+def muestra_para_grafico(df, max_puntos=MAX_PUNTOS_DISPERSION):
+    """Submuestra fija para gráficos de dispersión de carteras grandes"""
+    if len(df) <= max_puntos:
+        return df
+    return df.sample(n=max_puntos, random_state=0)
+
+
+def mostrar_hallazgos_reglas(hallazgos):
+    """Muestra los controles determinísticos (ResultadoReglas)"""
+    st.subheader("📋 Controles de Auditoría Basados en Reglas")
+    con_hallazgos = hallazgos.con_hallazgos()
+    st.write(
+        f"Reglas incumplidas: **{len(con_hallazgos)}** de "
+        f"{int(hallazgos.resumen['evaluada'].sum())} evaluadas "
+        f"({len(hallazgos.filas_con_hallazgos):,} registros con al menos un hallazgo)"
+    )
+    if not con_hallazgos.empty:
+        st.dataframe(
+            con_hallazgos[
+                [
+                    "codigo",
+                    "descripcion",
+                    "severidad",
+                    "cantidad",
+                    "porcentaje",
+                    "ids_ejemplo",
+                ]
+            ],
+            column_config={
+                "porcentaje": st.column_config.NumberColumn(
+                    "% registros", format="%.2f"
+                )
+            },
+            hide_index=True,
+        )
+
+
+def mostrar_clasificacion_corriente(resultado, evolucion):
+    """
+    Muestra las porciones corriente y no corriente al cierre y su evolución
+    en los cierres mensuales (DataFrame de `clasificar_a_fechas`)
+    """
+    st.subheader(f"📅 Corriente / No Corriente al {resultado.fecha_cierre:%d/%m/%Y}")
+    col1, col2 = st.columns(2)
+    col1.metric(
+        "Porción corriente (vence en 12 meses)",
+        f"${resultado.saldo_corriente:,.2f}",
+    )
+    col2.metric("Porción no corriente", f"${resultado.saldo_no_corriente:,.2f}")
+
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.stackplot(
+        evolucion["fecha_cierre"],
+        evolucion["corriente"],
+        evolucion["no_corriente"],
+        labels=["Corriente", "No corriente"],
+        colors=["#ff7f0e", "#1f77b4"],
+    )
+    ax.set_title("Saldo de Capital por Cierre Mensual", fontsize=16)
+    ax.set_ylabel("Saldo (ARS)", fontsize=12)
+    ax.legend(loc="upper left")
+    st.pyplot(fig)
+    plt.close(fig)
+
+
+def mostrar_saldo_por_moneda(resultado):
+    """Saldo en pesos por moneda de origen y diferencia de cambio acumulada"""
+    fecha = resultado.fecha_cierre.strftime("%d/%m/%Y")
+    st.subheader(f"💱 Saldo por Moneda (cotizaciones al {fecha})")
+    col1, col2 = st.columns([2, 1])
+    col1.dataframe(
+        resultado.saldo_por_moneda.rename("Saldo (ARS)").to_frame(),
+        column_config={
+            "Saldo (ARS)": st.column_config.NumberColumn(format="$%.2f"),
+        },
+    )
+    col2.metric(
+        "Diferencia de cambio acumulada", f"${resultado.diferencia_cambio:,.2f}"
+    )
+    st.caption(
+        "Montos originales a la cotización de la emisión y saldos a la del "
+        "cierre. Las cotizaciones incluidas son ilustrativas (ver "
+        "revaluacion.RUTA_COTIZACIONES)."
+    )
+
+
+def analizar_deudas_no_corrientes(resultado, evolucion=None):
+    """Muestra el análisis de Deudas No Corrientes (ResultadoDeudas)"""
+    st.subheader("📊 Análisis de Deudas No Corrientes")
 
     # Métricas clave
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total de deudas", len(df))
-    col2.metric("Monto original total", f"${df['monto_original'].sum():,.2f}")
-    col3.metric(
-        "Saldo pendiente total", f"${df['saldo_pendiente_simulado'].sum():,.2f}"
-    )
+    col1.metric("Total de deudas", resultado.total_deudas)
+    col2.metric("Monto original total", f"${resultado.monto_original_total:,.2f}")
+    col3.metric("Saldo pendiente total", f"${resultado.saldo_pendiente_total:,.2f}")
+
+    if len(resultado.saldo_por_moneda) > 1:
+        st.markdown("---")
+        mostrar_saldo_por_moneda(resultado)
+
+    if evolucion is not None:
+        st.markdown("---")
+        mostrar_clasificacion_corriente(resultado, evolucion)
 
     # Detección de Anomalías
     st.markdown("---")
     st.subheader("🚨 Detección de Anomalías (Isolation Forest)")
-    features = ["saldo_pendiente_simulado", "tasa_interes_anual", "plazo_anios"]
-    df_active = df[df["estado_deuda"].isin(["Activa", "Incumplida"])].copy()
+    df_active = resultado.activas
 
     if not df_active.empty:
-        iso_forest = IsolationForest(random_state=42, contamination=0.1)
-        df_active["is_anomaly"] = iso_forest.fit_predict(df_active[features])
-        anomalies_count = (df_active["is_anomaly"] == -1).sum()
-        st.write(f"Anomalías detectadas por IA: **{anomalies_count}**")
-        if anomalies_count > 0:
-            anomalies_df = df_active[df_active["is_anomaly"] == -1]
+        st.write(f"Anomalías detectadas por IA: **{resultado.cantidad_anomalias}**")
+        if resultado.cantidad_anomalias > 0:
             st.warning("Deudas anómalas recomendadas para revisión:")
             st.dataframe(
-                anomalies_df[
+                resultado.anomalias[
                     [
                         "deuda_id",
                         "nombre_empresa_deudora",
                         "tipo_deuda",
-                        "saldo_pendiente_simulado",
+                        "saldo_pendiente_ars",
+                        "puntaje_anomalia",
+                        "motivo",
+                        "reglas_incumplidas",
+                        *COLUMNAS_APORTE_DEUDAS,
                     ]
-                ]
+                ].sort_values("puntaje_anomalia", ascending=False),
+                column_config=CONFIG_COLUMNAS_APORTE,
             )
 
+    st.markdown("---")
+    mostrar_hallazgos_reglas(resultado.hallazgos)
+
     # Visualizaciones
     st.markdown("---")
     st.subheader("📈 Visualizaciones")
@@ -259,11 +638,7 @@ def analizar_deudas_no_corrientes(df):
 
     # Gráfico 1
     fig1, ax1 = plt.subplots(figsize=(12, 7))
-    saldo_por_tipo = (
-        df.groupby("tipo_deuda")["saldo_pendiente_simulado"]
-        .sum()
-        .sort_values(ascending=False)
-    )
+    saldo_por_tipo = resultado.saldo_por_tipo
     sns.barplot(x=saldo_por_tipo.index, y=saldo_por_tipo.values, hue=saldo_por_tipo.index, ax=ax1, legend=False)
     ax1.set_title("Saldo Pendiente Total por Tipo de Deuda", fontsize=16)
     ax1.set_ylabel("Saldo Pendiente Total", fontsize=12)
@@ -274,8 +649,13 @@ def analizar_deudas_no_corrientes(df):
 
     # Gráfico 2
     fig2, ax2 = plt.subplots(figsize=(8, 6))
-    sns.countplot(
-        x="estado_deuda", data=df, hue="estado_deuda", order=df["estado_deuda"].value_counts().index, ax=ax2, legend=False
+    cantidad_por_estado = resultado.cantidad_por_estado
+    sns.barplot(
+        x=cantidad_por_estado.index.astype(str),
+        y=cantidad_por_estado.values,
+        hue=cantidad_por_estado.index.astype(str),
+        ax=ax2,
+        legend=False,
     )
     ax2.set_title("Distribución de Deudas por Estado", fontsize=16)
     ax2.set_xlabel("Estado de la Deuda", fontsize=12)
@@ -287,8 +667,8 @@ def analizar_deudas_no_corrientes(df):
     if not df_active.empty:
         fig3, ax3 = plt.subplots(figsize=(12, 8))
         sns.scatterplot(
-            data=df_active,
-            x="saldo_pendiente_simulado",
+            data=muestra_para_grafico(df_active),
+            x="saldo_pendiente_historico",
             y="tasa_interes_anual",
             hue="is_anomaly",
             style="is_anomaly",
@@ -300,58 +680,34 @@ def analizar_deudas_no_corrientes(df):
         ax3.set_title(
             "Detección de Anomalías (IA): Saldo vs. Tasa de Interés", fontsize=16
         )
-        ax3.set_xlabel("Saldo Pendiente", fontsize=12)
+        ax3.set_xlabel("Saldo Pendiente (ARS a la emisión)", fontsize=12)
         ax3.set_ylabel("Tasa de Interés Anual", fontsize=12)
         ax3.legend(title="¿Es Anomalía?", labels=["No", "Sí"])
         st.pyplot(fig3)
         plt.close(fig3)
 
 
-def analizar_previsiones(df_previsiones):
-    """Análisis completo de Previsiones"""
+def analizar_previsiones(resultado):
+    """Muestra el análisis de Previsiones (ResultadoPrevisiones)"""
     st.subheader("📊 Análisis de Previsiones")
-
-    # Data Preprocessing
-    prob_map = {"Baja": 0.25, "Media": 0.50, "Alta": 0.75}
-    df_previsiones["probabilidad_valor"] = (
-        df_previsiones["probabilidad_ocurrencia"].map(prob_map).fillna(0.5)
-    )
-    fecha_actual_referencia = datetime(2025, 7, 10)
-    df_previsiones["dias_desde_creacion"] = (
-        fecha_actual_referencia - df_previsiones["fecha_creacion"]
-    ).dt.days
+    df_previsiones = resultado.datos
 
     # Métricas clave
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total de previsiones", len(df_previsiones))
-    col2.metric(
-        "Monto total estimado", f"${df_previsiones['monto_estimado_ars'].sum():,.2f}"
-    )
-    col3.metric(
-        "Previsiones activas",
-        len(df_previsiones[df_previsiones["estado_actual"] == "Activa"]),
-    )
+    col1.metric("Total de previsiones", resultado.total_previsiones)
+    col2.metric("Monto total estimado", f"${resultado.monto_estimado_total:,.2f}")
+    col3.metric("Previsiones activas", resultado.previsiones_activas)
 
     # Tabla resumen
     st.markdown("---")
     st.subheader("💰 Monto Total Estimado por Tipo de Previsión")
-    monto_por_tipo = (
-        df_previsiones.groupby("tipo_prevision")["monto_estimado_ars"]
-        .sum()
-        .sort_values(ascending=False)
-    )
+    monto_por_tipo = resultado.monto_por_tipo
     st.dataframe(monto_por_tipo.apply(lambda x: f"${x:,.2f}").to_frame())
 
     # Detección de Anomalías
     st.markdown("---")
     st.subheader("🤖 Detección de Anomalías con Isolation Forest")
-    features = ["monto_estimado_ars", "probabilidad_valor", "dias_desde_creacion"]
-    df_ia = df_previsiones[features].copy().fillna(0)
-
-    iso_forest = IsolationForest(random_state=42, contamination=0.1)
-    df_previsiones["es_anomalia"] = iso_forest.fit_predict(df_ia)
-
-    anomalias_detectadas = df_previsiones[df_previsiones["es_anomalia"] == -1]
+    anomalias_detectadas = resultado.anomalias
     st.warning(f"Se detectaron {len(anomalias_detectadas)} anomalías potenciales.")
     if not anomalias_detectadas.empty:
         st.dataframe(
@@ -361,10 +717,18 @@ def analizar_previsiones(df_previsiones):
                     "tipo_prevision",
                     "monto_estimado_ars",
                     "estado_actual",
+                    "puntaje_anomalia",
+                    "motivo",
+                    "reglas_incumplidas",
+                    *COLUMNAS_APORTE_PREVISIONES,
                 ]
-            ]
+            ].sort_values("puntaje_anomalia", ascending=False),
+            column_config=CONFIG_COLUMNAS_APORTE,
         )
 
+    st.markdown("---")
+    mostrar_hallazgos_reglas(resultado.hallazgos)
+
     # Visualizaciones
     st.markdown("---")
     st.subheader("📈 Visualizaciones")
@@ -385,14 +749,14 @@ def analizar_previsiones(df_previsiones):
 
     # Gráfico 2
     fig2, ax2 = plt.subplots(figsize=(8, 6))
-    sns.countplot(
-        x="estado_actual",
-        data=df_previsiones,
-        hue="estado_actual",
+    cantidad_por_estado = resultado.cantidad_por_estado
+    sns.barplot(
+        x=cantidad_por_estado.index.astype(str),
+        y=cantidad_por_estado.values,
+        hue=cantidad_por_estado.index.astype(str),
         palette="cividis",
-        order=df_previsiones["estado_actual"].value_counts().index,
         ax=ax2,
-        legend=False
+        legend=False,
     )
     ax2.set_title("Distribución de Previsiones por Estado", fontsize=16)
     ax2.set_xlabel("Estado Actual", fontsize=12)
@@ -401,9 +765,11 @@ def analizar_previsiones(df_previsiones):
     plt.close(fig2)
 
     # Gráfico 3
+    if df_previsiones.empty:
+        return
     fig3, ax3 = plt.subplots(figsize=(12, 8))
     sns.scatterplot(
-        data=df_previsiones,
+        data=muestra_para_grafico(df_previsiones),
         x="monto_estimado_ars",
         y="dias_desde_creacion",
         hue="es_anomalia",
@@ -427,6 +793,94 @@ def analizar_previsiones(df_previsiones):
 # =================================================================
 
 
+def mostrar_estres(df_deudas, fecha_cierre):
+    """Parámetros y distribución de la simulación de estrés (ResultadoEstres)"""
+    st.subheader("🎛️ Escenario")
+    col1, col2, col3, col4 = st.columns(4)
+    caminos = col1.select_slider(
+        "Caminos", options=[500, 1_000, 2_000, 5_000, 10_000], value=CAMINOS
+    )
+    media_pb = col2.number_input(
+        "Shock medio de tasa (pb)", min_value=-1_000, max_value=2_000, value=0, step=50
+    )
+    desvio_pb = col3.number_input(
+        "Desvío del shock (pb)",
+        min_value=0,
+        max_value=2_000,
+        value=int(DESVIO_SHOCK_TASA * 10_000),
+        step=50,
+    )
+    multiplicador = col4.number_input(
+        "Multiplicador de probabilidad de incumplimiento",
+        min_value=0.0,
+        max_value=20.0,
+        value=1.0,
+        step=0.5,
+        help=f"Probabilidad anual base: {PROBABILIDAD_INCUMPLIMIENTO_ACTIVA:.0%} "
+        "por deuda activa",
+    )
+    if not st.toggle("Ejecutar simulación"):
+        st.info("Ajustar el escenario y activar la simulación.")
+        return
+
+    resultado = estres_cacheado(
+        df_deudas, fecha_cierre, caminos, media_pb, desvio_pb, multiplicador
+    )
+    costo = resultado.percentiles("costo_intereses")
+    refinanciamiento = resultado.percentiles("refinanciamiento")
+
+    st.markdown("---")
+    st.subheader(
+        f"📈 Próximos 12 meses desde el {resultado.fecha_cierre:%d/%m/%Y} "
+        f"({resultado.caminos:,} caminos, {resultado.deudas:,} deudas)"
+    )
+    col1, col2, col3 = st.columns(3)
+    total_costo = costo.loc["Total"]
+    total_refinanciamiento = refinanciamiento.loc["Total"]
+    col1.metric(
+        "Costo de intereses (p95)",
+        f"${total_costo['p95']:,.2f}",
+        f"{total_costo['p95'] - total_costo['base']:+,.0f} vs. base",
+        delta_color="inverse",
+    )
+    col2.metric(
+        "Necesidad de refinanciamiento (p95)",
+        f"${total_refinanciamiento['p95']:,.2f}",
+        f"{total_refinanciamiento['p95'] - total_refinanciamiento['base']:+,.0f} "
+        "vs. base",
+        delta_color="inverse",
+    )
+    col3.metric(
+        "Deudas que pasan a incumplidas (p95)",
+        f"{resultado.percentiles('incumplimientos').loc['Total', 'p95']:,.0f}",
+    )
+
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.hist(resultado.total("costo_intereses"), bins=50, color="#1f77b4")
+    ax.axvline(total_costo["base"], color="black", label="Sin estrés")
+    ax.axvline(total_costo["p95"], color="#d62728", linestyle="--", label="p95")
+    ax.set_title("Costo de Intereses a 12 Meses por Camino", fontsize=16)
+    ax.set_xlabel("Costo de intereses (ARS)", fontsize=12)
+    ax.set_ylabel("Caminos", fontsize=12)
+    ax.legend()
+    st.pyplot(fig)
+    plt.close(fig)
+
+    formato = {
+        columna: st.column_config.NumberColumn(format="$%.2f")
+        for columna in costo.columns
+    }
+    st.subheader("💸 Costo de Intereses por Tipo de Deuda")
+    st.dataframe(costo, column_config=formato)
+    st.subheader("🔁 Necesidad de Refinanciamiento por Tipo de Deuda")
+    st.dataframe(refinanciamiento, column_config=formato)
+    st.caption(
+        "Base: sin shock de tasa ni incumplimientos nuevos. La porción corriente "
+        "se refinancia a la tasa estresada; una deuda que pasa a incumplida "
+        "vuelve exigible su porción no corriente (ver escenarios_estres)."
+    )
+
+
 def extraer_texto_pdf(ruta_archivo):
     """Extrae texto de un archivo PDF"""
     try:
@@ -440,8 +894,10 @@ def extraer_texto_pdf(ruta_archivo):
         return f"Error al leer el PDF: {str(e)}"
 
 
-def mostrar_informes_auditoria():
-    """Muestra los informes de auditoría disponibles"""
+def mostrar_informes_auditoria(
+    resultado_deudas=None, resultado_previsiones=None, fecha_cierre=None
+):
+    """Muestra los informes de auditoría disponibles y genera el de un ejercicio"""
     st.header("📄 Informes de Auditoría")
     st.markdown("""
         Informes profesionales de auditoría generados mediante análisis algorítmico del Pasivo No Corriente.
@@ -449,7 +905,32 @@ def mostrar_informes_auditoria():
     """)
     
     # Ruta de los informes
-    ruta_informes = "data/informes_auditoria"
+    ruta_informes = DIRECTORIO_INFORMES
+    
+    # Informe de un ejercicio con el análisis en pantalla
+    if resultado_deudas is not None:
+        with st.expander("🖨️ Generar informe con los datos actuales"):
+            año = st.number_input(
+                "Ejercicio",
+                min_value=1990,
+                max_value=2100,
+                value=fecha_cierre.year - 1,
+                step=1,
+            )
+            st.caption(
+                "Usa el análisis en pantalla (anomalías y sus motivos); el "
+                "ejercicio define los registros vigentes al cierre y la "
+                "reexpresión RT 6."
+            )
+            if st.button("Generar informe PDF"):
+                with st.spinner("Generando informe..."):
+                    nombre_archivo = generar_informe_desde_analisis(
+                        resultado_deudas, resultado_previsiones, int(año)
+                    )
+                if nombre_archivo:
+                    st.success(f"✅ Informe generado: {nombre_archivo}")
+                else:
+                    st.error("❌ No se pudo generar el informe.")
     
     # Verificar si existe el directorio
     if not os.path.exists(ruta_informes):
@@ -607,14 +1088,29 @@ def main():
     st.markdown("---")
 
     # Crear pestañas
-    tab1, tab2, tab3, tab4 = st.tabs(
-        ["🏦 Deudas No Corrientes", "⚠️ Previsiones", "📊 Resumen Consolidado", "📄 Informes de Auditoría"]
+    tab1, tab2, tab3, tab_estres, tab4 = st.tabs(
+        ["🏦 Deudas No Corrientes", "⚠️ Previsiones", "📊 Resumen Consolidado", "🌪️ Estrés de Tasas e Incumplimientos", "📄 Informes de Auditoría"]
     )
 
-    # Generar datos
-    with st.spinner("Generando datos..."):
-        df_deudas = generate_debt_dataframe()
-        df_previsiones = generar_dataframe_previsiones()
+    # Generar o cargar datos y calcular el análisis
+    df_deudas, df_previsiones = seleccionar_origen_datos()
+    fecha_cierre = st.sidebar.date_input(
+        "Fecha de cierre",
+        FECHA_REFERENCIA_DEUDAS,
+        help="Clasificación corriente / no corriente y reglas con fecha de corte",
+    )
+    por_segmento = st.sidebar.checkbox(
+        "Modelos de anomalías por tipo",
+        help="Un Isolation Forest por tipo de deuda y por tipo de previsión",
+    )
+    resultado_deudas = analisis_deudas_cacheado(
+        df_deudas, por_segmento=por_segmento, fecha_cierre=fecha_cierre
+    )
+    evolucion_deudas = clasificacion_mensual_cacheada(df_deudas, fecha_cierre)
+    resultado_previsiones = analisis_previsiones_cacheado(
+        df_previsiones, fecha_cierre, por_segmento=por_segmento
+    )
+    resumen = calcular_resumen_consolidado(resultado_deudas, resultado_previsiones)
 
     # Pestaña 1: Deudas No Corrientes
     with tab1:
@@ -622,7 +1118,7 @@ def main():
         st.markdown("""
             Análisis de préstamos, bonos, hipotecas y otras obligaciones a largo plazo.
         """)
-        analizar_deudas_no_corrientes(df_deudas)
+        analizar_deudas_no_corrientes(resultado_deudas, evolucion_deudas)
 
     # Pestaña 2: Previsiones
     with tab2:
@@ -630,7 +1126,7 @@ def main():
         st.markdown("""
             Análisis de previsiones para contingencias, garantías y otros pasivos estimados.
         """)
-        analizar_previsiones(df_previsiones)
+        analizar_previsiones(resultado_previsiones)
 
     # Pestaña 3: Resumen Consolidado
     with tab3:
@@ -642,29 +1138,19 @@ def main():
 
         with col1:
             st.subheader("💼 Deudas No Corrientes")
-            st.metric("Total Deudas", len(df_deudas))
-            st.metric(
-                "Saldo Pendiente Total",
-                f"${df_deudas['saldo_pendiente_simulado'].sum():,.2f}",
-            )
+            st.metric("Total Deudas", resumen.total_deudas)
+            st.metric("Saldo Pendiente Total", f"${resumen.saldo_deudas:,.2f}")
 
         with col2:
             st.subheader("⚠️ Previsiones")
-            st.metric("Total Previsiones", len(df_previsiones))
-            st.metric(
-                "Monto Estimado Total",
-                f"${df_previsiones['monto_estimado_ars'].sum():,.2f}",
-            )
+            st.metric("Total Previsiones", resumen.total_previsiones)
+            st.metric("Monto Estimado Total", f"${resumen.monto_previsiones:,.2f}")
 
         st.markdown("---")
 
         # Total consolidado
-        total_pasivo_nc = (
-            df_deudas["saldo_pendiente_simulado"].sum()
-            + df_previsiones["monto_estimado_ars"].sum()
-        )
         st.subheader("💰 TOTAL PASIVO NO CORRIENTE")
-        st.metric("Valor Total Estimado", f"${total_pasivo_nc:,.2f}")
+        st.metric("Valor Total Estimado", f"${resumen.total_pasivo:,.2f}")
 
         st.markdown("---")
 
@@ -672,10 +1158,7 @@ def main():
         st.subheader("📊 Comparación de Componentes")
         fig, ax = plt.subplots(figsize=(10, 6))
         componentes = ["Deudas No Corrientes", "Previsiones"]
-        valores = [
-            df_deudas["saldo_pendiente_simulado"].sum(),
-            df_previsiones["monto_estimado_ars"].sum(),
-        ]
+        valores = [resumen.saldo_deudas, resumen.monto_previsiones]
         colors = ["#1f77b4", "#ff7f0e"]
         ax.bar(componentes, valores, color=colors)
         ax.set_ylabel("Monto Total (ARS)", fontsize=12)
@@ -688,30 +1171,71 @@ def main():
         # Tabla detallada
         st.markdown("---")
         st.subheader("📋 Detalle por Componente")
-        resumen_data = {
-            "Componente": ["Deudas No Corrientes", "Previsiones", "TOTAL"],
-            "Cantidad de Registros": [
-                len(df_deudas),
-                len(df_previsiones),
-                len(df_deudas) + len(df_previsiones),
-            ],
-            "Monto Total (ARS)": [
-                f"${df_deudas['saldo_pendiente_simulado'].sum():,.2f}",
-                f"${df_previsiones['monto_estimado_ars'].sum():,.2f}",
-                f"${total_pasivo_nc:,.2f}",
-            ],
-            "Porcentaje del Total": [
-                f"{(df_deudas['saldo_pendiente_simulado'].sum() / total_pasivo_nc * 100):.1f}%",
-                f"{(df_previsiones['monto_estimado_ars'].sum() / total_pasivo_nc * 100):.1f}%",
-                "100.0%",
-            ],
-        }
-        df_resumen = pd.DataFrame(resumen_data)
+        df_resumen = resumen.detalle.copy()
+        df_resumen["Monto Total (ARS)"] = df_resumen["Monto Total (ARS)"].map(
+            lambda x: f"${x:,.2f}"
+        )
+        df_resumen["Porcentaje del Total"] = df_resumen["Porcentaje del Total"].map(
+            lambda x: f"{x:.1f}%"
+        )
         st.dataframe(df_resumen, use_container_width=True)
 
+        # Registros vigentes al cierre de los últimos ejercicios completos
+        st.markdown("---")
+        st.subheader("🗓️ Vigentes al Cierre de Cada Ejercicio")
+        vigentes = vigentes_por_ejercicio(
+            resultado_deudas,
+            resultado_previsiones,
+            range(fecha_cierre.year - 5, fecha_cierre.year),
+        )
+        st.dataframe(
+            vigentes,
+            column_config={
+                "ejercicio": st.column_config.NumberColumn("Ejercicio", format="%d"),
+                "fecha_cierre": st.column_config.DateColumn("Cierre"),
+                "monto_original_deudas": st.column_config.NumberColumn(
+                    "Monto original deudas", format="$%.2f"
+                ),
+                "monto_reexpresado_deudas": st.column_config.NumberColumn(
+                    "Deudas reexpresadas (RT 6)", format="$%.2f"
+                ),
+                "monto_previsiones": st.column_config.NumberColumn(
+                    "Monto previsiones", format="$%.2f"
+                ),
+                "monto_reexpresado_previsiones": st.column_config.NumberColumn(
+                    "Previsiones reexpresadas (RT 6)", format="$%.2f"
+                ),
+            },
+            hide_index=True,
+        )
+        st.caption(
+            "Montos de origen reexpresados en moneda de cada cierre con la serie "
+            "de índices de precios local (ilustrativa; reemplazable con la "
+            "variable PASIVO_INDICES)."
+        )
+        faltantes = vigentes[
+            ["monto_reexpresado_deudas", "monto_reexpresado_previsiones"]
+        ].isna()
+        if faltantes.any().any():
+            st.warning(
+                "La serie de índices no está disponible o no cubre algunos cierres "
+                "o fechas de origen: esos montos reexpresados quedan vacíos."
+            )
+
+    # Pestaña de estrés: Monte Carlo de tasas e incumplimientos
+    with tab_estres:
+        st.header("🌪️ Estrés de Tasas e Incumplimientos")
+        st.markdown("""
+            Distribución del costo de intereses y de la necesidad de refinanciamiento 
+            ante shocks de tasa y deudas que pasan a incumplidas (Monte Carlo).
+        """)
+        mostrar_estres(df_deudas, fecha_cierre)
+
     # Pestaña 4: Informes de Auditoría
     with tab4:
-        mostrar_informes_auditoria()
+        mostrar_informes_auditoria(
+            resultado_deudas, resultado_previsiones, fecha_cierre
+        )
 
 
 if __name__ == "__main__":
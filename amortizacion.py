@@ -0,0 +1,595 @@
+"""
+MOTOR DE AMORTIZACIÓN
+Cronogramas de pago de la cartera de deudas con sistemas francés (cuota
+constante), alemán (amortización constante) y bullet/americano (solo
+intereses y capital al vencimiento), con pagos mensuales, trimestrales,
+semestrales o anuales.
+
+Las tablas completas se construyen por difusión de NumPy (instrumentos x
+períodos) y por bloques acotados en cantidad de celdas, de modo que 1M de
+préstamos x 240 períodos se recorre con memoria acotada. El saldo de capital y
+los intereses a una fecha se calculan con fórmulas cerradas por instrumento,
+sin materializar el cronograma.
+"""
+
+import numpy as np
+import pandas as pd
+
+from devengamiento import codigos_convencion, fraccion_periodo
+
+SISTEMAS = ["frances", "aleman", "bullet"]
+FRECUENCIAS = {"mensual": 12, "trimestral": 4, "semestral": 2, "anual": 1}
+
+# Sistema y frecuencia habituales por tipo de deuda (mismo orden que
+# generacion_datos.TIPOS_DEUDA_NO_CORRIENTE)
+CONDICIONES_POR_TIPO = {
+    "Préstamo Bancario a Largo Plazo": ("frances", "mensual"),
+    "Bonos Emitidos": ("bullet", "semestral"),
+    "Hipoteca Inmobiliaria": ("frances", "mensual"),
+    "Arrendamiento Financiero (Leasing)": ("frances", "mensual"),
+    "Deuda con Partes Relacionadas (Largo Plazo)": ("aleman", "trimestral"),
+    "Obligaciones Negociables": ("bullet", "semestral"),
+}
+CONDICIONES_POR_DEFECTO = ("frances", "mensual")
+
+# Celdas (instrumentos x períodos) materializadas por bloque
+TAMANO_BLOQUE_CELDAS = 1_000_000
+
+_FRANCES, _ALEMAN, _BULLET = range(len(SISTEMAS))
+
+
+# =================================================================
+# CONDICIONES DE CADA INSTRUMENTO
+# =================================================================
+
+
+def condiciones_por_tipo(tipos):
+    """
+    Sistema y frecuencia de pago de cada deuda según su tipo
+
+    Returns:
+        tuple: (pd.Categorical de sistemas, pd.Categorical de frecuencias)
+    """
+    tipos = pd.Series(tipos)
+    sistemas = tipos.map(
+        lambda t: CONDICIONES_POR_TIPO.get(t, CONDICIONES_POR_DEFECTO)[0]
+    )
+    frecuencias = tipos.map(
+        lambda t: CONDICIONES_POR_TIPO.get(t, CONDICIONES_POR_DEFECTO)[1]
+    )
+    return (
+        pd.Categorical(sistemas.astype(object), categories=SISTEMAS),
+        pd.Categorical(frecuencias.astype(object), categories=list(FRECUENCIAS)),
+    )
+
+
+def condiciones(
+    monto_original,
+    tasa_interes_anual,
+    plazo_anios,
+    fecha_emision,
+    sistema,
+    frecuencia,
+    convencion=0,
+):
+    """
+    Arrays de trabajo del motor a partir de arrays por instrumento
+
+    `sistema` y `frecuencia` son códigos sobre SISTEMAS y FRECUENCIAS (como
+    los de un pd.Categorical con esas categorías); `convencion`, sobre
+    devengamiento.CONVENCIONES (ACT/365 por defecto).
+
+    Returns:
+        dict: capital, tasa por período, cantidad de períodos, meses por
+        período, código de sistema, fecha de emisión (datetime64[D]) y
+        convención de conteo de días
+    """
+    pagos_por_anio = np.asarray(list(FRECUENCIAS.values()))[frecuencia]
+    return {
+        "capital": np.asarray(monto_original, dtype="float64"),
+        "tasa": np.asarray(tasa_interes_anual, dtype="float64") / pagos_por_anio,
+        "periodos": np.maximum(
+            np.round(np.asarray(plazo_anios, dtype="float64") * pagos_por_anio), 1
+        ).astype("int64"),
+        "meses_periodo": 12 // pagos_por_anio,
+        "sistema": np.asarray(sistema, dtype="int8"),
+        "emision": np.asarray(fecha_emision, dtype="datetime64[D]"),
+        "convencion": np.broadcast_to(
+            np.asarray(convencion, dtype="int8"), np.shape(monto_original)
+        ),
+    }
+
+
+def _codigos_informados(df, columna, categorias):
+    """
+    Códigos sobre `categorias` de una columna opcional y máscara de las filas
+    sin dato (columna ausente o vacía)
+    """
+    if columna not in df.columns:
+        return np.full(len(df), -1, dtype="int8"), np.ones(len(df), dtype=bool)
+    codigos = pd.Categorical(df[columna], categories=categorias).codes.copy()
+    return codigos, pd.isna(np.asarray(df[columna], dtype=object))
+
+
+def condiciones_deudas(df):
+    """
+    Arrays de trabajo (ver `condiciones`) para las deudas de `df`
+
+    Sin sistema, frecuencia o convención de días informados (columna
+    ausente o vacía) se usan los habituales del tipo de deuda, o los
+    generales si no hay tipo_deuda; sin plazo, el que surge del vencimiento.
+    """
+    sistemas, sin_sistema = _codigos_informados(df, "sistema_amortizacion", SISTEMAS)
+    frecuencias, sin_frecuencia = _codigos_informados(
+        df, "frecuencia_pagos", list(FRECUENCIAS)
+    )
+    por_tipo = sin_sistema | sin_frecuencia
+    if por_tipo.any():
+        # Los habituales del tipo solo se buscan para las filas sin dato
+        tipos = (
+            df["tipo_deuda"].to_numpy()[por_tipo]
+            if "tipo_deuda" in df.columns
+            else np.full(por_tipo.sum(), None)
+        )
+        sistemas_tipo, frecuencias_tipo = condiciones_por_tipo(tipos)
+        sistemas[sin_sistema] = sistemas_tipo.codes[sin_sistema[por_tipo]]
+        frecuencias[sin_frecuencia] = frecuencias_tipo.codes[sin_frecuencia[por_tipo]]
+    if (sistemas < 0).any() or (frecuencias < 0).any():
+        raise ValueError("Sistema de amortización o frecuencia de pagos desconocidos")
+
+    emision = pd.to_datetime(df["fecha_emision"]).to_numpy(dtype="datetime64[D]")
+    plazo_anios = np.full(len(df), np.nan)
+    if "plazo_anios" in df.columns:
+        plazo_anios = pd.to_numeric(df["plazo_anios"]).astype("float64").to_numpy()
+    sin_plazo = np.isnan(plazo_anios)
+    if sin_plazo.any():
+        # Extractos sin plazo: se deduce del vencimiento
+        vencimiento = pd.to_datetime(df["fecha_vencimiento"]).to_numpy(
+            dtype="datetime64[D]"
+        )
+        plazo_anios[sin_plazo] = (vencimiento - emision)[sin_plazo].astype(
+            "int64"
+        ) / 365.25
+
+    return condiciones(
+        df["monto_original"].to_numpy(dtype="float64"),
+        df["tasa_interes_anual"].to_numpy(dtype="float64"),
+        plazo_anios,
+        emision,
+        sistemas,
+        frecuencias,
+        codigos_convencion(df),
+    )
+
+
+# =================================================================
+# FÓRMULAS CERRADAS
+# =================================================================
+
+
+def _cuota_francesa(capital, tasa, periodos):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cuota = capital * tasa / (1 - (1 + tasa) ** -periodos)
+    return np.where(tasa > 0, cuota, capital / periodos)
+
+
+def _saldo_frances(k, capital, tasa, periodos):
+    factor = (1 + tasa) ** k
+    cuota = _cuota_francesa(capital, tasa, periodos)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            tasa > 0,
+            capital * factor - cuota * (factor - 1) / tasa,
+            capital * (1 - k / periodos),
+        )
+
+
+def _saldo_aleman(k, capital, tasa, periodos):
+    return capital * (1 - k / periodos)
+
+
+def _saldo_bullet(k, capital, tasa, periodos):
+    return np.where(k < periodos, capital, 0.0)
+
+
+_SALDO_POR_SISTEMA = {
+    _FRANCES: _saldo_frances,
+    _ALEMAN: _saldo_aleman,
+    _BULLET: _saldo_bullet,
+}
+
+
+def _saldo_tras(k, capital, tasa, periodos, sistema):
+    """
+    Saldo de capital después de pagar `k` cuotas
+
+    Los argumentos son vectores por instrumento o, para los cronogramas,
+    columnas (instrumentos x 1) con `k` como matriz instrumentos x períodos.
+    Cada sistema se calcula solo sobre sus instrumentos.
+    """
+    k = np.minimum(k, periodos)
+    saldo = np.empty(np.broadcast_shapes(k.shape, capital.shape))
+    codigos = sistema.reshape(len(sistema))
+    for codigo, funcion in _SALDO_POR_SISTEMA.items():
+        filas = codigos == codigo
+        if filas.all():
+            saldo[...] = funcion(k, capital, tasa, periodos)
+            break
+        if filas.any():
+            saldo[filas] = funcion(
+                np.broadcast_to(k, saldo.shape)[filas],
+                capital[filas],
+                tasa[filas],
+                periodos[filas],
+            )
+    # Ruido de redondeo en la última cuota
+    return np.maximum(saldo, 0.0)
+
+
+def _intereses_hasta(k, capital, tasa, periodos, sistema, saldo=None):
+    """
+    Intereses de las primeras `k` cuotas (fórmula cerrada por sistema);
+    `saldo` es el de `_saldo_tras` para esas `k`, si ya se calculó
+    """
+    k = np.minimum(k, periodos)
+    if saldo is None:
+        saldo = _saldo_tras(k, capital, tasa, periodos, sistema)
+    cuota = _cuota_francesa(capital, tasa, periodos)
+    frances = cuota * k - (capital - saldo)
+    # Alemán: sum_{j=1..k} i * P * (1 - (j-1)/n)
+    aleman = tasa * capital * (k - k * (k - 1) / (2 * periodos))
+    bullet = tasa * capital * k
+    return np.select(
+        [sistema == _FRANCES, sistema == _ALEMAN], [frances, aleman], bullet
+    )
+
+
+# =================================================================
+# FECHAS
+# =================================================================
+
+
+class _Calendario:
+    """
+    Aritmética de meses sobre enteros: fechas como días y meses desde 1970,
+    con una tabla del primer día de cada mes del rango necesario (evita
+    conversiones de calendario por elemento)
+    """
+
+    def __init__(self, fechas, meses_extra):
+        self.meses = fechas.astype("datetime64[M]").astype("int64")
+        self.minimo = int(self.meses.min()) if len(self.meses) else 0
+        maximo = int(self.meses.max()) + int(meses_extra) + 2 if len(self.meses) else 1
+        self.tabla = (
+            np.arange(self.minimo, maximo + 1)
+            .astype("datetime64[M]")
+            .astype("datetime64[D]")
+            .astype("int64")
+        )
+        self.dias = fechas.astype("datetime64[D]").astype("int64")
+        self.dia_del_mes = self.dias - self.tabla[self.meses - self.minimo]
+
+    def sumar(self, meses, filas=slice(None)):
+        """Días (desde 1970) de las fechas `filas` más `meses` meses"""
+        destino = self.meses[filas] + meses - self.minimo
+        inicio = self.tabla[destino]
+        largo = self.tabla[destino + 1] - inicio
+        return inicio + np.minimum(self.dia_del_mes[filas], largo - 1)
+
+    def meses_hasta(self, dias):
+        """Meses completos desde cada fecha hasta `dias` (0 si es anterior)"""
+        meses = (
+            np.asarray(dias).astype("datetime64[D]").astype("datetime64[M]")
+        ).astype("int64") - self.meses
+        meses = np.clip(meses, 0, len(self.tabla) - 2 - (self.meses - self.minimo))
+        return np.maximum(meses - (self.sumar(meses) > dias), 0)
+
+
+def sumar_meses(fechas, meses):
+    """
+    Suma meses a fechas datetime64[D], conservando el día (o el último día
+    del mes si no existe)
+    """
+    fechas = np.asarray(fechas, dtype="datetime64[D]")
+    meses = np.broadcast_to(np.asarray(meses, dtype="int64"), fechas.shape)
+    calendario = _Calendario(fechas, max(int(meses.max(initial=0)), 0))
+    return calendario.sumar(meses).astype("datetime64[D]")
+
+
+# =================================================================
+# SALDOS A UNA FECHA
+# =================================================================
+
+
+def saldos_a_fecha(df, fecha):
+    """
+    Saldo de capital e intereses de cada deuda a una fecha, sin construir
+    los cronogramas
+
+    El interés del período en curso se devenga en proporción a la parte del
+    período transcurrida, medida con la convención de conteo de días de cada
+    deuda (ver `devengamiento`).
+
+    Args:
+        df: Deudas con monto_original, tasa_interes_anual, plazo_anios,
+            fecha_emision y tipo_deuda (o sistema_amortizacion y
+            frecuencia_pagos)
+        fecha: Fecha de cálculo (escalar) o una fecha por deuda
+
+    Returns:
+        pd.DataFrame: cuotas_pagadas, saldo_capital, interes_corrido (del
+        período en curso) e intereses_devengados (desde la emisión),
+        alineado con `df`
+    """
+    saldos = calcular_saldos(condiciones_deudas(df), fecha)
+    return pd.DataFrame(
+        {
+            "cuotas_pagadas": saldos["cuotas_pagadas"],
+            "saldo_capital": np.round(saldos["saldo_capital"], 2),
+            "interes_corrido": np.round(saldos["interes_corrido"], 2),
+            "intereses_devengados": np.round(saldos["intereses_devengados"], 2),
+        },
+        index=df.index,
+    )
+
+
+def intereses_entre_fechas(df, desde, hasta):
+    """
+    Intereses devengados por cada deuda entre dos fechas, sobre el saldo de
+    capital de cada período del cronograma y con la convención de días de
+    cada deuda
+
+    Es la diferencia de los intereses devengados desde la emisión a
+    `hasta` y a `desde`, así que incluye los de las cuotas pagadas en el
+    medio y los corridos en ambos extremos.
+
+    Args:
+        df: Deudas (ver `saldos_a_fecha`)
+        desde, hasta: Fechas (escalares o una por deuda)
+
+    Returns:
+        pd.Series: Intereses del intervalo, alineada con `df`
+    """
+    c = condiciones_deudas(df)
+    intereses = (
+        calcular_saldos(c, hasta)["intereses_devengados"]
+        - calcular_saldos(c, desde)["intereses_devengados"]
+    )
+    return pd.Series(np.round(intereses, 2), index=df.index, name="intereses")
+
+
+def _dias(fecha):
+    """Fecha escalar o array de fechas (de cualquier forma) a días desde 1970"""
+    forma = np.shape(fecha)
+    dias = np.asarray(pd.to_datetime(np.ravel(fecha)), dtype="datetime64[D]")
+    return dias.astype("int64").reshape(forma)
+
+
+def _calendario_y_pagadas(c, dias):
+    """Calendario de las emisiones y cuotas pagadas a cada fecha"""
+    calendario = _Calendario(c["emision"], 12 * (int(c["periodos"].max(initial=0)) + 1))
+    meses = np.minimum(calendario.meses_hasta(dias), c["periodos"] * c["meses_periodo"])
+    pagadas = np.minimum(meses // c["meses_periodo"], c["periodos"])
+    return calendario, pagadas
+
+
+def saldo_capital(c, fecha):
+    """
+    Saldo de capital a una fecha, sin intereses (más liviano que
+    `calcular_saldos`)
+
+    Con los arrays de `condiciones` como columnas (instrumentos x 1) y
+    `fecha` como fila (1 x fechas), devuelve la matriz instrumentos x fechas
+    por difusión.
+    """
+    _, pagadas = _calendario_y_pagadas(c, _dias(fecha))
+    return _saldo_tras(pagadas, c["capital"], c["tasa"], c["periodos"], c["sistema"])
+
+
+def calcular_saldos(c, fecha):
+    """
+    Versión de `saldos_a_fecha` sobre los arrays de `condiciones`
+
+    Admite la misma difusión instrumentos x fechas que `saldo_capital`.
+
+    Returns:
+        dict: Arrays cuotas_pagadas, saldo_capital, interes_corrido e
+        intereses_devengados (sin redondear)
+    """
+    dias = _dias(fecha)
+    calendario, pagadas = _calendario_y_pagadas(c, dias)
+    inicio = calendario.sumar(pagadas * c["meses_periodo"])
+    fin = calendario.sumar((pagadas + 1) * c["meses_periodo"])
+    fraccion = np.where(
+        (pagadas < c["periodos"]) & (dias > calendario.dias),
+        fraccion_periodo(inicio, dias, fin, c["convencion"]),
+        0.0,
+    )
+
+    saldo = _saldo_tras(pagadas, c["capital"], c["tasa"], c["periodos"], c["sistema"])
+    corrido = saldo * c["tasa"] * fraccion
+    devengados = (
+        _intereses_hasta(
+            pagadas, c["capital"], c["tasa"], c["periodos"], c["sistema"], saldo
+        )
+        + corrido
+    )
+    return {
+        "cuotas_pagadas": pagadas,
+        "saldo_capital": saldo,
+        "interes_corrido": corrido,
+        "intereses_devengados": devengados,
+    }
+
+
+# =================================================================
+# CRONOGRAMAS COMPLETOS
+# =================================================================
+
+
+def matrices_cronograma(c, filas):
+    """
+    Cronograma de las deudas `filas` como matrices instrumentos x períodos
+
+    Las celdas posteriores al vencimiento de cada deuda quedan con saldo,
+    interés y amortización en cero (máscara `vigente`).
+
+    Returns:
+        dict: k (1 x períodos), vigente, saldo_inicial, interes,
+        amortizacion y saldo_final
+    """
+    capital = c["capital"][filas, None]
+    tasa = c["tasa"][filas, None]
+    periodos = c["periodos"][filas, None]
+    sistema = c["sistema"][filas]
+
+    k = np.arange(1, int(periodos.max()) + 1)[None, :]
+    saldo_final = _saldo_tras(k, capital, tasa, periodos, sistema)
+    saldo_inicial = np.empty_like(saldo_final)
+    saldo_inicial[:, 0] = capital[:, 0]
+    saldo_inicial[:, 1:] = saldo_final[:, :-1]
+    return {
+        "k": k,
+        "vigente": k <= periodos,
+        "saldo_inicial": saldo_inicial,
+        "interes": saldo_inicial * tasa,
+        "amortizacion": saldo_inicial - saldo_final,
+        "saldo_final": saldo_final,
+    }
+
+
+def formato_largo(c, filas, matrices):
+    """
+    Pasa matrices instrumentos x períodos de las deudas `filas` a formato
+    largo (una fila por cuota vigente), con el número y la fecha de pago
+
+    Returns:
+        dict: fila (posición dentro de `filas`), periodo, fecha_pago y cada
+        matriz de `matrices` aplanada
+    """
+    vigente = matrices.pop("vigente")
+    k = matrices.pop("k")
+    if vigente.all():
+        vigente = slice(None)
+        fila, periodo = np.divmod(np.arange(len(filas) * k.shape[1]), k.shape[1])
+    else:
+        fila, periodo = np.nonzero(vigente)
+    calendario = _Calendario(c["emision"][filas], 12 * int(k.shape[1]))
+    fechas = calendario.sumar((periodo + 1) * c["meses_periodo"][filas][fila], fila)
+    tabla = {
+        "fila": fila,
+        "periodo": (periodo + 1).astype("int16"),
+        "fecha_pago": fechas.astype("datetime64[D]"),
+    }
+    tabla.update({nombre: m[vigente].ravel() for nombre, m in matrices.items()})
+    return tabla
+
+
+def bloques_de_filas(c, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """
+    Particiona las deudas en bloques de a lo sumo `tamano_bloque_celdas`
+    celdas (instrumentos x períodos)
+
+    Los bloques agrupan deudas del mismo sistema y de plazo similar, así que
+    casi no tienen celdas de relleno.
+
+    Yields:
+        np.ndarray: Posiciones (ordenadas) de las deudas de cada bloque
+    """
+    orden = np.lexsort((c["periodos"], c["sistema"]))
+    periodos_ordenados = c["periodos"][orden]
+    inicio = 0
+    while inicio < len(orden):
+        tentativa = max(1, tamano_bloque_celdas // int(periodos_ordenados[inicio]))
+        maximo = int(periodos_ordenados[inicio : inicio + tentativa].max())
+        cantidad = max(1, tamano_bloque_celdas // maximo)
+        filas = np.sort(orden[inicio : inicio + cantidad])
+        inicio += len(filas)
+        yield filas
+
+
+def ids_deudas(df):
+    """
+    Función que asigna el deuda_id a las filas de un bloque en formato largo:
+    categoría por bloque si los ids son únicos, texto si no
+
+    Returns:
+        callable: (filas del bloque, fila de cada cuota) -> columna deuda_id
+    """
+    if "deuda_id" in df.columns:
+        ids = pd.Index(df["deuda_id"].astype(str).to_numpy(dtype=object))
+    else:
+        ids = pd.Index(np.arange(len(df)).astype(str).astype(object))
+    if ids.is_unique:
+        return lambda filas, fila: pd.Categorical.from_codes(
+            fila, categories=ids[filas]
+        )
+    return lambda filas, fila: ids.to_numpy()[filas[fila]]
+
+
+def flujos_por_bloques(df, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """
+    Genera los cronogramas de toda la cartera por bloques de deudas
+
+    Cada bloque se arma con una matriz instrumentos x períodos de a lo sumo
+    `tamano_bloque_celdas` celdas (ver `bloques_de_filas`) y se devuelve en
+    formato largo (una fila por cuota), para agregarlo o escribirlo a disco
+    sin retener la tabla completa en memoria.
+
+    Yields:
+        pd.DataFrame: deuda_id (categoría), periodo, fecha_pago,
+        saldo_inicial, interes, amortizacion, cuota y saldo_final
+    """
+    c = condiciones_deudas(df)
+    id_de = ids_deudas(df)
+    for filas in bloques_de_filas(c, tamano_bloque_celdas):
+        matrices = matrices_cronograma(c, filas)
+        matrices["cuota"] = matrices["interes"] + matrices["amortizacion"]
+        matrices["saldo_final"] = matrices.pop("saldo_final")
+        tabla = formato_largo(c, filas, matrices)
+        bloque = pd.DataFrame(tabla)
+        bloque.insert(0, "deuda_id", id_de(filas, bloque.pop("fila").to_numpy()))
+        yield bloque
+
+
+def cronograma(df, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """Cronograma completo de `df` en un único DataFrame (carteras chicas)"""
+    bloques = list(flujos_por_bloques(df, tamano_bloque_celdas))
+    if not bloques:
+        return pd.DataFrame()
+    return pd.concat(bloques, ignore_index=True)
+
+
+def escribir_flujos_parquet(df, ruta, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """
+    Escribe los cronogramas de toda la cartera en un único Parquet, bloque
+    por bloque
+
+    Returns:
+        int: Cantidad de cuotas escritas
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    esquema = None
+    total = 0
+    try:
+        for bloque in flujos_por_bloques(df, tamano_bloque_celdas):
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if escritor is None:
+                # El ancho de los códigos de deuda_id (categoría por bloque)
+                # depende del tamaño del bloque: se fija para todo el archivo
+                esquema = tabla.schema
+                if pa.types.is_dictionary(esquema.field("deuda_id").type):
+                    esquema = esquema.set(
+                        esquema.get_field_index("deuda_id"),
+                        pa.field("deuda_id", pa.dictionary(pa.int32(), pa.string())),
+                    )
+                escritor = pq.ParquetWriter(ruta, esquema)
+            escritor.write_table(tabla.cast(esquema))
+            total += len(bloque)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return total
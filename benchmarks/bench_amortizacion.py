@@ -0,0 +1,95 @@
+"""
+BENCHMARK DEL MOTOR DE AMORTIZACIÓN
+Construye los cronogramas completos de una cartera de préstamos a 20 años
+con pagos mensuales (240 períodos por instrumento) bloque por bloque, y
+mide tiempo, cuotas por segundo y memoria pico. También mide el cálculo de
+saldos a una fecha con las fórmulas cerradas.
+
+Uso:
+    python benchmarks/bench_amortizacion.py [num_prestamos] [celdas_por_bloque]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from amortizacion import (
+    TAMANO_BLOQUE_CELDAS,
+    escribir_flujos_parquet,
+    flujos_por_bloques,
+    saldos_a_fecha,
+)
+from generacion_datos import generar_deudas_vectorizado
+
+
+def cartera_a_20_anios(num_prestamos):
+    """Préstamos a 20 años, mensuales, repartidos entre los tres sistemas"""
+    df = generar_deudas_vectorizado(num_prestamos, semilla=7)
+    df["plazo_anios"] = 20
+    df["frecuencia_pagos"] = "mensual"
+    df["sistema_amortizacion"] = np.array(["frances", "aleman", "bullet"])[
+        np.arange(num_prestamos) % 3
+    ]
+    return df
+
+
+def main():
+    num_prestamos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    celdas = int(sys.argv[2]) if len(sys.argv) > 2 else TAMANO_BLOQUE_CELDAS
+    df = cartera_a_20_anios(num_prestamos)
+
+    print("=" * 70)
+    print(f"AMORTIZACIÓN ({num_prestamos:,} préstamos x 240 períodos)")
+    print("=" * 70)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    cuotas = 0
+    intereses = capital = 0.0
+    for bloque in flujos_por_bloques(df, celdas):
+        cuotas += len(bloque)
+        intereses += bloque["interes"].sum()
+        capital += bloque["amortizacion"].sum()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Cronogramas:     {cuotas:,} cuotas en {segundos:.1f} s")
+    print(f"                 {cuotas / segundos:,.0f} cuotas/s")
+    print(f"                 memoria pico {pico / 1024**2:,.0f} MB")
+    desvio = abs(capital - df["monto_original"].sum()) / df["monto_original"].sum()
+    print(f"                 capital amortizado / original - 1 = {desvio:.2e}")
+    print(f"                 intereses totales ${intereses:,.2f}")
+
+    inicio = time.perf_counter()
+    saldos = saldos_a_fecha(df, "2030-06-30")
+    segundos = time.perf_counter() - inicio
+    print(f"Saldos a fecha:  {len(saldos):,} préstamos en {segundos:.2f} s")
+
+    # Parquet de varios bloques: el último, más corto, usa códigos de
+    # deuda_id más angostos y tiene que entrar en el mismo esquema
+    import pyarrow.parquet as pq
+
+    muestra = df.head(min(num_prestamos, 3_000))
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "flujos.parquet")
+        inicio = time.perf_counter()
+        escritas = escribir_flujos_parquet(muestra, ruta, tamano_bloque_celdas=20_000)
+        segundos = time.perf_counter() - inicio
+        archivo = pq.ParquetFile(ruta)
+        leidas = archivo.metadata.num_rows
+        estado = "OK" if leidas == escritas else "DISTINTO"
+        print(
+            f"Parquet:         {escritas:,} cuotas en {archivo.num_row_groups} "
+            f"bloques, {segundos:.2f} s (releídas {leidas:,}: {estado})"
+        )
+
+
+if __name__ == "__main__":
+    main()
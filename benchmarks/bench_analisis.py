@@ -0,0 +1,59 @@
+"""
+BENCHMARK DEL MOTOR DE ANÁLISIS
+Mide el tiempo de la capa de cálculo (preparación, agregados e Isolation
+Forest) sin Streamlit ni gráficos, como la usaría un proceso batch.
+
+Uso:
+    python benchmarks/bench_analisis.py [num_deudas] [num_previsiones]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generacion_datos import generar_deudas_vectorizado, generar_previsiones_vectorizado
+from motor_analisis import (
+    calcular_analisis_deudas,
+    calcular_analisis_previsiones,
+    calcular_resumen_consolidado,
+)
+
+
+def cronometrar(funcion, *args):
+    """Ejecuta la función y devuelve (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_previsiones = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    df_deudas = generar_deudas_vectorizado(num_deudas)
+    df_previsiones = generar_previsiones_vectorizado(num_previsiones)
+
+    deudas, t_deudas = cronometrar(calcular_analisis_deudas, df_deudas)
+    previsiones, t_previsiones = cronometrar(
+        calcular_analisis_previsiones, df_previsiones
+    )
+    resumen = calcular_resumen_consolidado(deudas, previsiones)
+
+    print("=" * 70)
+    print("MOTOR DE ANÁLISIS (sin interfaz)")
+    print("=" * 70)
+    print(
+        f"Deudas:      {num_deudas:>12,} filas  {t_deudas:8.2f} s  "
+        f"{deudas.cantidad_anomalias:,} anomalías"
+    )
+    print(
+        f"Previsiones: {num_previsiones:>12,} filas  {t_previsiones:8.2f} s  "
+        f"{previsiones.cantidad_anomalias:,} anomalías"
+    )
+    print(f"Total pasivo no corriente: ${resumen.total_pasivo:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
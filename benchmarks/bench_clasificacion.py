@@ -0,0 +1,60 @@
+"""
+BENCHMARK DE CLASIFICACIÓN CORRIENTE / NO CORRIENTE
+Compara 60 cierres mensuales calculados en un único lote (matriz deudas x
+cierres) con 60 corridas de la clasificación a una fecha.
+
+Uso:
+    python benchmarks/bench_clasificacion.py [num_deudas] [cierres]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from clasificacion_corriente import (
+    clasificar_a_fecha,
+    clasificar_a_fechas,
+    fechas_cierre_mensuales,
+)
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES, generar_deudas_vectorizado
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    df = generar_deudas_vectorizado(
+        num_deudas, semilla=7, fecha_referencia=FECHA_REFERENCIA_PREVISIONES
+    )
+    cierres = fechas_cierre_mensuales(FECHA_REFERENCIA_PREVISIONES, cantidad)
+
+    print("=" * 70)
+    print(f"CLASIFICACIÓN ({num_deudas:,} deudas x {cantidad} cierres)")
+    print("=" * 70)
+
+    inicio = time.perf_counter()
+    lote = clasificar_a_fechas(df, cierres)
+    segundos_lote = time.perf_counter() - inicio
+    print(f"En lote:         {segundos_lote:.1f} s")
+
+    inicio = time.perf_counter()
+    corridas = [clasificar_a_fecha(df, cierre).sum() for cierre in cierres]
+    segundos_corridas = time.perf_counter() - inicio
+    print(
+        f"Una por cierre:  {segundos_corridas:.1f} s (x{segundos_corridas / segundos_lote:.1f})"
+    )
+
+    esperado = np.array([c["porcion_corriente"] for c in corridas])
+    desvio = np.abs(lote["corriente"].to_numpy() - esperado).max()
+    print(f"                 diferencia máxima (redondeo por deuda) ${desvio:,.2f}")
+    print(
+        f"Último cierre:   corriente ${lote['corriente'].iloc[-1]:,.2f}, "
+        f"no corriente ${lote['no_corriente'].iloc[-1]:,.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
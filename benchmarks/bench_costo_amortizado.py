@@ -0,0 +1,89 @@
+"""
+BENCHMARK DE TASA EFECTIVA Y COSTO AMORTIZADO
+Resuelve la tasa de interés efectiva de toda una cartera generada con el
+solver vectorizado y la compara, en una muestra, con una llamada a
+`scipy.optimize.brentq` por instrumento (resultado y tiempo extrapolado).
+
+Uso:
+    python benchmarks/bench_costo_amortizado.py [num_deudas] [muestra]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from amortizacion import flujos_por_bloques
+from costo_amortizado import evolucion_por_anio, tasas_efectivas
+from generacion_datos import generar_deudas_vectorizado
+
+
+def tasas_una_por_una(df):
+    """Tasa por período de cada deuda con una llamada a brentq por deuda"""
+    from scipy.optimize import brentq
+
+    cuotas = {}
+    for bloque in flujos_por_bloques(df):
+        for deuda_id, grupo in bloque.groupby("deuda_id", observed=True):
+            cuotas[deuda_id] = grupo["cuota"].to_numpy()
+
+    netos = df["monto_original"] - df["costos_transaccion"]
+    tasas = []
+    inicio = time.perf_counter()
+    for deuda_id, neto in zip(df["deuda_id"], netos):
+        flujos = cuotas[deuda_id]
+        k = np.arange(1, len(flujos) + 1)
+        tasas.append(
+            brentq(
+                lambda r: (flujos / (1 + r) ** k).sum() - neto, -0.5, 1.0, xtol=1e-14
+            )
+        )
+    return np.array(tasas), time.perf_counter() - inicio
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    muestra = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    df = generar_deudas_vectorizado(num_deudas, semilla=7)
+
+    print("=" * 70)
+    print(f"TASA EFECTIVA ({num_deudas:,} deudas)")
+    print("=" * 70)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tasas = tasas_efectivas(df)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Vectorizado:     {segundos:.1f} s ({num_deudas / segundos:,.0f} deudas/s)")
+    print(f"                 memoria pico {pico / 1024**2:,.0f} MB")
+    print(f"                 convergieron {tasas['convergio'].mean():.4%}")
+    print(
+        f"                 iteraciones media {tasas['iteraciones'].mean():.2f}, "
+        f"máximo {tasas['iteraciones'].max()}"
+    )
+
+    referencia, segundos_muestra = tasas_una_por_una(df.head(muestra))
+    desvio = np.abs(referencia - tasas["tasa_efectiva_periodo"].head(muestra)).max()
+    estimado = segundos_muestra / muestra * num_deudas
+    print(f"brentq:          {muestra:,} deudas en {segundos_muestra:.2f} s")
+    print(f"                 estimado para la cartera {estimado:,.0f} s")
+    print(f"                 diferencia máxima de tasa {desvio:.2e}")
+
+    inicio = time.perf_counter()
+    evolucion = evolucion_por_anio(df.head(min(num_deudas, 200_000)))
+    segundos = time.perf_counter() - inicio
+    print(
+        f"Evolución anual: {min(num_deudas, 200_000):,} deudas en {segundos:.1f} s "
+        f"(saldo final {evolucion['saldo_final'].iloc[-1]:,.2f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
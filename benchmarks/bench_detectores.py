@@ -0,0 +1,64 @@
+"""
+BENCHMARK Y PRECISIÓN DE LOS DETECTORES DE ANOMALÍAS
+Inyecta anomalías etiquetadas en deudas y previsiones sintéticas y compara
+Isolation Forest (global y por segmento), LOF y z-score robusto: precisión,
+recall, precisión promedio, tiempos de ajuste y puntuación y memoria pico.
+Los resultados se guardan en data/metricas_detectores.json, de donde los
+toman los informes de auditoría.
+
+Uso:
+    python benchmarks/bench_detectores.py [--tamanos 10000,1000000,10000000]
+        [--detectores isolation_forest,lof] [--entidades deudas,previsiones]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from evaluacion_detectores import DETECTORES, RUTA_METRICAS, evaluar, guardar_metricas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="10000,1000000,10000000")
+    parser.add_argument("--detectores", default=",".join(DETECTORES))
+    parser.add_argument("--entidades", default="deudas,previsiones")
+    parser.add_argument("--salida", default=RUTA_METRICAS)
+    args = parser.parse_args()
+
+    tamanos = [int(t) for t in args.tamanos.split(",")]
+    detectores = args.detectores.split(",")
+    pd.set_option("display.width", 160)
+
+    resultados = []
+    for entidad in args.entidades.split(","):
+        resultado = evaluar(entidad, tamanos, detectores)
+        resultados.append(resultado)
+
+        print("=" * 70)
+        print(f"DETECTORES: {entidad.upper()}")
+        print("=" * 70)
+        columnas = [
+            "tamano",
+            "detector",
+            "precision",
+            "recall",
+            "precision_promedio",
+            "segundos_ajuste",
+            "segundos_puntaje",
+            "filas_por_segundo",
+            "memoria_pico_mb",
+        ]
+        print(resultado[columnas].round(3).to_string(index=False))
+        print()
+
+    guardar_metricas(pd.concat(resultados, ignore_index=True), args.salida)
+    print(f"Métricas guardadas en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+BENCHMARK DE DEVENGAMIENTO DE INTERESES
+Compara el devengamiento por convención de días (ACT/365, ACT/360, 30/360 y
+ACT/ACT) entre fechas arbitrarias por instrumento con la fórmula anterior
+(monto_original * tasa * días / 365.25) y con un cálculo fila por fila con
+`datetime.date` sobre una muestra, que además sirve de control.
+
+Uso:
+    python benchmarks/bench_devengamiento.py [num_deudas] [muestra_filas]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import intereses_entre_fechas
+from devengamiento import CONVENCIONES, codigos_convencion, devengar
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES, generar_deudas_vectorizado
+
+
+def _fraccion_fila(desde, hasta, convencion):
+    """Fracción de año de una fila con aritmética de `date`"""
+    if convencion == "ACT/365":
+        return (hasta - desde).days / 365
+    if convencion == "ACT/360":
+        return (hasta - desde).days / 360
+    if convencion == "30/360":
+        d1 = min(desde.day, 30)
+        d2 = 30 if hasta.day == 31 and d1 == 30 else hasta.day
+        return (
+            360 * (hasta.year - desde.year) + 30 * (hasta.month - desde.month) + d2 - d1
+        ) / 360
+    total = 0.0
+    actual = desde
+    while actual < hasta:
+        fin_anio = min(hasta, actual.replace(year=actual.year + 1, month=1, day=1))
+        largo = 366 if actual.year % 4 == 0 and actual.year % 100 != 0 else 365
+        largo = 366 if actual.year % 400 == 0 else largo
+        total += (fin_anio - actual).days / largo
+        actual = fin_anio
+    return total
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    muestra = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    df = generar_deudas_vectorizado(
+        num_deudas, semilla=7, fecha_referencia=FECHA_REFERENCIA_PREVISIONES
+    )
+    rng = np.random.default_rng(3)
+    emision = df["fecha_emision"].to_numpy(dtype="datetime64[D]")
+    desde = emision + rng.integers(0, 365, num_deudas).astype("timedelta64[D]")
+    hasta = desde + rng.integers(1, 3 * 365, num_deudas).astype("timedelta64[D]")
+    convencion = codigos_convencion(df)
+    capital = df["monto_original"].to_numpy(dtype="float64")
+    tasa = df["tasa_interes_anual"].to_numpy(dtype="float64")
+
+    print("=" * 70)
+    print(f"DEVENGAMIENTO ({num_deudas:,} deudas, fechas arbitrarias por deuda)")
+    print("=" * 70)
+
+    inicio = time.perf_counter()
+    anterior = capital * tasa * (hasta - desde).astype("int64") / 365.25
+    segundos_anterior = time.perf_counter() - inicio
+    print(f"Fórmula anterior (días / 365.25):  {segundos_anterior:.2f} s")
+
+    inicio = time.perf_counter()
+    simple = devengar(capital, tasa, desde, hasta, convencion)
+    segundos_simple = time.perf_counter() - inicio
+    print(f"Por convención, interés simple:    {segundos_simple:.2f} s")
+
+    inicio = time.perf_counter()
+    devengar(capital, tasa, desde, hasta, convencion, capitalizaciones_por_anio=12)
+    segundos_compuesto = time.perf_counter() - inicio
+    print(f"Por convención, capitalización 12: {segundos_compuesto:.2f} s")
+
+    filas = rng.choice(num_deudas, size=min(muestra, num_deudas), replace=False)
+    desde_filas = pd.to_datetime(desde[filas]).date
+    hasta_filas = pd.to_datetime(hasta[filas]).date
+    nombres = np.asarray(CONVENCIONES)[convencion[filas]]
+    inicio = time.perf_counter()
+    por_fila = np.array(
+        [
+            capital[i] * tasa[i] * _fraccion_fila(d, h, c)
+            for i, d, h, c in zip(filas, desde_filas, hasta_filas, nombres)
+        ]
+    )
+    segundos_fila = (time.perf_counter() - inicio) * num_deudas / len(filas)
+    print(
+        f"Fila por fila con date (estimado): {segundos_fila:.1f} s "
+        f"(x{segundos_fila / segundos_simple:.0f})"
+    )
+    print(
+        f"                                   diferencia máxima en la muestra "
+        f"${np.abs(simple[filas] - por_fila).max():.2e}"
+    )
+
+    print("-" * 70)
+    for codigo, nombre in enumerate(CONVENCIONES):
+        propias = convencion == codigo
+        if propias.any():
+            desvio = simple[propias].sum() / anterior[propias].sum() - 1
+            print(f"{nombre:8} vs fórmula anterior: {desvio:+.3%} del interés")
+
+    inicio = time.perf_counter()
+    cronograma = intereses_entre_fechas(df, "2023-01-01", "2023-12-31")
+    print(
+        f"Sobre el saldo del cronograma (ejercicio 2023): "
+        f"{time.perf_counter() - inicio:.2f} s, ${cronograma.sum():,.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+BENCHMARK DE ESCENARIOS DE ESTRÉS
+Mide la simulación Monte Carlo de shocks de tasa e incumplimientos en lote
+(matrices caminos x deudas por bloques) con 1 proceso y con todos los
+núcleos, y la compara con simular camino por camino sobre toda la cartera
+(estimado sobre una muestra de caminos). Verifica además que el resultado
+no cambie con la cantidad de procesos ni con `tamano_bloque_celdas`.
+
+Uso:
+    python benchmarks/bench_estres.py [num_deudas] [caminos]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from amortizacion import TAMANO_BLOQUE_CELDAS
+from escenarios_estres import Escenario, cartera_estres, simular_estres
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES, generar_deudas_vectorizado
+
+
+def _camino_por_camino(cartera, escenario, caminos, semilla=0):
+    """Un camino a la vez: vectorizado sobre las deudas, no sobre los caminos"""
+    rng = np.random.default_rng(semilla)
+    tipo, tasa = cartera["tipo"], cartera["tasa"]
+    corriente, no_corriente = cartera["corriente"], cartera["no_corriente"]
+    cantidad_tipos = len(cartera["tipos"])
+    sigma = escenario.volatilidad_sistemica
+    totales = []
+    for _ in range(caminos):
+        z_tasa, z_otro = rng.standard_normal(2)
+        z_sistemico = (
+            escenario.correlacion * z_tasa
+            + np.sqrt(1 - escenario.correlacion**2) * z_otro
+        )
+        shock = escenario.media_shock_tasa + escenario.desvio_shock_tasa * z_tasa
+        factor = np.exp(sigma * z_sistemico - sigma**2 / 2)
+        probabilidad = np.minimum(cartera["probabilidad"] * factor, 1.0)
+        sorteo = rng.random(len(tipo))
+        incumplida = sorteo < probabilidad
+        resto_anio = np.where(
+            incumplida, 1.0 - sorteo / np.where(probabilidad > 0, probabilidad, 1), 0
+        )
+        estresada = np.maximum(tasa + shock, 0.0)
+        intereses = (
+            cartera["saldo"] * tasa
+            + corriente * (estresada - tasa) / 2
+            + resto_anio
+            * no_corriente
+            * (estresada - tasa + escenario.recargo_incumplimiento)
+        )
+        totales.append(np.bincount(tipo, weights=intereses, minlength=cantidad_tipos))
+    return np.array(totales)
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    caminos = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    df = generar_deudas_vectorizado(
+        num_deudas, semilla=7, fecha_referencia=FECHA_REFERENCIA_PREVISIONES
+    )
+    fecha_cierre = FECHA_REFERENCIA_PREVISIONES
+    escenario = Escenario()
+    cartera = cartera_estres(df, fecha_cierre, escenario)
+    nucleos = os.cpu_count() or 1
+
+    print("=" * 70)
+    print(
+        f"ESTRÉS MONTE CARLO ({len(cartera['saldo']):,} deudas con saldo x "
+        f"{caminos:,} caminos, {nucleos} núcleos)"
+    )
+    print("=" * 70)
+
+    inicio = time.perf_counter()
+    uno = simular_estres(df, fecha_cierre, escenario, caminos, max_workers=1)
+    segundos_uno = time.perf_counter() - inicio
+    celdas = uno.deudas * uno.caminos
+    print(
+        f"En lote, 1 proceso:            {segundos_uno:.1f} s "
+        f"({celdas / segundos_uno / 1e6:,.0f} M celdas/s)"
+    )
+
+    inicio = time.perf_counter()
+    todos = simular_estres(df, fecha_cierre, escenario, caminos, max_workers=nucleos)
+    segundos_todos = time.perf_counter() - inicio
+    iguales = all(
+        np.array_equal(getattr(uno, m), getattr(todos, m))
+        for m in ("costo_intereses", "refinanciamiento", "incumplimientos")
+    )
+    etiqueta = f"En lote, {nucleos} procesos:"
+    print(
+        f"{etiqueta:31}{segundos_todos:.1f} s (x{segundos_uno / segundos_todos:.1f}; "
+        f"{'mismo resultado' if iguales else 'RESULTADO DISTINTO'})"
+    )
+
+    otro_bloque = simular_estres(
+        df,
+        fecha_cierre,
+        escenario,
+        caminos,
+        max_workers=1,
+        tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS // 7,
+    )
+    iguales_bloque = np.array_equal(
+        uno.incumplimientos, otro_bloque.incumplimientos
+    ) and all(
+        np.allclose(getattr(uno, m), getattr(otro_bloque, m), rtol=1e-9)
+        for m in ("costo_intereses", "refinanciamiento")
+    )
+    print(
+        f"Bloques de celdas / 7:         "
+        f"{'mismo resultado' if iguales_bloque else 'RESULTADO DISTINTO'}"
+    )
+
+    muestra = min(caminos, 50)
+    inicio = time.perf_counter()
+    por_camino = _camino_por_camino(cartera, escenario, muestra)
+    segundos_camino = (time.perf_counter() - inicio) * caminos / muestra
+    print(
+        f"Camino por camino (estimado):  {segundos_camino:.1f} s "
+        f"(x{segundos_camino / segundos_uno:.1f} contra 1 proceso)"
+    )
+    media_lote = uno.total("costo_intereses").mean()
+    media_camino = por_camino.sum(axis=1).mean()
+    print(
+        f"                               costo medio de intereses "
+        f"{media_camino / media_lote - 1:+.2%} contra el lote ({muestra} caminos)"
+    )
+
+    print("-" * 70)
+    print(uno.percentiles("costo_intereses").map(lambda x: f"{x:,.0f}").to_string())
+
+
+if __name__ == "__main__":
+    main()
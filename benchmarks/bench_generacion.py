@@ -0,0 +1,80 @@
+"""
+BENCHMARK DE GENERACIÓN DE DATOS
+Mide filas por segundo del generador vectorizado y las compara con el
+objetivo documentado en generacion_datos.py.
+
+Uso:
+    python benchmarks/bench_generacion.py [num_filas]
+"""
+
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generacion_datos import (
+    OBJETIVO_FILAS_POR_SEGUNDO,
+    generar_deudas_vectorizado,
+    generar_paralelo,
+    generar_previsiones_vectorizado,
+)
+
+
+def medir(funcion, num_filas, repeticiones=3):
+    """Devuelve las filas por segundo de la mejor de varias ejecuciones"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(num_filas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return num_filas / mejor
+
+
+def main():
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 70)
+    print(f"BENCHMARK DE GENERACIÓN ({num_filas:,} filas)")
+    print("=" * 70)
+
+    filas_por_segundo = medir(
+        lambda n: generar_deudas_vectorizado(
+            num_deudas=n, fecha_referencia="2025-07-10"
+        ),
+        num_filas,
+    )
+    estado = "✅" if filas_por_segundo >= OBJETIVO_FILAS_POR_SEGUNDO else "❌"
+    print(
+        f"{estado} Deudas (vectorizado): {filas_por_segundo:,.0f} filas/s "
+        f"(objetivo {OBJETIVO_FILAS_POR_SEGUNDO:,})"
+    )
+
+    filas_por_segundo = medir(
+        lambda n: generar_previsiones_vectorizado(num_previsiones=n), num_filas
+    )
+    print(f"ℹ️  Previsiones (vectorizado): {filas_por_segundo:,.0f} filas/s")
+
+    # Escalado del modo paralelo: idealmente lineal en la cantidad de procesos
+    print("-" * 70)
+    base = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        funcion = partial(
+            generar_paralelo,
+            "deudas",
+            fecha_referencia="2025-07-10",
+            max_workers=workers,
+        )
+        filas_por_segundo = medir(funcion, num_filas, repeticiones=1)
+        base = base or filas_por_segundo
+        print(
+            f"ℹ️  Paralelo ({workers:>2} procesos): {filas_por_segundo:,.0f} filas/s "
+            f"(x{filas_por_segundo / base:.1f})"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+BENCHMARK DE TIEMPO DE ARRANQUE
+Mide con `python -X importtime` el costo de importar cada módulo del
+proyecto en un intérprete limpio y verifica que las dependencias pesadas
+(scikit-learn, matplotlib, seaborn, Faker, PyPDF2, reportlab) no se carguen
+en el arranque. Termina con código 1 si hay una regresión, para poder
+usarlo en integración continua.
+
+Uso:
+    python benchmarks/bench_importacion.py [--repeticiones N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulo -> presupuesto de importación en milisegundos (mediana)
+PRESUPUESTOS_MS = {
+    "motor_analisis": 1500,
+    "generar_informes_pdf": 100,
+    "Pasivo_no_corriente_app": 3000,
+}
+
+DEPENDENCIAS_DIFERIDAS = [
+    "sklearn",
+    "matplotlib",
+    "seaborn",
+    "faker",
+    "PyPDF2",
+    "reportlab",
+]
+
+
+def medir_importacion(modulo):
+    """
+    Importa el módulo en un subproceso con -X importtime
+
+    Returns:
+        tuple: (milisegundos acumulados del módulo, dependencias diferidas
+        que quedaron cargadas)
+    """
+    codigo = (
+        f"import sys, {modulo}; "
+        f"print(','.join(m for m in {DEPENDENCIAS_DIFERIDAS!r} if m in sys.modules))"
+    )
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Formato de cada línea: "import time: self [us] | cumulative | paquete"
+    acumulado_us = 0
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            acumulado_us = int(partes[1])
+    cargadas = [m for m in proceso.stdout.strip().split(",") if m]
+    return acumulado_us / 1000, cargadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("TIEMPO DE IMPORTACIÓN (python -X importtime, intérprete limpio)")
+    print("=" * 70)
+
+    regresiones = []
+    for modulo, presupuesto in PRESUPUESTOS_MS.items():
+        mediciones = []
+        cargadas = []
+        for _ in range(args.repeticiones):
+            ms, cargadas = medir_importacion(modulo)
+            mediciones.append(ms)
+        mediana = sorted(mediciones)[len(mediciones) // 2]
+
+        estado = "OK"
+        if mediana > presupuesto:
+            estado = "LENTO"
+            regresiones.append(f"{modulo}: {mediana:.0f} ms > {presupuesto} ms")
+        if cargadas:
+            estado = "EAGER"
+            regresiones.append(
+                f"{modulo} importa en el arranque: {', '.join(cargadas)}"
+            )
+        print(
+            f"{modulo:<28} {mediana:9.1f} ms  (presupuesto {presupuesto:>5} ms)  {estado}"
+        )
+
+    if regresiones:
+        print("\nRegresiones detectadas:")
+        for regresion in regresiones:
+            print(f"  - {regresion}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
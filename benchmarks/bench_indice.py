@@ -0,0 +1,88 @@
+"""
+BENCHMARK DEL ÍNDICE DE INTERVALOS
+Compara las consultas "vigentes al" del índice con el recorrido completo de
+la cartera (comparar fecha_emision y fecha_vencimiento de cada fila): cierres
+de los ejercicios 2020-2024 en lote, una fecha suelta y conteos diarios de
+cinco años.
+
+Uso:
+    python benchmarks/bench_indice.py [num_deudas]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES, generar_deudas_vectorizado
+from indice_intervalos import IndiceIntervalos
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    df = generar_deudas_vectorizado(
+        num_deudas, semilla=7, fecha_referencia=FECHA_REFERENCIA_PREVISIONES
+    )
+    emision = df["fecha_emision"].to_numpy()
+    vencimiento = df["fecha_vencimiento"].to_numpy()
+
+    def recorrido(fecha):
+        fecha = np.datetime64(pd.Timestamp(fecha))
+        return np.flatnonzero((emision <= fecha) & (vencimiento >= fecha))
+
+    print("=" * 70)
+    print(f"ÍNDICE DE INTERVALOS ({num_deudas:,} deudas)")
+    print("=" * 70)
+
+    indice, segundos = medir(lambda: IndiceIntervalos.desde_dataframe(df, "deudas"))
+    print(
+        f"Construcción:    {segundos:.2f} s "
+        f"({len(indice._centros)} nodos, profundidad {indice.profundidad})"
+    )
+
+    cierres = pd.to_datetime([f"{anio}-12-31" for anio in range(2020, 2025)])
+    lote, segundos_indice = medir(lambda: indice.vigentes_en_fechas(cierres))
+    completos, segundos_recorrido = medir(lambda: [recorrido(c) for c in cierres])
+    iguales = all(
+        np.array_equal(np.sort(lote.de(i)), esperado)
+        for i, esperado in enumerate(completos)
+    )
+    print(
+        f"Cierres 2020-24: índice {segundos_indice:.3f} s, recorrido "
+        f"{segundos_recorrido:.3f} s ({lote.cantidades.sum():,} filas, "
+        f"{'iguales' if iguales else 'DIFERENTES'})"
+    )
+
+    fecha = "2021-12-31"
+    _, segundos_indice = medir(lambda: indice.vigentes(fecha))
+    _, segundos_recorrido = medir(lambda: recorrido(fecha))
+    print(
+        f"Una fecha:       índice {segundos_indice:.3f} s, "
+        f"recorrido {segundos_recorrido:.3f} s"
+    )
+
+    dias = pd.date_range("2020-01-01", "2024-12-31", freq="D")
+    conteos, segundos_indice = medir(lambda: indice.cantidad_vigentes(dias))
+    muestra = dias[::90]
+    _, segundos_muestra = medir(lambda: [len(recorrido(d)) for d in muestra])
+    estimado = segundos_muestra / len(muestra) * len(dias)
+    print(
+        f"Conteo diario:   {len(dias):,} fechas, índice {segundos_indice:.3f} s, "
+        f"recorrido estimado {estimado:.1f} s"
+    )
+    esperado = [len(recorrido(d)) for d in muestra]
+    print(f"                 conteos iguales: {list(conteos[::90]) == esperado}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+BENCHMARK DE INGESTA CON FORMATO ARGENTINO
+Escribe un extracto CSV con ";" como separador de campos, "," decimal, "."
+de miles y fechas dd/mm/aaaa, lo ingiere con `cargar_archivo` y controla que
+no haya rechazos y que los importes coincidan con los generados.
+
+Uso:
+    python benchmarks/bench_ingesta.py [num_filas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from esquema_datos import obtener_esquema
+from generacion_datos import (
+    FECHA_REFERENCIA_PREVISIONES,
+    generar_deudas_vectorizado,
+    generar_previsiones_vectorizado,
+)
+from ingesta_datos import cargar_archivo
+
+
+def _numero_argentino(valores, decimales):
+    """1234567.891 -> "1.234.567,89" """
+    return [
+        f"{valor:,.{decimales}f}".replace(",", "_").replace(".", ",").replace("_", ".")
+        for valor in valores
+    ]
+
+
+def extracto_argentino(df, entidad):
+    """Columnas del esquema con el formato habitual de un ERP local"""
+    extracto = pd.DataFrame(index=df.index)
+    for columna, (tipo_logico, _) in obtener_esquema(entidad).items():
+        if columna not in df.columns:
+            continue
+        if tipo_logico == "monto":
+            extracto[columna] = _numero_argentino(df[columna], 2)
+        elif tipo_logico == "decimal":
+            extracto[columna] = _numero_argentino(df[columna], 6)
+        elif tipo_logico == "fecha":
+            extracto[columna] = df[columna].dt.strftime("%d/%m/%Y")
+        else:
+            extracto[columna] = df[columna].astype(str)
+    return extracto
+
+
+def main():
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print("=" * 70)
+    print(f"INGESTA CSV CON COMA DECIMAL ({num_filas:,} filas por entidad)")
+    print("=" * 70)
+
+    correcto = True
+    with tempfile.TemporaryDirectory() as directorio:
+        for entidad, df in (
+            (
+                "deudas",
+                generar_deudas_vectorizado(
+                    num_filas, fecha_referencia=FECHA_REFERENCIA_PREVISIONES
+                ),
+            ),
+            ("previsiones", generar_previsiones_vectorizado(num_filas)),
+        ):
+            ruta = os.path.join(directorio, f"{entidad}.csv")
+            extracto_argentino(df, entidad).to_csv(ruta, sep=";", index=False)
+
+            inicio = time.perf_counter()
+            resultado = cargar_archivo(
+                ruta,
+                entidad,
+                separador=";",
+                formato_fecha="%d/%m/%Y",
+                separador_decimal=",",
+            )
+            segundos = time.perf_counter() - inicio
+
+            montos = [
+                c
+                for c, (tipo, _) in obtener_esquema(entidad).items()
+                if tipo == "monto" and c in df.columns
+            ]
+            diferencia = np.inf
+            if len(resultado.datos) == len(df):
+                diferencia = max(
+                    np.abs(
+                        resultado.datos[c].to_numpy(dtype="float64")
+                        - np.round(df[c].to_numpy(dtype="float64"), 2)
+                    ).max()
+                    for c in montos
+                )
+            ok = len(resultado.rechazos) == 0 and len(resultado.datos) == len(df)
+            ok = ok and diferencia < 0.005
+            correcto = correcto and ok
+            print(
+                f"{entidad:12} {segundos:.2f} s ({len(df) / segundos:,.0f} filas/s), "
+                f"{len(resultado.rechazos):,} rechazos, diferencia máxima en "
+                f"importes {diferencia:.3f}: {'OK' if ok else 'ERROR'}"
+            )
+
+    if not correcto:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
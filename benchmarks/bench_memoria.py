@@ -0,0 +1,53 @@
+"""
+REPORTE DE MEMORIA POR COLUMNA
+Compara la representación original (textos como object, fechas como objetos
+`date` de Python, importes float64) con la representación compacta.
+
+Uso:
+    python benchmarks/bench_memoria.py [num_filas] [float64|float32|centavos]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from generacion_datos import generar_deudas_vectorizado, generar_previsiones_vectorizado
+from representacion_compacta import compactar, reporte_memoria
+
+
+def representacion_original(df):
+    """Reproduce los tipos del generador clásico: object y `date` de Python"""
+    original = df.copy()
+    for columna in original.columns:
+        if pd.api.types.is_datetime64_any_dtype(original[columna]):
+            original[columna] = original[columna].dt.date.astype(object)
+        elif not pd.api.types.is_numeric_dtype(original[columna]):
+            original[columna] = original[columna].astype(object)
+    return original
+
+
+def main():
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tipo_montos = sys.argv[2] if len(sys.argv) > 2 else "float32"
+    pd.set_option("display.width", 140)
+
+    for entidad, generador in (
+        ("deudas", generar_deudas_vectorizado),
+        ("previsiones", generar_previsiones_vectorizado),
+    ):
+        original = representacion_original(generador(num_filas))
+        compacto = compactar(original, entidad, tipo_montos)
+        reporte = reporte_memoria(original, compacto)
+
+        print("=" * 70)
+        print(f"MEMORIA: {entidad.upper()} ({num_filas:,} filas, montos {tipo_montos})")
+        print("=" * 70)
+        print(reporte.to_string())
+        print()
+
+
+if __name__ == "__main__":
+    main()
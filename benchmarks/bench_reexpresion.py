@@ -0,0 +1,93 @@
+"""
+BENCHMARK DE REEXPRESIÓN (RT 6)
+Reexpresa una cartera sintética a varias fechas de cierre con el arreglo de
+coeficientes por desplazamiento de mes (una indexación y una multiplicación
+por cierre) y lo compara con recalcular en cada cierre el período de cada
+registro y buscar su índice, que además sirve de control.
+
+Uso:
+    python benchmarks/bench_reexpresion.py [num_registros] [cierres]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from reexpresion import serie_por_defecto
+
+CIERRE_FINAL = pd.Timestamp("2024-12-31")
+
+
+def main():
+    num_registros = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    serie = serie_por_defecto()
+    rng = np.random.default_rng(7)
+    primer_dia = np.datetime64("2005-01-01", "D")
+    dias = (np.datetime64(CIERRE_FINAL.date(), "D") - primer_dia).astype("int64")
+    fechas = primer_dia + rng.integers(0, dias + 1, num_registros).astype(
+        "timedelta64[D]"
+    )
+    montos = np.round(rng.uniform(1e5, 1e7, num_registros), 2)
+    cierres = pd.date_range(end=CIERRE_FINAL, periods=cantidad, freq="YE")
+
+    print("=" * 70)
+    print(f"REEXPRESIÓN RT 6 ({num_registros:,} registros x {cantidad} cierres)")
+    print("=" * 70)
+
+    inicio = time.perf_counter()
+    desplazamientos = serie.desplazamientos(fechas)
+    segundos_desplazamientos = time.perf_counter() - inicio
+    print(f"Desplazamientos (una vez):        {segundos_desplazamientos:.2f} s")
+
+    inicio = time.perf_counter()
+    reexpresados = [serie.reexpresar(montos, desplazamientos, c) for c in cierres]
+    segundos_lote = time.perf_counter() - inicio
+    print(
+        f"Indexar y multiplicar por cierre: {segundos_lote:.2f} s "
+        f"({segundos_lote / cantidad:.3f} s por cierre)"
+    )
+
+    # Período e índice de origen buscados de nuevo en cada cierre
+    periodos = pd.period_range(
+        serie.primer_periodo, serie.ultimo_periodo, freq="M"
+    ).to_timestamp()
+    indice_por_mes = pd.Series(serie.indices, index=periodos)
+    origen = pd.Series(fechas)
+    inicio = time.perf_counter()
+    recalculados = []
+    for cierre in cierres:
+        meses = origen.dt.to_period("M").dt.to_timestamp()
+        indice_origen = meses.map(indice_por_mes).to_numpy()
+        indice_cierre = indice_por_mes[cierre.to_period("M").to_timestamp()]
+        vigentes = (meses <= cierre).to_numpy()
+        recalculados.append(
+            np.where(vigentes, montos * indice_cierre / indice_origen, 0)
+        )
+    segundos_recalculo = time.perf_counter() - inicio
+    control = max(
+        (np.abs(a - b) / np.maximum(b, 1.0)).max()
+        for a, b in zip(reexpresados, recalculados)
+    )
+    print(
+        f"Recalcular período e índice:      {segundos_recalculo:.2f} s "
+        f"(x{segundos_recalculo / (segundos_desplazamientos + segundos_lote):.0f}, "
+        f"diferencia relativa máxima {control:.1e})"
+    )
+
+    print("-" * 70)
+    for cierre, reexpresado in zip(cierres, reexpresados):
+        originados = montos[reexpresado > 0].sum()
+        print(
+            f"{cierre:%d/%m/%Y}: histórico ${originados:,.0f} -> "
+            f"reexpresado ${reexpresado.sum():,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+BENCHMARK DE REVALUACIÓN EN MONEDA EXTRANJERA Y UVA
+Mide la revaluación de toda la cartera a una fecha (as-of por deuda a la
+emisión) y la clasificación corriente / no corriente en pesos a muchos
+cierres, contra la misma cartera toda en pesos y contra una búsqueda fila
+por fila de la cotización (estimada sobre una muestra).
+
+Uso:
+    python benchmarks/bench_revaluacion.py [num_deudas] [cierres]
+"""
+
+import os
+import sys
+import time
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from clasificacion_corriente import clasificar_a_fechas, fechas_cierre_mensuales
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES, generar_deudas_vectorizado
+from revaluacion import (
+    MONEDAS,
+    cargar_cotizaciones,
+    codigos_moneda,
+    cotizaciones_por_moneda,
+    revaluar_a_fecha,
+)
+
+
+def main():
+    num_deudas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 36
+    df = generar_deudas_vectorizado(
+        num_deudas, semilla=7, fecha_referencia=FECHA_REFERENCIA_PREVISIONES
+    )
+    cierres = fechas_cierre_mensuales(FECHA_REFERENCIA_PREVISIONES, cantidad)
+
+    print("=" * 70)
+    print(f"REVALUACIÓN ({num_deudas:,} deudas x {cantidad} cierres)")
+    print("=" * 70)
+    print(df["moneda"].value_counts().to_string())
+    print("-" * 70)
+
+    inicio = time.perf_counter()
+    revaluacion = revaluar_a_fecha(df, FECHA_REFERENCIA_PREVISIONES)
+    print(f"Revaluación a una fecha:        {time.perf_counter() - inicio:.2f} s")
+    print(
+        f"                                diferencia de cambio "
+        f"${revaluacion['diferencia_cambio'].sum():,.2f}"
+    )
+
+    inicio = time.perf_counter()
+    en_pesos = clasificar_a_fechas(df, cierres, agrupar_por="moneda")
+    segundos_monedas = time.perf_counter() - inicio
+    print(f"Cierres por moneda (en lote):   {segundos_monedas:.1f} s")
+
+    inicio = time.perf_counter()
+    clasificar_a_fechas(df.drop(columns="moneda"), cierres, agrupar_por="tipo_deuda")
+    segundos_pesos = time.perf_counter() - inicio
+    print(
+        f"Misma cartera sin monedas:      {segundos_pesos:.1f} s "
+        f"(revaluación +{segundos_monedas / segundos_pesos - 1:.0%})"
+    )
+
+    # Cotización de cada deuda a cada cierre buscada fila por fila
+    cotizaciones = cargar_cotizaciones()
+    series = {
+        moneda: (
+            grupo["fecha"].to_numpy("datetime64[ns]").astype("int64").tolist(),
+            grupo["valor"].to_numpy().tolist(),
+        )
+        for moneda, grupo in cotizaciones.groupby("moneda", observed=True)
+    }
+    codigos = codigos_moneda(df)
+    muestra = np.random.default_rng(3).choice(num_deudas, min(20_000, num_deudas))
+    fechas = cierres.to_numpy("datetime64[ns]").astype("int64").tolist()
+    inicio = time.perf_counter()
+    por_fila = []
+    for moneda in np.asarray(MONEDAS)[codigos[muestra]]:
+        for fecha in fechas:
+            if moneda == "ARS":
+                por_fila.append(1.0)
+                continue
+            dias, valores = series[moneda]
+            por_fila.append(valores[bisect_right(dias, fecha) - 1])
+    segundos_fila = (time.perf_counter() - inicio) * num_deudas / len(muestra)
+    tabla = cotizaciones_por_moneda(cierres, codigos)
+    control = np.abs(tabla[codigos[muestra]].ravel() - np.asarray(por_fila)).max()
+    print(
+        f"Cotizaciones fila por fila:     {segundos_fila:.1f} s estimados solo "
+        f"para buscarlas (diferencia máxima {control:.1e})"
+    )
+
+    ultimo = en_pesos[en_pesos["fecha_cierre"] == en_pesos["fecha_cierre"].max()]
+    print("-" * 70)
+    print(ultimo[["moneda", "saldo", "corriente", "no_corriente"]].to_string())
+
+
+if __name__ == "__main__":
+    main()
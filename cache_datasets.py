@@ -0,0 +1,159 @@
+"""
+CACHÉ PERSISTENTE DE DATASETS
+Guarda en disco (Feather sin compresión) los datasets generados o
+ingeridos, con una clave construida a partir de los parámetros que los
+determinan. La caché sobrevive a reinicios y despliegues, puede compartirse
+entre réplicas que monten el mismo directorio y se lee con memory-map.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+
+DIRECTORIO_CACHE = os.environ.get("PASIVO_CACHE_DIR", "data/cache")
+LIMITE_BYTES_CACHE = int(os.environ.get("PASIVO_CACHE_LIMITE_BYTES", 4 * 1024**3))
+# Se incrementa cuando cambia el contenido generado para los mismos parámetros
+VERSION_FORMATO = 6
+
+_EXTENSION = ".feather"
+_CLAVE_ATTRS = b"pasivo_attrs"
+
+
+def huella_archivo(ruta, bytes_muestra=1024 * 1024):
+    """
+    Calcula una huella rápida de un archivo de origen
+
+    Combina tamaño, fecha de modificación y el hash del primer y último
+    megabyte, sin leer el archivo completo.
+    """
+    estado = os.stat(ruta)
+    sha = hashlib.sha256(f"{estado.st_size}:{estado.st_mtime_ns}".encode())
+    with open(ruta, "rb") as archivo:
+        sha.update(archivo.read(bytes_muestra))
+        if estado.st_size > bytes_muestra:
+            archivo.seek(max(estado.st_size - bytes_muestra, bytes_muestra))
+            sha.update(archivo.read(bytes_muestra))
+    return sha.hexdigest()
+
+
+def clave_dataset(**parametros):
+    """
+    Construye la clave de caché a partir de los parámetros del dataset
+
+    Ejemplo: clave_dataset(entidad="deudas", semilla=1011, filas=10**6,
+    fecha_referencia="2025-07-10", modo="vectorizado")
+    """
+    normalizados = {k: str(v) for k, v in sorted(parametros.items())}
+    normalizados["_version"] = str(VERSION_FORMATO)
+    texto = json.dumps(normalizados, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32]
+
+
+class CacheDatasets:
+    """
+    Caché de DataFrames en disco con desalojo LRU acotado por tamaño
+
+    La recencia de uso se registra en la fecha de modificación de cada
+    archivo, de modo que varios procesos o réplicas comparten el mismo
+    criterio de desalojo sin coordinación adicional.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, limite_bytes=LIMITE_BYTES_CACHE):
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}{_EXTENSION}")
+
+    def obtener(self, clave):
+        """
+        Devuelve el DataFrame cacheado o None si no existe
+
+        Con `split_blocks` cada columna queda en su propio bloque y las
+        numéricas y de fecha sin nulos son vistas de solo lectura sobre el
+        archivo mapeado, sin copiarlas; las que pandas debe convertir (con
+        nulos o categóricas) sí se copian. Un archivo corrupto o truncado se
+        trata como ausente y se borra, para que se regenere.
+        """
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        ruta = self._ruta(clave)
+        try:
+            tabla = feather.read_table(ruta, memory_map=True)
+            df = tabla.to_pandas(split_blocks=True)
+        except FileNotFoundError:
+            return None
+        except (pa.ArrowInvalid, OSError):
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+
+        metadatos = tabla.schema.metadata or {}
+        if _CLAVE_ATTRS in metadatos:
+            df.attrs = json.loads(metadatos[_CLAVE_ATTRS])
+        return df
+
+    def guardar(self, clave, df):
+        """Guarda el DataFrame en forma atómica y aplica el desalojo LRU"""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        tabla = pa.Table.from_pandas(df)
+        metadatos = dict(tabla.schema.metadata or {})
+        metadatos[_CLAVE_ATTRS] = json.dumps(df.attrs).encode("utf-8")
+        tabla = tabla.replace_schema_metadata(metadatos)
+
+        ruta = self._ruta(clave)
+        ruta_temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+        feather.write_feather(tabla, ruta_temporal, compression="uncompressed")
+        os.replace(ruta_temporal, ruta)
+        self.desalojar()
+
+    def obtener_o_generar(self, clave, generar):
+        """Devuelve el dataset cacheado o lo genera con `generar()` y lo guarda"""
+        df = self.obtener(clave)
+        if df is None:
+            df = generar()
+            self.guardar(clave, df)
+        return df
+
+    def desalojar(self):
+        """Borra los archivos menos usados hasta quedar dentro del límite"""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(_EXTENSION):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                estado = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
+
+    def tamano_total(self):
+        """Bytes ocupados actualmente por la caché"""
+        return sum(
+            os.path.getsize(os.path.join(self.directorio, nombre))
+            for nombre in os.listdir(self.directorio)
+            if nombre.endswith(_EXTENSION)
+        )
@@ -0,0 +1,208 @@
+"""
+CLASIFICACIÓN CORRIENTE / NO CORRIENTE
+Separa el saldo de capital de cada deuda a una fecha de cierre en la porción
+que vence dentro de los doce meses siguientes (pasivo corriente) y la que
+vence después (pasivo no corriente), según el cronograma de `amortizacion`.
+
+El cálculo se difunde sobre una matriz deudas x fechas de cierre, por
+bloques de deudas, así que 60 cierres mensuales de toda la cartera son un
+único cálculo en lote y no 60 corridas. Las deudas en dólares o UVA se
+expresan en pesos a la cotización de cada cierre (`revaluacion`).
+"""
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import (
+    TAMANO_BLOQUE_CELDAS,
+    condiciones_deudas,
+    saldo_capital,
+    sumar_meses,
+)
+from representacion_compacta import montos_en_pesos
+from revaluacion import a_pesos, codigos_moneda, cotizaciones_por_moneda
+
+HORIZONTE_MESES = 12
+
+# Deudas en incumplimiento: el acreedor puede exigir el saldo completo
+ESTADOS_EXIGIBLES = ["Incumplida"]
+# Vencidas e impagas: el saldo registrado sigue adeudado y es exigible
+ESTADOS_IMPAGOS = ["Incumplida", "Refinanciada"]
+
+CIERRES_POR_DEFECTO = 60
+
+
+def fechas_cierre_mensuales(hasta, meses=CIERRES_POR_DEFECTO):
+    """Últimos días de los `meses` meses que terminan en el de `hasta`"""
+    fin = pd.Timestamp(hasta) + pd.offsets.MonthEnd(0)
+    return pd.date_range(end=fin, periods=meses, freq="ME")
+
+
+# =================================================================
+# CÁLCULO EN LOTE
+# =================================================================
+
+
+def _cartera(df):
+    """Arrays por deuda que usa la clasificación"""
+    df = montos_en_pesos(df, "deudas")
+    estados = (
+        df["estado_deuda"].astype(object)
+        if "estado_deuda" in df.columns
+        else pd.Series("", index=df.index)
+    )
+    return {
+        "condiciones": condiciones_deudas(df),
+        "vencimiento": pd.to_datetime(df["fecha_vencimiento"]).to_numpy(
+            dtype="datetime64[D]"
+        ),
+        "saldo_registrado": df["saldo_pendiente_simulado"]
+        .astype("float64")
+        .fillna(0.0)
+        .to_numpy(),
+        "exigible": estados.isin(ESTADOS_EXIGIBLES).to_numpy(),
+        "impaga": estados.isin(ESTADOS_IMPAGOS).to_numpy(),
+        "moneda": codigos_moneda(df),
+    }
+
+
+def _cotizaciones(cartera, cierres):
+    """Cotizaciones monedas x cierres, o None si toda la cartera es en pesos"""
+    if not cartera["moneda"].any():
+        return None
+    return cotizaciones_por_moneda(cierres, cartera["moneda"])
+
+
+def _porciones(cartera, filas, cierres, horizontes, cotizaciones=None):
+    """
+    Saldo, porción corriente y no corriente de las deudas `filas` a cada
+    fecha de cierre (matrices deudas x cierres), en pesos a la cotización
+    de cada cierre (`cotizaciones` de `_cotizaciones`)
+
+    - Deudas todavía no emitidas al cierre: cero.
+    - Deudas exigibles (incumplidas): todo el saldo es corriente.
+    - Deudas vencidas e impagas al cierre: el saldo registrado, corriente.
+    - Resto: la amortización de capital de los próximos doce meses es
+      corriente y el saldo a doce meses, no corriente.
+    """
+    c = {
+        clave: valor[filas, None] if np.ndim(valor) else valor
+        for clave, valor in cartera["condiciones"].items()
+    }
+    saldo = saldo_capital(c, cierres)
+    no_corriente = saldo_capital(c, horizontes)
+
+    emitida = c["emision"] <= cierres
+    vencida_impaga = cartera["impaga"][filas, None] & (
+        cartera["vencimiento"][filas, None] <= cierres
+    )
+    saldo = (
+        np.where(vencida_impaga, cartera["saldo_registrado"][filas, None], saldo)
+        * emitida
+    )
+    no_corriente = (
+        np.where(cartera["exigible"][filas, None] | vencida_impaga, 0.0, no_corriente)
+        * emitida
+    )
+    if cotizaciones is not None:
+        cotizacion = cotizaciones[cartera["moneda"][filas]]
+        saldo = a_pesos(saldo, cotizacion)
+        no_corriente = a_pesos(no_corriente, cotizacion)
+    return saldo, saldo - no_corriente, no_corriente
+
+
+def _bloques(n, cantidad_cierres, tamano_bloque_celdas):
+    paso = max(1, tamano_bloque_celdas // max(cantidad_cierres, 1))
+    for inicio in range(0, n, paso):
+        yield slice(inicio, min(inicio + paso, n))
+
+
+def _cierres_y_horizontes(fechas_cierre):
+    cierres = np.asarray(pd.to_datetime(np.ravel(fechas_cierre)), dtype="datetime64[D]")
+    horizontes = sumar_meses(cierres, HORIZONTE_MESES)
+    return cierres, horizontes
+
+
+def clasificar_a_fecha(df, fecha_cierre, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """
+    Clasificación de cada deuda a una fecha de cierre
+
+    Args:
+        df: Deudas con las columnas de `amortizacion.saldos_a_fecha`,
+            fecha_vencimiento, saldo_pendiente_simulado y estado_deuda
+        fecha_cierre: Fecha de cierre del ejercicio o del período
+
+    Returns:
+        pd.DataFrame: saldo_cierre, porcion_corriente y porcion_no_corriente
+        en pesos, alineado con `df`
+    """
+    cartera = _cartera(df)
+    cierres, horizontes = _cierres_y_horizontes(fecha_cierre)
+    cotizaciones = _cotizaciones(cartera, cierres)
+    resultado = np.zeros((len(df), 3))
+    for filas in _bloques(len(df), 1, tamano_bloque_celdas):
+        porciones = _porciones(
+            cartera, filas, cierres[None, :], horizontes[None, :], cotizaciones
+        )
+        resultado[filas] = np.column_stack([p[:, 0] for p in porciones])
+    return pd.DataFrame(
+        np.round(resultado, 2),
+        columns=["saldo_cierre", "porcion_corriente", "porcion_no_corriente"],
+        index=df.index,
+    )
+
+
+def clasificar_a_fechas(
+    df, fechas_cierre, agrupar_por=None, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS
+):
+    """
+    Totales corriente / no corriente de la cartera a varias fechas de cierre
+
+    Cada bloque de deudas se evalúa contra todas las fechas a la vez (matriz
+    deudas x cierres de a lo sumo `tamano_bloque_celdas` celdas) y se suma
+    por grupo antes de pasar al siguiente.
+
+    Args:
+        df: Deudas (ver `clasificar_a_fecha`)
+        fechas_cierre: Fechas de cierre (p. ej. `fechas_cierre_mensuales`)
+        agrupar_por: Columna opcional para abrir los totales (p. ej.
+            "tipo_deuda")
+
+    Returns:
+        pd.DataFrame: Una fila por fecha de cierre (y grupo) con saldo,
+        corriente y no_corriente en pesos y deudas_con_saldo
+    """
+    cartera = _cartera(df)
+    cierres, horizontes = _cierres_y_horizontes(fechas_cierre)
+    cotizaciones = _cotizaciones(cartera, cierres)
+    if agrupar_por is None:
+        codigos, grupos = np.zeros(len(df), dtype="int64"), None
+    else:
+        codigos, grupos = pd.factorize(df[agrupar_por], sort=True)
+    cantidad_grupos = 1 if grupos is None else len(grupos)
+
+    totales = np.zeros((4, cantidad_grupos, len(cierres)))
+    for filas in _bloques(len(df), len(cierres), tamano_bloque_celdas):
+        saldo, corriente, no_corriente = _porciones(
+            cartera, filas, cierres[None, :], horizontes[None, :], cotizaciones
+        )
+        pertenencia = np.zeros((cantidad_grupos, saldo.shape[0]))
+        pertenencia[codigos[filas], np.arange(saldo.shape[0])] = 1.0
+        for i, matriz in enumerate([saldo, corriente, no_corriente, saldo > 0]):
+            totales[i] += pertenencia @ matriz
+
+    columnas = ["saldo", "corriente", "no_corriente", "deudas_con_saldo"]
+    resultado = pd.DataFrame(
+        totales.reshape(4, -1).T,
+        columns=columnas,
+        index=pd.MultiIndex.from_product(
+            [range(cantidad_grupos), pd.DatetimeIndex(cierres, name="fecha_cierre")]
+        ),
+    )
+    resultado["deudas_con_saldo"] = resultado["deudas_con_saldo"].astype("int64")
+    if grupos is None:
+        return resultado.droplevel(0).reset_index()
+    resultado.index = resultado.index.set_levels(grupos, level=0).set_names(
+        agrupar_por, level=0
+    )
+    return resultado.swaplevel().sort_index().reset_index()
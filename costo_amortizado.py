@@ -0,0 +1,321 @@
+"""
+COSTO AMORTIZADO Y TASA EFECTIVA
+Valuación de las deudas a costo amortizado (RT 41 / NIIF 9): la tasa de
+interés efectiva (TIE) de cada instrumento es la que descuenta sus flujos
+contractuales al importe neto recibido (monto original menos costos de
+emisión y transacción), y el costo amortizado evoluciona devengando esa tasa
+sobre el saldo y restando los pagos.
+
+La TIE se resuelve para toda la cartera a la vez: iteraciones de Newton sobre
+la matriz de flujos (instrumentos x períodos) de cada bloque de
+`amortizacion.bloques_de_filas`, con un intervalo [inferior, superior] por
+instrumento que toma bisección cuando el paso de Newton sale de él, y una
+máscara de convergencia que excluye de las iteraciones siguientes a los
+instrumentos ya resueltos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import (
+    TAMANO_BLOQUE_CELDAS,
+    bloques_de_filas,
+    condiciones_deudas,
+    formato_largo,
+    ids_deudas,
+    matrices_cronograma,
+)
+from representacion_compacta import montos_en_pesos
+
+TOLERANCIA_TASA = 1e-12
+MAX_ITERACIONES = 100
+
+# Intervalo inicial de búsqueda de la tasa por período
+TASA_MINIMA = -0.99
+TASA_MAXIMA = 10.0
+
+
+@dataclass
+class SolucionTasas:
+    """Tasa por período de cada fila de una matriz de flujos"""
+
+    tasa: np.ndarray
+    iteraciones: np.ndarray
+    convergio: np.ndarray
+
+
+# =================================================================
+# SOLVER VECTORIZADO
+# =================================================================
+
+
+def _valor_y_derivada(flujos, k, tasa, importe):
+    """Valor actual de los flujos menos `importe`, y su derivada en la tasa"""
+    descuento = np.exp(-k * np.log1p(tasa)[:, None])
+    descontados = flujos * descuento
+    valor = descontados.sum(axis=1) - importe
+    derivada = -(descontados * k).sum(axis=1) / (1 + tasa)
+    return valor, derivada
+
+
+def tasa_efectiva(
+    flujos,
+    importe_neto,
+    tasa_inicial=None,
+    tolerancia=TOLERANCIA_TASA,
+    max_iteraciones=MAX_ITERACIONES,
+):
+    """
+    Tasa por período que iguala el valor actual de cada fila de `flujos` a
+    su `importe_neto`
+
+    La columna j de `flujos` es el pago del período j + 1 (cero si la fila
+    ya venció). Con flujos positivos el valor actual decrece con la tasa y
+    la raíz es única: cada iteración acota el intervalo con el signo del
+    valor, da un paso de Newton y, si el paso sale del intervalo, toma el
+    punto medio. Solo se recalculan las filas que todavía no convergieron.
+
+    Args:
+        flujos: np.ndarray (filas x períodos)
+        importe_neto: Importe recibido al inicio por fila
+        tasa_inicial: Punto de partida por fila (p. ej. la tasa contractual)
+        tolerancia: Error relativo admitido en el valor actual
+        max_iteraciones: Tope de iteraciones por fila
+
+    Returns:
+        SolucionTasas
+    """
+    flujos = np.asarray(flujos, dtype="float64")
+    filas = len(flujos)
+    importe = np.broadcast_to(np.asarray(importe_neto, dtype="float64"), (filas,))
+    if tasa_inicial is None:
+        tasa = np.zeros(filas)
+    else:
+        tasa = np.array(np.broadcast_to(tasa_inicial, (filas,)), dtype="float64")
+    k = np.arange(1, flujos.shape[1] + 1, dtype="float64")[None, :]
+
+    inferior = np.full(filas, TASA_MINIMA)
+    superior = np.full(filas, TASA_MAXIMA)
+    iteraciones = np.zeros(filas, dtype="int16")
+    convergio = np.zeros(filas, dtype=bool)
+    escala = np.maximum(np.abs(importe), 1.0)
+
+    pendientes = np.flatnonzero(importe > 0)
+    for _ in range(max_iteraciones):
+        if not len(pendientes):
+            break
+        # Con pocas filas pendientes conviene copiar solo esas
+        matriz = flujos if len(pendientes) == filas else flujos[pendientes]
+        r = tasa[pendientes]
+        valor, derivada = _valor_y_derivada(matriz, k, r, importe[pendientes])
+        iteraciones[pendientes] += 1
+
+        resueltas = np.abs(valor) <= tolerancia * escala[pendientes]
+        convergio[pendientes[resueltas]] = True
+
+        bajo = valor > 0
+        inferior[pendientes] = np.where(bajo, r, inferior[pendientes])
+        superior[pendientes] = np.where(bajo, superior[pendientes], r)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = r - valor / derivada
+        lo, hi = inferior[pendientes], superior[pendientes]
+        nueva = np.where((newton > lo) & (newton < hi), newton, (lo + hi) / 2)
+        tasa[pendientes] = np.where(resueltas, r, nueva)
+
+        # El intervalo también puede cerrarse antes que el valor
+        cerradas = ~resueltas & (hi - lo <= tolerancia * np.maximum(np.abs(r), 1.0))
+        convergio[pendientes[cerradas]] = True
+        pendientes = pendientes[~(resueltas | cerradas)]
+
+    tasa[importe <= 0] = np.nan
+    return SolucionTasas(tasa=tasa, iteraciones=iteraciones, convergio=convergio)
+
+
+# =================================================================
+# CARTERA DE DEUDAS
+# =================================================================
+
+
+def _importe_neto(df, c, costos):
+    """Monto original menos costos de emisión y transacción"""
+    if costos is None:
+        if "costos_transaccion" in df.columns:
+            costos = df["costos_transaccion"].to_numpy(dtype="float64")
+        else:
+            costos = 0.0
+    costos = np.nan_to_num(
+        np.broadcast_to(np.asarray(costos, dtype="float64"), (len(df),))
+    )
+    return c["capital"] - costos
+
+
+def _flujos(matrices):
+    """Pago de cada período (interés más amortización) del bloque"""
+    return matrices["interes"] + matrices["amortizacion"]
+
+
+def tasas_efectivas(df, costos=None, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """
+    Tasa de interés efectiva de cada deuda de la cartera
+
+    Los flujos son los del cronograma contractual (`amortizacion`) desde la
+    emisión; la tasa contractual es el punto de partida de Newton, así que
+    la mayoría de las deudas converge en pocas iteraciones.
+
+    Args:
+        df: Deudas (ver `amortizacion.saldos_a_fecha`)
+        costos: Costos de emisión y transacción por deuda (escalar o array);
+            por defecto la columna `costos_transaccion`, o cero si no está
+        tamano_bloque_celdas: Celdas (instrumentos x períodos) por bloque
+
+    Returns:
+        pd.DataFrame: importe_neto, tasa_efectiva_periodo,
+        tasa_efectiva_anual (nominal, comparable con tasa_interes_anual),
+        tasa_efectiva_compuesta, iteraciones y convergio, alineado con `df`
+    """
+    df = montos_en_pesos(df, "deudas")
+    c = condiciones_deudas(df)
+    neto = _importe_neto(df, c, costos)
+
+    tasa = np.full(len(df), np.nan)
+    iteraciones = np.zeros(len(df), dtype="int16")
+    convergio = np.zeros(len(df), dtype=bool)
+    for filas in bloques_de_filas(c, tamano_bloque_celdas):
+        solucion = tasa_efectiva(
+            _flujos(matrices_cronograma(c, filas)), neto[filas], c["tasa"][filas]
+        )
+        tasa[filas] = solucion.tasa
+        iteraciones[filas] = solucion.iteraciones
+        convergio[filas] = solucion.convergio
+
+    pagos_por_anio = 12 // c["meses_periodo"]
+    return pd.DataFrame(
+        {
+            "importe_neto": neto,
+            "tasa_efectiva_periodo": tasa,
+            "tasa_efectiva_anual": tasa * pagos_por_anio,
+            "tasa_efectiva_compuesta": (1 + tasa) ** pagos_por_anio - 1,
+            "iteraciones": iteraciones,
+            "convergio": convergio,
+        },
+        index=df.index,
+    )
+
+
+def _evolucion_bloque(matrices, tasa):
+    """
+    Costo amortizado inicial y final de cada período de un bloque
+
+    El costo al final del período k es el valor actual, a la TIE, de los
+    pagos posteriores; se obtiene con sumas acumuladas de los flujos
+    descontados, así que queda en cero al vencimiento sin arrastrar error.
+    """
+    flujos = _flujos(matrices)
+    k = matrices["k"]
+    crecimiento = np.exp(k * np.log1p(tasa)[:, None])
+    restantes = np.cumsum((flujos / crecimiento)[:, ::-1], axis=1)[:, ::-1]
+    costo_inicial = restantes * crecimiento / (1 + tasa)[:, None]
+    costo_final = np.zeros_like(costo_inicial)
+    costo_final[:, :-1] = restantes[:, 1:] * crecimiento[:, :-1]
+    interes_efectivo = costo_inicial * tasa[:, None]
+    return {
+        "k": k,
+        "vigente": matrices["vigente"],
+        "costo_inicial": costo_inicial,
+        "interes_efectivo": interes_efectivo,
+        "interes_contractual": matrices["interes"],
+        "amortizacion_costos": interes_efectivo - matrices["interes"],
+        "pago": flujos,
+        "costo_final": costo_final,
+    }
+
+
+def costo_amortizado_por_bloques(
+    df, costos=None, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS
+):
+    """
+    Evolución del costo amortizado de cada deuda, período por período
+
+    En cada período: costo_inicial + interes_efectivo - pago = costo_final.
+    La diferencia entre el interés efectivo y el contractual es la
+    amortización de los costos de emisión (o del descuento). Igual que
+    `amortizacion.flujos_por_bloques`, la cartera se recorre por bloques en
+    formato largo para no retener la tabla completa.
+
+    Yields:
+        pd.DataFrame: deuda_id, periodo, fecha_pago, costo_inicial,
+        interes_efectivo, interes_contractual, amortizacion_costos, pago,
+        costo_final y tasa_efectiva_periodo
+    """
+    df = montos_en_pesos(df, "deudas")
+    c = condiciones_deudas(df)
+    neto = _importe_neto(df, c, costos)
+    id_de = ids_deudas(df)
+    for filas in bloques_de_filas(c, tamano_bloque_celdas):
+        matrices = matrices_cronograma(c, filas)
+        tasa = tasa_efectiva(_flujos(matrices), neto[filas], c["tasa"][filas]).tasa
+        tabla = formato_largo(c, filas, _evolucion_bloque(matrices, tasa))
+        fila = tabla.pop("fila")
+        bloque = pd.DataFrame(tabla)
+        bloque.insert(0, "deuda_id", id_de(filas, fila))
+        bloque["tasa_efectiva_periodo"] = tasa[fila]
+        yield bloque
+
+
+def costo_amortizado(df, costos=None, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """Evolución completa de `df` en un único DataFrame (carteras chicas)"""
+    bloques = list(costo_amortizado_por_bloques(df, costos, tamano_bloque_celdas))
+    if not bloques:
+        return pd.DataFrame()
+    return pd.concat(bloques, ignore_index=True)
+
+
+def evolucion_por_anio(df, costos=None, tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS):
+    """
+    Evolución anual del costo amortizado de toda la cartera
+
+    altas (importes netos de las emisiones del año) + intereses efectivos -
+    pagos = variación del año. Los intereses de cada período se imputan al
+    año de su fecha de pago.
+
+    Returns:
+        pd.DataFrame: Por año: saldo_inicial, altas, intereses_efectivos,
+        pagos y saldo_final
+    """
+    df = montos_en_pesos(df, "deudas")
+    neto = _importe_neto(df, condiciones_deudas(df), costos)
+    altas = (
+        pd.Series(neto)
+        .groupby(pd.to_datetime(df["fecha_emision"]).dt.year.to_numpy())
+        .sum()
+    )
+
+    parciales = []
+    for bloque in costo_amortizado_por_bloques(df, costos, tamano_bloque_celdas):
+        parciales.append(
+            bloque.groupby(bloque["fecha_pago"].dt.year)[
+                ["interes_efectivo", "pago"]
+            ].sum()
+        )
+    movimientos = (
+        pd.concat(parciales).groupby(level=0).sum()
+        if parciales
+        else pd.DataFrame(columns=["interes_efectivo", "pago"], dtype="float64")
+    )
+
+    evolucion = pd.DataFrame(
+        {
+            "altas": altas,
+            "intereses_efectivos": movimientos["interes_efectivo"],
+            "pagos": movimientos["pago"],
+        }
+    ).fillna(0.0)
+    evolucion.index.name = "anio"
+    variacion = (
+        evolucion["altas"] + evolucion["intereses_efectivos"] - evolucion["pagos"]
+    )
+    evolucion["saldo_final"] = variacion.cumsum()
+    evolucion.insert(0, "saldo_inicial", evolucion["saldo_final"] - variacion)
+    return evolucion
@@ -0,0 +1,326 @@
+"""
+DETECCIÓN DE ANOMALÍAS A GRAN ESCALA
+Isolation Forest para carteras de millones de instrumentos: ajuste sobre una
+submuestra controlada, construcción de árboles y puntuación en paralelo, y
+`score_samples` por bloques sobre las filas seleccionadas sin copiar el
+DataFrame. Devuelve puntajes continuos, de modo que el umbral puede moverse
+sin volver a ajustar el modelo.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+CONTAMINACION = 0.1
+SEMILLA_MODELO = 42
+
+# A partir de esta cantidad de filas se usa el modo masivo
+UMBRAL_FILAS_MASIVO = 1_000_000
+TAMANO_MUESTRA_AJUSTE = 250_000
+TAMANO_BLOQUE_PUNTAJE = 250_000
+
+# Segmentos con menos filas se agrupan en un segmento residual común
+MINIMO_FILAS_SEGMENTO = 100
+SEGMENTO_RESIDUAL = "(otros)"
+
+
+@dataclass
+class ResultadoDeteccion:
+    """
+    Puntajes de anomalía de las filas analizadas
+
+    `puntajes` es el opuesto de `IsolationForest.score_samples`: cuanto
+    mayor, más anómala la fila. Una fila es anómala si su puntaje supera
+    `umbral` (equivalente a `predict == -1`).
+    """
+
+    posiciones: np.ndarray
+    puntajes: np.ndarray
+    umbral: float
+    # Solo en la detección por segmento: código de segmento de cada fila
+    # (alineado con `posiciones`) y nombre de cada código
+    segmentos: np.ndarray = None
+    nombres_segmento: list = None
+
+    def segmento_de_filas(self):
+        """Nombre del segmento de cada fila analizada (None si no se segmentó)"""
+        if self.segmentos is None:
+            return None
+        return np.asarray(self.nombres_segmento, dtype=object)[self.segmentos]
+
+    def etiquetas(self, umbral=None):
+        """1 para filas normales y -1 para anomalías, con el umbral indicado"""
+        umbral = self.umbral if umbral is None else umbral
+        return np.where(self.puntajes > umbral, -1, 1).astype("int8")
+
+    def umbral_para_contaminacion(self, contaminacion):
+        """Umbral que marca como anómala la proporción indicada de filas"""
+        return float(np.quantile(self.puntajes, 1 - contaminacion))
+
+
+# =================================================================
+# AJUSTE Y PUNTUACIÓN
+# =================================================================
+
+
+def _cantidad_procesos(n_jobs):
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def crear_isolation_forest(
+    contaminacion=CONTAMINACION, semilla=SEMILLA_MODELO, n_jobs=None
+):
+    """Isolation Forest con la configuración del proyecto"""
+    from sklearn.ensemble import IsolationForest
+
+    return IsolationForest(
+        random_state=semilla, contamination=contaminacion, n_jobs=n_jobs
+    )
+
+
+def ajustar_modelo(
+    features,
+    contaminacion=CONTAMINACION,
+    semilla=SEMILLA_MODELO,
+    n_jobs=None,
+    registro=None,
+):
+    """
+    Ajusta el Isolation Forest, o lo recupera del registro si ya existe
+
+    `n_jobs` solo afecta la velocidad de construcción de los árboles, por lo
+    que no forma parte de la clave del registro.
+    """
+    if registro is not None:
+        return registro.obtener_o_ajustar(
+            features,
+            {
+                "modelo": "IsolationForest",
+                "contamination": contaminacion,
+                "random_state": semilla,
+            },
+            lambda: crear_isolation_forest(contaminacion, semilla, n_jobs),
+        )
+    return crear_isolation_forest(contaminacion, semilla, n_jobs).fit(features)
+
+
+def puntuar_por_bloques(
+    modelo, features, posiciones=None, tamano_bloque=TAMANO_BLOQUE_PUNTAJE, n_jobs=1
+):
+    """
+    Calcula los puntajes de anomalía por bloques de filas
+
+    Args:
+        modelo: IsolationForest ajustado
+        features: DataFrame con solo las columnas de features
+        posiciones: Posiciones de las filas a puntuar (None = todas)
+        tamano_bloque: Filas materializadas por bloque
+        n_jobs: Hilos para recorrer los árboles (-1 = todos los núcleos)
+
+    Returns:
+        np.ndarray: Puntajes (mayor = más anómalo), alineados con `posiciones`
+    """
+    from joblib import parallel_config
+
+    if posiciones is None:
+        posiciones = np.arange(len(features))
+    puntajes = np.empty(len(posiciones), dtype="float64")
+
+    with parallel_config(backend="threading", n_jobs=_cantidad_procesos(n_jobs)):
+        for inicio in range(0, len(posiciones), tamano_bloque):
+            bloque = posiciones[inicio : inicio + tamano_bloque]
+            matriz = features.iloc[bloque]
+            if matriz.isna().to_numpy().any():
+                matriz = matriz.fillna(0)
+            puntajes[inicio : inicio + len(bloque)] = -modelo.score_samples(matriz)
+    return puntajes
+
+
+def detectar_anomalias(
+    df,
+    features,
+    mascara=None,
+    contaminacion=CONTAMINACION,
+    semilla=SEMILLA_MODELO,
+    registro=None,
+    masivo=None,
+    tamano_muestra=TAMANO_MUESTRA_AJUSTE,
+    tamano_bloque=TAMANO_BLOQUE_PUNTAJE,
+    n_jobs=None,
+):
+    """
+    Detecta anomalías en las filas de `df` seleccionadas por `mascara`
+
+    En modo estándar el modelo se ajusta con todas las filas y las
+    etiquetas coinciden con `fit_predict`. En modo masivo (por defecto a
+    partir de UMBRAL_FILAS_MASIVO filas) se ajusta con una submuestra de
+    `tamano_muestra` filas, en paralelo, y se puntúa el total por bloques.
+
+    Args:
+        df: DataFrame completo (no se copia ni se modifica)
+        features: Columnas usadas por el modelo
+        mascara: Máscara booleana de filas a analizar (None = todas)
+        contaminacion: Proporción esperada de anomalías
+        semilla: Semilla del modelo y de la submuestra
+        registro: RegistroModelos opcional para reutilizar el ajuste
+        masivo: True/False para forzar el modo; None lo elige por tamaño
+        tamano_muestra: Filas de la submuestra de ajuste (modo masivo)
+        tamano_bloque: Filas por bloque de puntuación
+        n_jobs: Núcleos para ajuste y puntuación (None = todos en modo masivo)
+
+    Returns:
+        ResultadoDeteccion
+    """
+    columnas = df[features]
+    if mascara is None:
+        posiciones = np.arange(len(df))
+    else:
+        posiciones = np.flatnonzero(np.asarray(mascara, dtype=bool))
+
+    if len(posiciones) == 0:
+        return ResultadoDeteccion(
+            posiciones=posiciones, puntajes=np.empty(0), umbral=np.inf
+        )
+
+    if masivo is None:
+        masivo = len(posiciones) >= UMBRAL_FILAS_MASIVO
+
+    if masivo:
+        n_jobs = -1 if n_jobs is None else n_jobs
+        rng = np.random.default_rng(semilla)
+        muestra = posiciones
+        if len(posiciones) > tamano_muestra:
+            muestra = np.sort(rng.choice(posiciones, tamano_muestra, replace=False))
+        ajuste = columnas.iloc[muestra].fillna(0)
+    else:
+        ajuste = columnas.iloc[posiciones].fillna(0)
+
+    modelo = ajustar_modelo(ajuste, contaminacion, semilla, n_jobs, registro)
+    puntajes = puntuar_por_bloques(
+        modelo, columnas, posiciones, tamano_bloque, n_jobs if masivo else 1
+    )
+    return ResultadoDeteccion(
+        posiciones=posiciones, puntajes=puntajes, umbral=float(-modelo.offset_)
+    )
+
+
+# =================================================================
+# DETECCIÓN POR SEGMENTO
+# =================================================================
+
+
+def _detectar_segmento(matriz, contaminacion, semilla, tamano_muestra):
+    """
+    Ajusta y puntúa un segmento (se ejecuta en un proceso del pool)
+
+    Returns:
+        tuple: (puntajes, umbral del segmento)
+    """
+    ajuste = matriz
+    if len(matriz) > tamano_muestra:
+        rng = np.random.default_rng(semilla)
+        ajuste = matriz[np.sort(rng.choice(len(matriz), tamano_muestra, replace=False))]
+    modelo = crear_isolation_forest(contaminacion, semilla, n_jobs=1).fit(ajuste)
+    return -modelo.score_samples(matriz), float(-modelo.offset_)
+
+
+def _nombre_segmento(clave):
+    if isinstance(clave, tuple):
+        return " | ".join(str(parte) for parte in clave)
+    return str(clave)
+
+
+def detectar_anomalias_por_segmento(
+    df,
+    features,
+    segmentar_por,
+    mascara=None,
+    contaminacion=CONTAMINACION,
+    semilla=SEMILLA_MODELO,
+    max_workers=None,
+    minimo_filas=MINIMO_FILAS_SEGMENTO,
+    tamano_muestra=TAMANO_MUESTRA_AJUSTE,
+):
+    """
+    Detecta anomalías con un Isolation Forest por segmento
+
+    Cada segmento (p. ej. cada `tipo_deuda`) tiene su propio modelo, de modo
+    que un valor atípico dentro de su segmento no queda oculto por la escala
+    de los demás. Los segmentos se ajustan y puntúan en paralelo en un pool
+    de procesos, empezando por los más grandes, así que la duración total
+    se aproxima a la del segmento más grande.
+
+    Los puntajes se centran en el umbral de su segmento (puntaje > 0 ⇒
+    anomalía), de modo que son comparables entre segmentos y el resultado
+    tiene umbral 0.
+
+    Args:
+        df: DataFrame completo (no se copia ni se modifica)
+        features: Columnas usadas por los modelos
+        segmentar_por: Columna o lista de columnas que definen el segmento
+            (p. ej. "tipo_deuda" o ["tipo_deuda", "empresa_id"])
+        mascara: Máscara booleana de filas a analizar (None = todas)
+        contaminacion: Proporción esperada de anomalías en cada segmento
+        semilla: Semilla de los modelos
+        max_workers: Procesos del pool (None = todos los núcleos, 1 = sin pool)
+        minimo_filas: Los segmentos más chicos se agrupan en uno residual
+        tamano_muestra: Máximo de filas para ajustar cada modelo
+
+    Returns:
+        ResultadoDeteccion: con `segmentos` y `nombres_segmento`
+    """
+    if isinstance(segmentar_por, str):
+        segmentar_por = [segmentar_por]
+    if mascara is None:
+        posiciones = np.arange(len(df))
+    else:
+        posiciones = np.flatnonzero(np.asarray(mascara, dtype=bool))
+
+    seleccion = df.iloc[posiciones]
+    grupos = seleccion.groupby(segmentar_por, observed=True, sort=True, dropna=False)
+    codigos = grupos.ngroup().to_numpy()
+    nombres = [_nombre_segmento(clave) for clave in grupos.groups.keys()]
+
+    # Segmentos chicos: se agrupan en el residual
+    tamanos = np.bincount(codigos, minlength=len(nombres))
+    chicos = tamanos < minimo_filas
+    if chicos.any():
+        nombres.append(SEGMENTO_RESIDUAL)
+        codigos = np.where(chicos[codigos], len(nombres) - 1, codigos)
+        tamanos = np.bincount(codigos, minlength=len(nombres))
+
+    matriz = seleccion[features].to_numpy(dtype="float64", na_value=0)
+    orden = np.argsort(codigos, kind="stable")
+    limites = np.cumsum(tamanos)
+    filas_por_segmento = np.split(orden, limites[:-1])
+    pendientes = sorted(
+        (i for i in range(len(nombres)) if tamanos[i] > 0),
+        key=lambda i: tamanos[i],
+        reverse=True,
+    )
+
+    tareas = [
+        (matriz[filas_por_segmento[i]], contaminacion, semilla, tamano_muestra)
+        for i in pendientes
+    ]
+    if max_workers == 1 or len(tareas) <= 1:
+        salidas = [_detectar_segmento(*tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            salidas = list(pool.map(_detectar_segmento, *zip(*tareas)))
+
+    puntajes = np.empty(len(posiciones), dtype="float64")
+    for i, (puntajes_segmento, umbral) in zip(pendientes, salidas):
+        puntajes[filas_por_segmento[i]] = puntajes_segmento - umbral
+
+    return ResultadoDeteccion(
+        posiciones=posiciones,
+        puntajes=puntajes,
+        umbral=0.0,
+        segmentos=codigos,
+        nombres_segmento=nombres,
+    )
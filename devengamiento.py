@@ -0,0 +1,233 @@
+"""
+DEVENGAMIENTO DE INTERESES
+Fracción de año entre dos fechas según la convención de conteo de días de
+cada instrumento (ACT/365, ACT/360, 30/360 y ACT/ACT) e intereses devengados
+con capitalización periódica opcional.
+
+Todo opera sobre arreglos datetime64 de NumPy, sin aritmética de `date`
+fila por fila: ACT/365 y ACT/360 son restas de días, y para 30/360 y
+ACT/ACT el año, mes y día de cada fecha se leen de una tabla precalculada
+para el rango de fechas en juego, solo sobre los instrumentos con esas
+convenciones.
+"""
+
+import numpy as np
+import pandas as pd
+
+CONVENCIONES = ["ACT/365", "ACT/360", "30/360", "ACT/ACT"]
+_ACT_365, _ACT_360, _30_360, _ACT_ACT = range(len(CONVENCIONES))
+
+# Convención habitual por tipo de deuda (mismo orden que
+# generacion_datos.TIPOS_DEUDA_NO_CORRIENTE)
+CONVENCION_POR_TIPO = {
+    "Préstamo Bancario a Largo Plazo": "ACT/365",
+    "Bonos Emitidos": "30/360",
+    "Hipoteca Inmobiliaria": "ACT/365",
+    "Arrendamiento Financiero (Leasing)": "ACT/360",
+    "Deuda con Partes Relacionadas (Largo Plazo)": "ACT/ACT",
+    "Obligaciones Negociables": "30/360",
+}
+CONVENCION_POR_DEFECTO = "ACT/365"
+
+
+def convenciones_por_tipo(tipos):
+    """Convención de cada deuda según su tipo (pd.Categorical)"""
+    tipos = pd.Categorical(tipos)
+    # Se resuelve por categoría; la última posición (código -1) es la de los
+    # tipos faltantes
+    por_categoria = [
+        CONVENCIONES.index(CONVENCION_POR_TIPO.get(t, CONVENCION_POR_DEFECTO))
+        for t in list(tipos.categories) + [None]
+    ]
+    return pd.Categorical.from_codes(
+        np.asarray(por_categoria)[tipos.codes], categories=CONVENCIONES
+    )
+
+
+def codigos_convencion(df):
+    """
+    Código (sobre CONVENCIONES) de la convención de cada deuda: la columna
+    `convencion_dias` si está informada, si no la habitual de su tipo (o
+    CONVENCION_POR_DEFECTO si no hay tipo_deuda)
+    """
+    if "convencion_dias" in df.columns:
+        codigos = pd.Categorical(df["convencion_dias"], categories=CONVENCIONES).codes
+        vacias = df["convencion_dias"].isna().to_numpy()
+    else:
+        codigos = np.full(len(df), -1, dtype="int8")
+        vacias = np.ones(len(df), dtype=bool)
+    if vacias.any():
+        codigos = codigos.copy()
+        if "tipo_deuda" in df.columns:
+            codigos[vacias] = convenciones_por_tipo(
+                df["tipo_deuda"].to_numpy()[vacias]
+            ).codes
+        else:
+            codigos[vacias] = CONVENCIONES.index(CONVENCION_POR_DEFECTO)
+    if (codigos < 0).any():
+        raise ValueError("Convención de conteo de días desconocida")
+    return codigos.astype("int8")
+
+
+# =================================================================
+# FRACCIÓN DE AÑO
+# =================================================================
+
+
+class _Calendario:
+    """
+    Año, mes, día y posición dentro del año de cada día de un rango,
+    precalculados una vez: descomponer millones de fechas es indexar la
+    tabla en lugar de convertir cada elemento entre unidades datetime64
+    """
+
+    def __init__(self, dias):
+        self.minimo = int(dias.min()) if len(dias) else 0
+        maximo = int(dias.max()) if len(dias) else 0
+        fechas = np.arange(self.minimo, maximo + 1).astype("datetime64[D]")
+        anios = fechas.astype("datetime64[Y]")
+        meses = fechas.astype("datetime64[M]")
+        inicio_anio = anios.astype("datetime64[D]")
+        largo_anio = (anios + 1).astype("datetime64[D]") - inicio_anio
+        self.anio = anios.astype("int64") + 1970
+        self.mes = meses.astype("int64") % 12 + 1
+        self.dia = (fechas - meses.astype("datetime64[D]")).astype("int64") + 1
+        self.posicion_anio = (fechas - inicio_anio).astype("int64") / largo_anio.astype(
+            "int64"
+        )
+
+    def partes(self, dias):
+        """Año, mes (1-12), día (1-31) y fracción transcurrida del año"""
+        i = dias - self.minimo
+        return self.anio[i], self.mes[i], self.dia[i], self.posicion_anio[i]
+
+
+def _fraccion_especial(partes_desde, partes_hasta, treinta):
+    """
+    30/360 (base bono ISDA) donde `treinta`, ACT/ACT (ISDA) en el resto.
+
+    ACT/ACT divide cada tramo por los días de su año calendario, que
+    equivale a (a2 - a1) + posición2 - posición1.
+    """
+    a1, m1, d1, p1 = partes_desde
+    a2, m2, d2, p2 = partes_hasta
+    d1 = np.minimum(d1, 30)
+    d2 = np.where((d2 == 31) & (d1 == 30), 30, d2)
+    dias_360 = 360 * (a2 - a1) + 30 * (m2 - m1) + (d2 - d1)
+    return np.where(treinta, dias_360 / 360, (a2 - a1) + p2 - p1)
+
+
+def _fracciones(desde, hastas, convencion):
+    """
+    Fracción de año de `desde` a cada arreglo de `hastas` (días desde 1970,
+    misma forma que `convencion`), descomponiendo `desde` una sola vez
+    """
+    fracciones = []
+    for hasta in hastas:
+        dias = hasta - desde
+        fracciones.append(np.where(convencion == _ACT_360, dias / 360, dias / 365))
+
+    especiales = (convencion == _30_360) | (convencion == _ACT_ACT)
+    if especiales.any():
+        desde = desde[especiales]
+        hastas = [hasta[especiales] for hasta in hastas]
+        calendario = _Calendario(np.concatenate([desde] + hastas))
+        treinta = convencion[especiales] == _30_360
+        partes_desde = calendario.partes(desde)
+        for fraccion, hasta in zip(fracciones, hastas):
+            fraccion[especiales] = _fraccion_especial(
+                partes_desde, calendario.partes(hasta), treinta
+            )
+    return fracciones
+
+
+def _a_dias(fechas_por_convencion):
+    """
+    Difunde fechas y convención a una forma común
+
+    Returns:
+        tuple: (fechas como días desde 1970, convención, filas sin fechas
+        faltantes)
+    """
+    *fechas, convencion = fechas_por_convencion
+    fechas = [np.asarray(f).astype("datetime64[D]") for f in fechas]
+    forma = np.broadcast_shapes(*(f.shape for f in fechas), np.shape(convencion))
+    fechas = [np.broadcast_to(f, forma) for f in fechas]
+    validas = ~np.logical_or.reduce([np.isnat(f) for f in fechas])
+    dias = [f.astype("int64")[validas] for f in fechas]
+    convencion = np.broadcast_to(np.asarray(convencion, dtype="int8"), forma)
+    return dias, convencion[validas], validas
+
+
+def fraccion_anio(desde, hasta, convencion):
+    """
+    Fracción de año entre `desde` y `hasta` según la convención de cada fila
+
+    Args:
+        desde, hasta: Fechas (datetime64 o días desde 1970), arreglos de la
+            misma forma o difundibles entre sí
+        convencion: Códigos sobre CONVENCIONES (arreglo o escalar)
+
+    Returns:
+        np.ndarray: Fracción de año (negativa si `hasta` es anterior, NaN si
+        falta alguna fecha)
+    """
+    (desde, hasta), convencion, validas = _a_dias((desde, hasta, convencion))
+    fraccion = np.full(validas.shape, np.nan)
+    fraccion[validas] = _fracciones(desde, [hasta], convencion)[0]
+    return fraccion
+
+
+def fraccion_periodo(inicio, fecha, fin, convencion):
+    """
+    Parte transcurrida del período [inicio, fin) a `fecha`, medida con la
+    convención de cada fila: para ACT/365 y ACT/360 es la proporción de
+    días corridos, para 30/360 la de días de 30/360 y para ACT/ACT la de
+    años ACT/ACT
+
+    Las fechas pueden ser datetime64 o días desde 1970 (enteros).
+    """
+    (inicio, fecha, fin), convencion, validas = _a_dias(
+        (inicio, fecha, fin, convencion)
+    )
+    transcurrido, total = _fracciones(inicio, [fecha, fin], convencion)
+    fraccion = np.full(validas.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraccion[validas] = transcurrido / total
+    return fraccion
+
+
+# =================================================================
+# INTERESES
+# =================================================================
+
+
+def devengar(
+    capital, tasa_anual, desde, hasta, convencion, capitalizaciones_por_anio=0
+):
+    """
+    Intereses devengados entre dos fechas sobre un capital
+
+    Con `capitalizaciones_por_anio` = 0 el interés es simple
+    (capital * tasa * fracción de año); con m > 0 se capitaliza m veces por
+    año: capital * ((1 + tasa / m) ** (m * fracción) - 1).
+
+    Args:
+        capital, tasa_anual: Arreglos por instrumento
+        desde, hasta: Fechas por instrumento (o escalares)
+        convencion: Códigos sobre CONVENCIONES
+        capitalizaciones_por_anio: Escalar o arreglo por instrumento
+
+    Returns:
+        np.ndarray: Intereses devengados
+    """
+    capital = np.asarray(capital, dtype="float64")
+    tasa = np.asarray(tasa_anual, dtype="float64")
+    fraccion = fraccion_anio(desde, hasta, convencion)
+    m = np.broadcast_to(
+        np.asarray(capitalizaciones_por_anio, dtype="float64"), fraccion.shape
+    )
+    simple = tasa * fraccion
+    with np.errstate(divide="ignore", invalid="ignore"):
+        compuesto = np.expm1(m * np.log1p(tasa / m) * fraccion)
+    return capital * np.where(m > 0, compuesto, simple)
@@ -0,0 +1,354 @@
+"""
+ESCENARIOS DE ESTRÉS (MONTE CARLO)
+Simula miles de caminos de un año de shocks de tasa e incumplimientos
+sobre la cartera de deudas a una fecha de cierre y devuelve la distribución
+del costo de intereses y de la necesidad de refinanciamiento por tipo de
+deuda.
+
+Modelo de cada camino p, a un año desde el cierre:
+- Shock de tasa Δp ~ Normal(media, desvío), común a toda la cartera. La
+  porción corriente (capital que vence en doce meses) se refinancia en
+  promedio a mitad de año a la tasa de la deuda más Δp (nunca negativa).
+- Factor sistémico log-normal de media 1, correlacionado con Δp, que
+  multiplica la probabilidad anual de incumplimiento de cada deuda activa.
+  Una deuda que pasa a `Incumplida` en el momento τ vuelve exigible su
+  porción no corriente (aceleración), que suma a la necesidad de
+  refinanciamiento y desde τ devenga a la tasa estresada más un recargo.
+
+Los caminos se simulan como matrices caminos x deudas por bloques de
+celdas acotados, los bloques de caminos se reparten en un pool de procesos
+y los totales por tipo de deuda se acumulan con productos de matrices. Cada
+bloque de caminos usa su propio flujo de `SeedSequence`, así que el
+resultado depende de la semilla y del tamaño de bloque, no de la cantidad
+de procesos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import TAMANO_BLOQUE_CELDAS
+from clasificacion_corriente import clasificar_a_fecha
+from generacion_datos import PROBABILIDAD_INCUMPLIMIENTO_ACTIVA, semilla_bloque
+
+CAMINOS = 2_000
+CAMINOS_POR_BLOQUE = 250
+SEMILLA_ESTRES = 2025
+PERCENTILES = [5, 50, 95, 99]
+SIN_TIPO = "Sin tipo"
+
+# Desvío anual del shock de tasa (puntos de tasa: 0.02 = 200 pb)
+DESVIO_SHOCK_TASA = 0.02
+# Desvío del logaritmo del factor sistémico de incumplimiento
+VOLATILIDAD_SISTEMICA = 0.8
+CORRELACION_TASA_INCUMPLIMIENTO = 0.5
+# Tasa punitoria adicional de las deudas incumplidas
+RECARGO_INCUMPLIMIENTO = 0.05
+
+METRICAS = {
+    "costo_intereses": "Costo de intereses",
+    "refinanciamiento": "Necesidad de refinanciamiento",
+    "incumplimientos": "Deudas que pasan a incumplidas",
+}
+
+
+@dataclass(frozen=True)
+class Escenario:
+    """
+    Parámetros de la simulación
+
+    `probabilidad_incumplimiento` es la probabilidad anual de una deuda
+    activa sin estrés: un número o un diccionario por tipo de deuda (los
+    tipos ausentes usan PROBABILIDAD_INCUMPLIMIENTO_ACTIVA).
+    """
+
+    media_shock_tasa: float = 0.0
+    desvio_shock_tasa: float = DESVIO_SHOCK_TASA
+    probabilidad_incumplimiento: object = PROBABILIDAD_INCUMPLIMIENTO_ACTIVA
+    volatilidad_sistemica: float = VOLATILIDAD_SISTEMICA
+    correlacion: float = CORRELACION_TASA_INCUMPLIMIENTO
+    recargo_incumplimiento: float = RECARGO_INCUMPLIMIENTO
+
+
+@dataclass
+class ResultadoEstres:
+    """
+    Caminos simulados: una fila por camino y una columna por tipo de deuda
+    en `costo_intereses`, `refinanciamiento` e `incumplimientos`
+    """
+
+    tipos: list
+    fecha_cierre: pd.Timestamp
+    escenario: Escenario
+    deudas: int
+    shock_tasa: np.ndarray
+    costo_intereses: np.ndarray
+    refinanciamiento: np.ndarray
+    incumplimientos: np.ndarray
+    base: dict = field(default_factory=dict)
+
+    @property
+    def caminos(self):
+        return len(self.shock_tasa)
+
+    def total(self, metrica):
+        """Total de la cartera en cada camino"""
+        return getattr(self, metrica).sum(axis=1)
+
+    def percentiles(self, metrica, percentiles=PERCENTILES):
+        """
+        Percentiles de `metrica` entre caminos por tipo de deuda y para la
+        cartera completa (percentiles del total de cada camino, no suma de
+        percentiles), junto al valor sin estrés
+
+        Returns:
+            pd.DataFrame: índice tipo_deuda + "Total"; columnas base, media
+            y p<percentil>
+        """
+        valores = np.column_stack([getattr(self, metrica), self.total(metrica)])
+        base = np.append(self.base[metrica], self.base[metrica].sum())
+        tabla = pd.DataFrame(
+            np.percentile(valores, percentiles, axis=0).T,
+            columns=[f"p{p}" for p in percentiles],
+            index=pd.Index(list(self.tipos) + ["Total"], name="tipo_deuda"),
+        )
+        tabla.insert(0, "media", valores.mean(axis=0))
+        tabla.insert(0, "base", base)
+        return tabla
+
+
+# =================================================================
+# CARTERA
+# =================================================================
+
+
+def _probabilidades(tipos, probabilidad_incumplimiento):
+    """Probabilidad anual sin estrés de cada deuda según su tipo"""
+    if not isinstance(probabilidad_incumplimiento, dict):
+        return np.full(len(tipos), float(probabilidad_incumplimiento))
+    por_categoria = [
+        probabilidad_incumplimiento.get(t, PROBABILIDAD_INCUMPLIMIENTO_ACTIVA)
+        for t in tipos.categories
+    ]
+    return np.asarray(por_categoria, dtype="float64")[tipos.codes]
+
+
+def cartera_estres(df, fecha_cierre, escenario=None):
+    """
+    Arrays por deuda que usa la simulación: deudas con saldo al cierre, con
+    su saldo y porción corriente en pesos (`clasificar_a_fecha`), tasa,
+    probabilidad de incumplimiento (cero si no está activa) y tipo
+    """
+    escenario = escenario or Escenario()
+    clasificacion = clasificar_a_fecha(df, fecha_cierre)
+    saldo = clasificacion["saldo_cierre"].to_numpy()
+    vigentes = saldo > 0
+    tipos = pd.Categorical(df["tipo_deuda"]).remove_unused_categories()
+    if (tipos.codes < 0).any():
+        tipos = tipos.add_categories(SIN_TIPO).fillna(SIN_TIPO)
+    activa = (
+        (df["estado_deuda"] == "Activa").to_numpy()
+        if "estado_deuda" in df.columns
+        else np.ones(len(df), dtype=bool)
+    )
+    tasa = pd.to_numeric(df["tasa_interes_anual"], errors="coerce").fillna(0.0)
+    probabilidad = np.where(
+        activa, _probabilidades(tipos, escenario.probabilidad_incumplimiento), 0.0
+    )
+    corriente = clasificacion["porcion_corriente"].to_numpy()[vigentes]
+    return {
+        "tipos": list(tipos.categories),
+        "tipo": tipos.codes[vigentes].astype("int64"),
+        "saldo": saldo[vigentes],
+        "corriente": corriente,
+        "no_corriente": saldo[vigentes] - corriente,
+        "tasa": tasa.to_numpy(dtype="float64")[vigentes],
+        "probabilidad": np.clip(probabilidad[vigentes], 0.0, 1.0),
+    }
+
+
+def _base(cartera):
+    """Totales por tipo sin shock de tasa ni incumplimientos nuevos"""
+    cantidad_tipos = len(cartera["tipos"])
+
+    def por_tipo(pesos):
+        return np.bincount(cartera["tipo"], weights=pesos, minlength=cantidad_tipos)
+
+    return {
+        "costo_intereses": por_tipo(cartera["saldo"] * cartera["tasa"]),
+        "refinanciamiento": por_tipo(cartera["corriente"]),
+        "incumplimientos": np.zeros(cantidad_tipos),
+    }
+
+
+# =================================================================
+# SIMULACIÓN POR BLOQUES
+# =================================================================
+
+
+def _bloques(n, caminos, tamano_bloque_celdas):
+    paso = max(1, tamano_bloque_celdas // max(caminos, 1))
+    for inicio in range(0, n, paso):
+        yield slice(inicio, min(inicio + paso, n))
+
+
+def _simular_bloque(cartera, escenario, semilla, caminos, tamano_bloque_celdas):
+    """
+    Simula `caminos` caminos sobre toda la cartera, por bloques de deudas
+    de a lo sumo `tamano_bloque_celdas` celdas caminos x deudas
+
+    Las partes densas (sorteo de incumplimiento y refinanciamiento de la
+    porción corriente) son operaciones sobre la matriz del bloque; las
+    deudas incumplidas, pocas, se acumulan sobre sus posiciones. Los
+    uniformes se sortean deuda por deuda (todos los caminos de una deuda
+    seguidos), de modo que el flujo de números aleatorios, y con él los
+    incumplimientos, no depende de `tamano_bloque_celdas`; los importes
+    solo difieren en el redondeo de las sumas por bloque.
+
+    Returns:
+        tuple: shock de tasa por camino y matrices caminos x tipos de costo
+        de intereses, refinanciamiento e incumplimientos
+    """
+    rng = np.random.default_rng(semilla)
+    z_tasa = rng.standard_normal(caminos)
+    z_sistemico = escenario.correlacion * z_tasa + np.sqrt(
+        1 - escenario.correlacion**2
+    ) * rng.standard_normal(caminos)
+    shock = escenario.media_shock_tasa + escenario.desvio_shock_tasa * z_tasa
+    sigma = escenario.volatilidad_sistemica
+    factor = np.exp(sigma * z_sistemico - sigma**2 / 2)
+
+    base = _base(cartera)
+    cantidad_tipos = len(cartera["tipos"])
+    intereses = np.tile(base["costo_intereses"], (caminos, 1))
+    refinanciamiento = np.tile(base["refinanciamiento"], (caminos, 1))
+    incumplimientos = np.zeros((caminos, cantidad_tipos))
+
+    for filas in _bloques(len(cartera["saldo"]), caminos, tamano_bloque_celdas):
+        tipo = cartera["tipo"][filas]
+        tasa = cartera["tasa"][filas]
+        probabilidad = cartera["probabilidad"][filas]
+        no_corriente = cartera["no_corriente"][filas]
+        por_tipo = np.zeros((len(tipo), cantidad_tipos))
+        por_tipo[np.arange(len(tipo)), tipo] = 1.0
+
+        # Porción corriente refinanciada a mitad de año a la tasa estresada
+        delta = np.maximum(shock[:, None], -tasa)
+        intereses += delta @ (por_tipo * (cartera["corriente"][filas] / 2)[:, None])
+
+        # Incumplimiento con probabilidad estresada; el sorteo uniforme
+        # también fija el momento (uniforme dentro del año)
+        sorteo = rng.random((len(tipo), caminos))
+        deuda, camino = np.nonzero(sorteo < probabilidad[:, None] * factor)
+        estresada = np.minimum(probabilidad[deuda] * factor[camino], 1.0)
+        resto_anio = 1.0 - sorteo[deuda, camino] / estresada
+        tasa_incumplida = (
+            np.maximum(shock[camino], -tasa[deuda]) + escenario.recargo_incumplimiento
+        )
+        celda = camino * cantidad_tipos + tipo[deuda]
+        celdas = caminos * cantidad_tipos
+        intereses += np.bincount(
+            celda,
+            weights=resto_anio * tasa_incumplida * no_corriente[deuda],
+            minlength=celdas,
+        ).reshape(caminos, cantidad_tipos)
+        refinanciamiento += np.bincount(
+            celda, weights=no_corriente[deuda], minlength=celdas
+        ).reshape(caminos, cantidad_tipos)
+        incumplimientos += np.bincount(celda, minlength=celdas).reshape(
+            caminos, cantidad_tipos
+        )
+
+    return shock, intereses, refinanciamiento, incumplimientos
+
+
+# Cartera de cada proceso del pool: se envía una vez por proceso (initializer)
+# y no con cada bloque de caminos
+_CARTERA_PROCESO = None
+
+
+def _iniciar_proceso(cartera):
+    global _CARTERA_PROCESO
+    _CARTERA_PROCESO = cartera
+
+
+def _simular_bloque_en_proceso(escenario, semilla, caminos, tamano_bloque_celdas):
+    return _simular_bloque(
+        _CARTERA_PROCESO, escenario, semilla, caminos, tamano_bloque_celdas
+    )
+
+
+def simular_estres(
+    df,
+    fecha_cierre,
+    escenario=None,
+    caminos=CAMINOS,
+    semilla=SEMILLA_ESTRES,
+    caminos_por_bloque=CAMINOS_POR_BLOQUE,
+    max_workers=None,
+    tamano_bloque_celdas=TAMANO_BLOQUE_CELDAS,
+):
+    """
+    Simulación Monte Carlo de shocks de tasa e incumplimientos a un año
+
+    Args:
+        df: Deudas (generadas o ingeridas) con las columnas de
+            `clasificar_a_fecha`, tipo_deuda y tasa_interes_anual
+        fecha_cierre: Inicio del año simulado
+        escenario: Escenario (por defecto, los parámetros del módulo)
+        caminos: Cantidad de caminos (al menos 1)
+        semilla: Semilla maestra; cada bloque de caminos deriva la suya
+        caminos_por_bloque: Caminos por tarea del pool
+        max_workers: Procesos del pool (None = todos los núcleos, 1 = sin pool)
+        tamano_bloque_celdas: Máximo de celdas caminos x deudas en memoria
+            por bloque; no cambia los sorteos
+
+    Returns:
+        ResultadoEstres
+    """
+    caminos, caminos_por_bloque = int(caminos), int(caminos_por_bloque)
+    if caminos < 1:
+        raise ValueError(f"Se necesita al menos un camino (caminos={caminos})")
+    if caminos_por_bloque < 1:
+        raise ValueError(
+            f"caminos_por_bloque debe ser al menos 1 (recibido {caminos_por_bloque})"
+        )
+    escenario = escenario or Escenario()
+    cartera = cartera_estres(df, fecha_cierre, escenario)
+    num_bloques = -(-caminos // caminos_por_bloque)
+    tareas = (
+        [escenario] * num_bloques,
+        [semilla_bloque(semilla, i) for i in range(num_bloques)],
+        [
+            min(caminos_por_bloque, caminos - i * caminos_por_bloque)
+            for i in range(num_bloques)
+        ],
+        [tamano_bloque_celdas] * num_bloques,
+    )
+
+    if max_workers == 1 or num_bloques <= 1:
+        salidas = [_simular_bloque(cartera, *tarea) for tarea in zip(*tareas)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_iniciar_proceso,
+            initargs=(cartera,),
+        ) as pool:
+            salidas = list(pool.map(_simular_bloque_en_proceso, *tareas))
+
+    shock, intereses, refinanciamiento, incumplimientos = (
+        np.concatenate(partes) for partes in zip(*salidas)
+    )
+    return ResultadoEstres(
+        tipos=cartera["tipos"],
+        fecha_cierre=pd.Timestamp(fecha_cierre),
+        escenario=escenario,
+        deudas=len(cartera["saldo"]),
+        shock_tasa=shock,
+        costo_intereses=intereses,
+        refinanciamiento=refinanciamiento,
+        incumplimientos=incumplimientos,
+        base=_base(cartera),
+    )
@@ -0,0 +1,79 @@
+"""
+ESQUEMA DE DATOS DEL PASIVO NO CORRIENTE
+Define las columnas, tipos y obligatoriedad de los DataFrames de deudas y
+previsiones que consumen `analizar_deudas_no_corrientes` y
+`analizar_previsiones`.
+"""
+
+# Tipos lógicos admitidos:
+#   "texto"     -> cadenas de alta cardinalidad (ids, descripciones)
+#   "categoria" -> cadenas de baja cardinalidad (tipos, estados, empresas)
+#   "entero", "decimal", "fecha"
+#   "monto"     -> importes en pesos; su representación es configurable
+#                  (float64, float32 o centavos en int64)
+# Cada entrada: columna -> (tipo lógico, obligatoria)
+ESQUEMA_DEUDAS = {
+    "deuda_id": ("texto", True),
+    "empresa_id": ("entero", False),
+    "tipo_deuda": ("categoria", True),
+    "fecha_emision": ("fecha", True),
+    "fecha_vencimiento": ("fecha", True),
+    "plazo_anios": ("entero", False),
+    "monto_original": ("monto", True),
+    "tasa_interes_anual": ("decimal", True),
+    "saldo_pendiente_simulado": ("monto", True),
+    "intereses_acumulados_simulados": ("monto", False),
+    "costos_transaccion": ("monto", False),
+    "estado_deuda": ("categoria", True),
+    "sistema_amortizacion": ("categoria", False),
+    "frecuencia_pagos": ("categoria", False),
+    "convencion_dias": ("categoria", False),
+    "moneda": ("categoria", False),
+    "nombre_empresa_deudora": ("categoria", False),
+    "cuit_empresa_deudora": ("categoria", False),
+}
+
+ESQUEMA_PREVISIONES = {
+    "id_prevision": ("texto", True),
+    "tipo_prevision": ("categoria", True),
+    "descripcion_breve": ("texto", False),
+    "fecha_creacion": ("fecha", True),
+    "monto_estimado_ars": ("monto", True),
+    "probabilidad_ocurrencia": ("categoria", False),
+    "estado_actual": ("categoria", True),
+    "fecha_ultima_revision": ("fecha", False),
+    "fecha_estimada_utilizacion": ("fecha", False),
+}
+
+ESQUEMAS = {
+    "deudas": ESQUEMA_DEUDAS,
+    "previsiones": ESQUEMA_PREVISIONES,
+}
+
+
+def obtener_esquema(entidad):
+    """Devuelve el esquema de la entidad ("deudas" o "previsiones")"""
+    if entidad not in ESQUEMAS:
+        raise ValueError(f"Entidad desconocida: {entidad}")
+    return ESQUEMAS[entidad]
+
+
+def columnas_de_tipo(entidad, tipo_logico):
+    """Lista las columnas de la entidad con el tipo lógico indicado"""
+    return [
+        c for c, (tipo, _) in obtener_esquema(entidad).items() if tipo == tipo_logico
+    ]
+
+
+def tipo_arrow(tipo_logico):
+    """Traduce un tipo lógico del esquema al tipo de pyarrow correspondiente"""
+    import pyarrow as pa
+
+    return {
+        "texto": pa.string(),
+        "categoria": pa.string(),
+        "entero": pa.int64(),
+        "decimal": pa.float64(),
+        "monto": pa.float64(),
+        "fecha": pa.timestamp("s"),
+    }[tipo_logico]
@@ -0,0 +1,351 @@
+"""
+EVALUACIÓN DE DETECTORES DE ANOMALÍAS
+Inyecta anomalías etiquetadas en los datos sintéticos (picos de tasa, saldo
+mayor al monto original, previsiones antiguas sin revisar, montos extremos)
+y mide precisión, recall, tiempos de ajuste y puntuación y memoria pico de
+Isolation Forest y de detectores alternativos. Las cifras de detección que
+citan los informes de auditoría salen de aquí.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from deteccion_anomalias import (
+    CONTAMINACION,
+    SEMILLA_MODELO,
+    TAMANO_MUESTRA_AJUSTE,
+    ajustar_modelo,
+    detectar_anomalias_por_segmento,
+    puntuar_por_bloques,
+)
+from generacion_datos import (
+    FECHA_REFERENCIA_PREVISIONES,
+    generar_deudas_vectorizado,
+    generar_previsiones_vectorizado,
+)
+from motor_analisis import (
+    ESTADOS_ANALIZADOS_DEUDAS,
+    FEATURES_DEUDAS,
+    FEATURES_PREVISIONES,
+    SEGMENTOS_DEUDAS,
+    SEGMENTOS_PREVISIONES,
+    preparar_deudas,
+    preparar_previsiones,
+)
+
+# Junto al módulo, para que los informes la encuentren desde cualquier
+# directorio de trabajo
+RUTA_METRICAS = os.environ.get(
+    "PASIVO_METRICAS_DETECTORES",
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "data", "metricas_detectores.json"
+    ),
+)
+TASA_INYECCION = 0.02
+TAMANO_MUESTRA_LOF = 50_000
+VECINOS_LOF = 35
+
+# Detector cuyas cifras se citan en los informes
+DETECTOR_INFORMES = "isolation_forest"
+
+SIN_INYECCION = ""
+
+
+# =================================================================
+# INYECCIÓN DE ANOMALÍAS
+# =================================================================
+
+
+def _elegir(rng, posiciones, cantidad):
+    return np.sort(
+        rng.choice(posiciones, min(cantidad, len(posiciones)), replace=False)
+    )
+
+
+def inyectar_anomalias_deudas(df, tasa=TASA_INYECCION, semilla=SEMILLA_MODELO):
+    """
+    Inyecta anomalías etiquetadas en deudas activas e incumplidas
+
+    Tipos (en partes iguales):
+        - "pico_tasa": tasa de interés multiplicada por 3 a 5
+        - "saldo_mayor_original": saldo entre 1,2 y 2 veces el monto original
+
+    Returns:
+        tuple: (copia de df con las anomalías, np.ndarray con el tipo
+        inyectado por fila; "" en las filas sin inyección)
+    """
+    rng = np.random.default_rng(semilla)
+    df = df.copy()
+    tipos = np.full(len(df), SIN_INYECCION, dtype=object)
+    candidatas = np.flatnonzero(
+        df["estado_deuda"].isin(ESTADOS_ANALIZADOS_DEUDAS).to_numpy()
+    )
+    cantidad = int(round(len(candidatas) * tasa))
+    elegidas = _elegir(rng, candidatas, cantidad)
+    picos, saldos = np.array_split(rng.permutation(elegidas), 2)
+
+    columna = df.columns.get_loc("tasa_interes_anual")
+    df.iloc[picos, columna] = df.iloc[picos, columna].to_numpy() * rng.uniform(
+        3, 5, len(picos)
+    )
+    tipos[picos] = "pico_tasa"
+
+    monto = df["monto_original"].to_numpy(dtype="float64")[saldos]
+    columna = df.columns.get_loc("saldo_pendiente_simulado")
+    df.iloc[saldos, columna] = np.round(monto * rng.uniform(1.2, 2.0, len(saldos)), 2)
+    tipos[saldos] = "saldo_mayor_original"
+    return df, tipos
+
+
+def inyectar_anomalias_previsiones(
+    df,
+    tasa=TASA_INYECCION,
+    semilla=SEMILLA_MODELO,
+    fecha_referencia=FECHA_REFERENCIA_PREVISIONES,
+):
+    """
+    Inyecta anomalías etiquetadas en previsiones
+
+    Tipos (en partes iguales):
+        - "prevision_antigua": activa, creada hace 8 a 15 años y sin revisión
+        - "monto_extremo": monto estimado multiplicado por 10 a 30
+
+    Returns:
+        tuple: (copia de df con las anomalías, np.ndarray con el tipo por fila)
+    """
+    rng = np.random.default_rng(semilla)
+    df = df.copy()
+    tipos = np.full(len(df), SIN_INYECCION, dtype=object)
+    elegidas = _elegir(rng, np.arange(len(df)), int(round(len(df) * tasa)))
+    antiguas, extremas = np.array_split(rng.permutation(elegidas), 2)
+
+    referencia = pd.Timestamp(fecha_referencia)
+    dias = rng.integers(8 * 365, 15 * 365, len(antiguas))
+    creacion = (referencia - pd.to_timedelta(dias, unit="D")).astype(
+        df["fecha_creacion"].dtype
+    )
+    df.iloc[antiguas, df.columns.get_loc("fecha_creacion")] = creacion
+    df.iloc[antiguas, df.columns.get_loc("fecha_ultima_revision")] = creacion
+    df.iloc[antiguas, df.columns.get_loc("estado_actual")] = "Activa"
+    tipos[antiguas] = "prevision_antigua"
+
+    columna = df.columns.get_loc("monto_estimado_ars")
+    df.iloc[extremas, columna] = df.iloc[extremas, columna].to_numpy() * rng.uniform(
+        10, 30, len(extremas)
+    )
+    tipos[extremas] = "monto_extremo"
+    return df, tipos
+
+
+# =================================================================
+# DETECTORES
+# =================================================================
+# Cada detector recibe la matriz de features (DataFrame), los segmentos de
+# cada fila y la semilla, y devuelve (puntajes, segundos de ajuste,
+# segundos de puntuación). Puntaje mayor = más anómalo.
+
+
+def _isolation_forest(features, segmentos, semilla):
+    ajuste = features
+    if len(features) > TAMANO_MUESTRA_AJUSTE:
+        rng = np.random.default_rng(semilla)
+        muestra = np.sort(
+            rng.choice(len(features), TAMANO_MUESTRA_AJUSTE, replace=False)
+        )
+        ajuste = features.iloc[muestra]
+    inicio = time.perf_counter()
+    modelo = ajustar_modelo(ajuste, CONTAMINACION, semilla, n_jobs=-1)
+    medio = time.perf_counter()
+    puntajes = puntuar_por_bloques(modelo, features, n_jobs=-1)
+    return puntajes, medio - inicio, time.perf_counter() - medio
+
+
+def _isolation_forest_segmento(features, segmentos, semilla):
+    datos = features.assign(_segmento=segmentos)
+    inicio = time.perf_counter()
+    deteccion = detectar_anomalias_por_segmento(
+        datos, list(features.columns), "_segmento", semilla=semilla
+    )
+    # Ajuste y puntuación ocurren juntos en cada proceso del pool
+    return deteccion.puntajes, time.perf_counter() - inicio, np.nan
+
+
+def _escalar_robusto(matriz, referencia):
+    mediana = np.median(referencia, axis=0)
+    iqr = np.subtract(*np.percentile(referencia, [75, 25], axis=0))
+    return (matriz - mediana) / np.where(iqr > 0, iqr, 1.0)
+
+
+def _lof(features, segmentos, semilla):
+    from sklearn.neighbors import LocalOutlierFactor
+
+    matriz = features.to_numpy(dtype="float64")
+    rng = np.random.default_rng(semilla)
+    muestra = matriz
+    if len(matriz) > TAMANO_MUESTRA_LOF:
+        muestra = matriz[rng.choice(len(matriz), TAMANO_MUESTRA_LOF, replace=False)]
+
+    inicio = time.perf_counter()
+    modelo = LocalOutlierFactor(n_neighbors=VECINOS_LOF, novelty=True, n_jobs=-1)
+    modelo.fit(_escalar_robusto(muestra, muestra))
+    medio = time.perf_counter()
+    puntajes = np.empty(len(matriz))
+    for desde in range(0, len(matriz), 250_000):
+        bloque = _escalar_robusto(matriz[desde : desde + 250_000], muestra)
+        puntajes[desde : desde + len(bloque)] = -modelo.score_samples(bloque)
+    return puntajes, medio - inicio, time.perf_counter() - medio
+
+
+def _zscore_robusto(features, segmentos, semilla):
+    matriz = features.to_numpy(dtype="float64")
+    inicio = time.perf_counter()
+    mediana = np.median(matriz, axis=0)
+    mad = np.median(np.abs(matriz - mediana), axis=0) * 1.4826
+    medio = time.perf_counter()
+    puntajes = (np.abs(matriz - mediana) / np.where(mad > 0, mad, 1.0)).max(axis=1)
+    return puntajes, medio - inicio, time.perf_counter() - medio
+
+
+DETECTORES = {
+    "isolation_forest": _isolation_forest,
+    "isolation_forest_segmento": _isolation_forest_segmento,
+    "lof": _lof,
+    "zscore_robusto": _zscore_robusto,
+}
+
+
+# =================================================================
+# EVALUACIÓN
+# =================================================================
+
+
+def preparar_evaluacion(entidad, num_filas, semilla=SEMILLA_MODELO):
+    """
+    Genera datos sintéticos con anomalías inyectadas, listos para evaluar
+
+    Returns:
+        tuple: (features, segmentos, tipos inyectados) de las filas analizadas
+    """
+    if entidad == "deudas":
+        df, tipos = inyectar_anomalias_deudas(
+            generar_deudas_vectorizado(num_filas, semilla=semilla), semilla=semilla
+        )
+        datos = preparar_deudas(df)
+        mascara = datos["estado_deuda"].isin(ESTADOS_ANALIZADOS_DEUDAS).to_numpy()
+        features, segmentacion = FEATURES_DEUDAS, SEGMENTOS_DEUDAS
+    elif entidad == "previsiones":
+        df, tipos = inyectar_anomalias_previsiones(
+            generar_previsiones_vectorizado(num_filas, semilla=semilla),
+            semilla=semilla,
+        )
+        datos = preparar_previsiones(df)
+        mascara = np.ones(len(datos), dtype=bool)
+        features, segmentacion = FEATURES_PREVISIONES, SEGMENTOS_PREVISIONES
+    else:
+        raise ValueError(f"Entidad desconocida: {entidad}")
+
+    seleccion = datos[mascara]
+    return (
+        seleccion[features].astype("float64").fillna(0).reset_index(drop=True),
+        seleccion[segmentacion[0]].astype(str).to_numpy(),
+        tipos[mascara],
+    )
+
+
+def metricas_clasificacion(puntajes, tipos, contaminacion=CONTAMINACION):
+    """
+    Precisión y recall en el punto de operación (se marca como anómala la
+    fracción `contaminacion` de mayor puntaje) y recall por tipo inyectado
+    """
+    from sklearn.metrics import average_precision_score
+
+    verdad = tipos != SIN_INYECCION
+    umbral = np.quantile(puntajes, 1 - contaminacion)
+    marcadas = puntajes > umbral
+    verdaderos = int((marcadas & verdad).sum())
+    metricas = {
+        "precision": verdaderos / max(int(marcadas.sum()), 1),
+        "recall": verdaderos / max(int(verdad.sum()), 1),
+        "precision_promedio": (
+            float(average_precision_score(verdad, puntajes)) if verdad.any() else 0.0
+        ),
+    }
+    for tipo in sorted(set(tipos[verdad])):
+        del_tipo = tipos == tipo
+        metricas[f"recall_{tipo}"] = float((marcadas & del_tipo).sum() / del_tipo.sum())
+    return metricas
+
+
+def evaluar_detector(nombre, features, segmentos, tipos, semilla=SEMILLA_MODELO):
+    """Ejecuta un detector y devuelve sus métricas de calidad y rendimiento"""
+    tracemalloc.start()
+    try:
+        puntajes, t_ajuste, t_puntaje = DETECTORES[nombre](features, segmentos, semilla)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    filas = len(features)
+    t_total = t_ajuste + (0 if np.isnan(t_puntaje) else t_puntaje)
+    return {
+        "detector": nombre,
+        "filas": filas,
+        **metricas_clasificacion(puntajes, tipos),
+        "segundos_ajuste": t_ajuste,
+        "segundos_puntaje": t_puntaje,
+        "filas_por_segundo": filas / t_total if t_total > 0 else np.inf,
+        "memoria_pico_mb": pico / 1024**2,
+    }
+
+
+def evaluar(entidad, tamanos, detectores=None, semilla=SEMILLA_MODELO):
+    """
+    Evalúa los detectores en cada tamaño de conjunto
+
+    Returns:
+        pd.DataFrame: Una fila por (tamaño, detector)
+    """
+    filas = []
+    for num_filas in tamanos:
+        features, segmentos, tipos = preparar_evaluacion(entidad, num_filas, semilla)
+        for nombre in detectores or DETECTORES:
+            resultado = evaluar_detector(nombre, features, segmentos, tipos, semilla)
+            filas.append({"entidad": entidad, "tamano": num_filas, **resultado})
+    return pd.DataFrame(filas)
+
+
+def guardar_metricas(resultados, ruta=RUTA_METRICAS):
+    """Guarda los resultados de `evaluar` como JSON para los informes"""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    registros = json.loads(resultados.to_json(orient="records"))
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(registros, archivo, indent=2, ensure_ascii=False)
+
+
+def porcentaje_deteccion_medido(
+    entidad, detector=DETECTOR_INFORMES, ruta=RUTA_METRICAS
+):
+    """
+    Recall medido (en %) del detector sobre anomalías inyectadas
+
+    Usa la medición más grande guardada en `ruta` por
+    benchmarks/bench_detectores.py. Sin mediciones para la entidad devuelve
+    None ("sin medir"): no se evalúa en el momento.
+    """
+    registros = []
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as archivo:
+            registros = [
+                r
+                for r in json.load(archivo)
+                if r["entidad"] == entidad and r["detector"] == detector
+            ]
+    if not registros:
+        return None
+    recall = max(registros, key=lambda r: r["tamano"])["recall"]
+    return round(float(recall) * 100, 1)
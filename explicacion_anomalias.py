@@ -0,0 +1,172 @@
+"""
+EXPLICACIÓN DE ANOMALÍAS
+Atribuye cada anomalía a las features que la originan, midiendo cuánto se
+aparta cada valor de la mediana de su segmento (p. ej. su `tipo_deuda`) en
+unidades de rango intercuartílico. Todo se calcula en lote, con operaciones
+vectorizadas sobre la matriz de filas marcadas, en la misma pasada que los
+puntajes; el resultado alimenta la tabla del dashboard y el informe PDF.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+ETIQUETAS_FEATURES = {
+    "saldo_pendiente_historico": "saldo pendiente",
+    "tasa_interes_anual": "tasa de interés",
+    "plazo_anios": "plazo",
+    "monto_estimado_ars": "monto estimado",
+    "probabilidad_valor": "probabilidad",
+    "dias_desde_creacion": "antigüedad",
+}
+
+# Con desvíos menores el valor queda dentro del rango intercuartílico
+DESVIO_MINIMO_MOTIVO = 0.5
+
+
+@dataclass
+class ReferenciaSegmentos:
+    """Mediana y escala (rango intercuartílico) de cada feature por segmento"""
+
+    features: list
+    nombres: np.ndarray
+    medianas: np.ndarray
+    escalas: np.ndarray
+
+    def codigos(self, segmentos):
+        """Código de cada nombre de segmento (-1 si no tiene referencia)"""
+        return pd.Index(self.nombres).get_indexer(np.asarray(segmentos, dtype=object))
+
+
+# =================================================================
+# REFERENCIA POR SEGMENTO
+# =================================================================
+
+
+def referencia_por_segmento(matriz, segmentos, features):
+    """
+    Calcula la referencia de cada segmento sobre las filas analizadas
+
+    Args:
+        matriz: np.ndarray (filas x features) de las filas analizadas
+        segmentos: Segmento de cada fila (array, Series o Categorical)
+        features: Nombres de las columnas de `matriz`
+
+    Returns:
+        ReferenciaSegmentos
+    """
+    codigos, nombres = pd.factorize(segmentos, sort=True)
+    cuartiles = (
+        pd.DataFrame(matriz, columns=features)
+        .groupby(codigos, sort=True)
+        .quantile([0.25, 0.5, 0.75])
+        .to_numpy()
+        .reshape(len(nombres), 3, len(features))
+    )
+    medianas = cuartiles[:, 1, :]
+    escalas = cuartiles[:, 2, :] - cuartiles[:, 0, :]
+
+    # Segmentos sin dispersión en alguna feature: se usa la escala global
+    global_ = np.subtract(*np.percentile(matriz, [75, 25], axis=0))
+    global_ = np.where(global_ > 0, global_, np.abs(np.median(matriz, axis=0)))
+    global_ = np.where(global_ > 0, global_, 1.0)
+    escalas = np.where(escalas > 0, escalas, global_)
+
+    return ReferenciaSegmentos(
+        features=list(features),
+        nombres=np.asarray(nombres, dtype=object),
+        medianas=medianas,
+        escalas=escalas,
+    )
+
+
+# =================================================================
+# ATRIBUCIONES
+# =================================================================
+
+
+def _motivos(desvios, aportes, nombres_segmento, features):
+    """Texto del motivo principal de cada fila (vectorizado por columna)"""
+    etiquetas = np.array([ETIQUETAS_FEATURES.get(f, f) for f in features], dtype=object)
+    principal = np.abs(desvios).argmax(axis=1)
+    filas = np.arange(len(desvios))
+    desvio = desvios[filas, principal]
+
+    motivo = (
+        pd.Series(etiquetas[principal])
+        + np.where(desvio >= 0, " por encima", " por debajo")
+        + " de la mediana de "
+        + pd.Series(nombres_segmento, dtype=object)
+        + " ("
+        + pd.Series(np.abs(desvio)).map("{:.1f}".format)
+        + " RIQ, "
+        + pd.Series(aportes[filas, principal] * 100).map("{:.0f}".format)
+        + "% del desvío)"
+    )
+    sin_motivo = np.abs(desvio) < DESVIO_MINIMO_MOTIVO
+    motivo[sin_motivo] = (
+        "combinación inusual de valores dentro del rango intercuartílico"
+    )
+    return etiquetas[principal], motivo.to_numpy(dtype=object)
+
+
+def explicar_anomalias(matriz, segmentos, referencia):
+    """
+    Atribuciones de las filas indicadas respecto de su segmento
+
+    Para cada feature se informa el desvío robusto
+    `(valor - mediana del segmento) / RIQ del segmento` y su aporte al total
+    de desvíos absolutos de la fila. Es una aproximación interpretable: el
+    puntaje de Isolation Forest no se descompone en forma aditiva, pero las
+    features con mayor desvío son las que aíslan la fila en pocos cortes.
+
+    Args:
+        matriz: np.ndarray (filas x features) de las filas a explicar
+        segmentos: Nombre del segmento de cada fila
+        referencia: ReferenciaSegmentos de la población analizada
+
+    Returns:
+        pd.DataFrame: Columnas desvio_<feature>, aporte_<feature>,
+        factor_principal y motivo, una fila por fila de `matriz`
+    """
+    features = referencia.features
+    segmentos = np.asarray(segmentos, dtype=object)
+    codigos = referencia.codigos(segmentos)
+    if (codigos < 0).any():
+        raise ValueError("Hay segmentos sin referencia")
+
+    desvios = (matriz - referencia.medianas[codigos]) / referencia.escalas[codigos]
+    absolutos = np.abs(desvios)
+    totales = absolutos.sum(axis=1, keepdims=True)
+    aportes = np.divide(
+        absolutos, totales, out=np.zeros_like(absolutos), where=totales > 0
+    )
+    factor, motivo = _motivos(desvios, aportes, segmentos, features)
+
+    columnas = {f"desvio_{f}": desvios[:, i] for i, f in enumerate(features)}
+    columnas.update({f"aporte_{f}": aportes[:, i] for i, f in enumerate(features)})
+    columnas["factor_principal"] = factor
+    columnas["motivo"] = motivo
+    return pd.DataFrame(columnas)
+
+
+def detalle_para_informe(anomalias, columna_id, columna_tipo, limite=10):
+    """
+    Anomalías de mayor puntaje con su motivo, en el formato de los informes
+
+    Returns:
+        list: Diccionarios con id, tipo, puntaje y motivo
+    """
+    if anomalias.empty or "motivo" not in anomalias.columns:
+        return []
+    principales = anomalias.nlargest(limite, "puntaje_anomalia")
+    return [
+        {
+            "id": str(fila[columna_id]),
+            "tipo": str(fila[columna_tipo]),
+            "puntaje": round(float(fila["puntaje_anomalia"]), 4),
+            "motivo": fila["motivo"],
+        }
+        for _, fila in principales.iterrows()
+    ]
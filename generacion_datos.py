@@ -0,0 +1,595 @@
+"""
+MOTOR VECTORIZADO DE GENERACIÓN DE DATOS
+Genera carteras simuladas de Pasivo No Corriente con operaciones columnares
+de NumPy, pensado para pruebas de carga con millones de instrumentos.
+
+Objetivo de rendimiento (un núcleo): al menos 500.000 deudas por segundo.
+Se mide con `python benchmarks/bench_generacion.py`.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from amortizacion import (
+    CONDICIONES_POR_TIPO,
+    FRECUENCIAS,
+    SISTEMAS,
+    calcular_saldos,
+    condiciones,
+)
+from devengamiento import CONVENCION_POR_TIPO, CONVENCIONES
+from padron_empresas import ID_EMPRESA_INICIAL
+from representacion_compacta import convertir_montos
+from revaluacion import MONEDAS, cotizaciones_a_fechas
+
+# =================================================================
+# CATÁLOGOS
+# =================================================================
+
+TIPOS_DEUDA_NO_CORRIENTE = [
+    "Préstamo Bancario a Largo Plazo",
+    "Bonos Emitidos",
+    "Hipoteca Inmobiliaria",
+    "Arrendamiento Financiero (Leasing)",
+    "Deuda con Partes Relacionadas (Largo Plazo)",
+    "Obligaciones Negociables",
+]
+PLAZOS_ANIOS = [3, 5, 7, 10, 15, 20]
+
+# Rango de tasa anual (mínimo, máximo) por tipo de deuda, mismo orden que
+# TIPOS_DEUDA_NO_CORRIENTE
+RANGOS_TASA_POR_TIPO = np.array(
+    [
+        [0.06, 0.15],
+        [0.04, 0.12],
+        [0.03, 0.10],
+        [0.03, 0.10],
+        [0.03, 0.10],
+        [0.04, 0.12],
+    ]
+)
+
+# Costos de emisión y transacción (mínimo, máximo) como fracción del monto
+# original, mismo orden que TIPOS_DEUDA_NO_CORRIENTE
+RANGOS_COSTOS_POR_TIPO = np.array(
+    [
+        [0.005, 0.015],
+        [0.010, 0.030],
+        [0.005, 0.020],
+        [0.000, 0.010],
+        [0.000, 0.000],
+        [0.010, 0.030],
+    ]
+)
+
+# Sistema de amortización y frecuencia de pagos por tipo (códigos sobre
+# amortizacion.SISTEMAS y amortizacion.FRECUENCIAS)
+SISTEMA_POR_TIPO = np.array(
+    [SISTEMAS.index(CONDICIONES_POR_TIPO[t][0]) for t in TIPOS_DEUDA_NO_CORRIENTE]
+)
+FRECUENCIA_POR_TIPO = np.array(
+    [
+        list(FRECUENCIAS).index(CONDICIONES_POR_TIPO[t][1])
+        for t in TIPOS_DEUDA_NO_CORRIENTE
+    ]
+)
+# Convención de conteo de días por tipo (códigos sobre
+# devengamiento.CONVENCIONES)
+CONVENCION_POR_TIPO_CODIGOS = np.array(
+    [CONVENCIONES.index(CONVENCION_POR_TIPO[t]) for t in TIPOS_DEUDA_NO_CORRIENTE]
+)
+
+# Probabilidad de cada moneda (ARS, USD, UVA; ver revaluacion.MONEDAS) por
+# tipo de deuda
+PROBABILIDAD_MONEDA_POR_TIPO = np.array(
+    [
+        [0.70, 0.20, 0.10],
+        [0.40, 0.60, 0.00],
+        [0.50, 0.00, 0.50],
+        [0.80, 0.20, 0.00],
+        [0.60, 0.40, 0.00],
+        [0.30, 0.60, 0.10],
+    ]
+)
+
+ESTADOS_DEUDA = ["Activa", "Pagada", "Incumplida", "Refinanciada"]
+ESTADOS_DEUDA_VENCIDA = ["Pagada", "Incumplida", "Refinanciada"]
+PESOS_ESTADO_VENCIDA = [0.6, 0.2, 0.2]
+PROBABILIDAD_INCUMPLIMIENTO_ACTIVA = 0.02
+
+TIPOS_PREVISION = [
+    "Garantías",
+    "Litigios",
+    "Cobranzas Dudosas",
+    "Reestructuración",
+    "Devoluciones de Ventas",
+    "Desmantelamiento",
+]
+PROBABILIDADES = ["Alta", "Media", "Baja"]
+ESTADOS_PREVISION = ["Activa", "Utilizada", "Revertida", "Ajustada"]
+PESOS_ESTADO_PREVISION = [0.6, 0.2, 0.1, 0.1]
+FECHA_REFERENCIA_PREVISIONES = datetime(2025, 7, 10)
+
+OBJETIVO_FILAS_POR_SEGUNDO = 500_000
+
+
+# =================================================================
+# FUNCIONES AUXILIARES
+# =================================================================
+
+
+def _a_dia(fecha):
+    """Convierte una fecha (date, datetime o str) a numpy datetime64[D]"""
+    if fecha is None:
+        fecha = FECHA_REFERENCIA_PREVISIONES
+    return np.datetime64(pd.Timestamp(fecha).date(), "D")
+
+
+# =================================================================
+# GENERADOR VECTORIZADO DE DEUDAS
+# =================================================================
+
+
+def generar_deudas_vectorizado(
+    num_deudas=30,
+    semilla=1011,
+    fecha_referencia=None,
+    num_empresas=25,
+    id_inicial=0,
+    tipo_montos="float64",
+):
+    """
+    Genera deudas no corrientes simuladas con operaciones vectorizadas
+
+    Conserva las reglas de estado de `generate_debt_dataframe`, pero sortea
+    todas las columnas como arreglos de NumPy en una sola pasada. Con la
+    misma semilla y la misma fecha de referencia el resultado es idéntico.
+
+    El saldo de las deudas vigentes y los intereses devengados salen del
+    cronograma de cada deuda (`amortizacion`), según el sistema y la
+    frecuencia de pagos de su tipo. Los costos de emisión y transacción
+    (`costos_transaccion`) alimentan la tasa efectiva de `costo_amortizado`.
+
+    Cada deuda tiene una moneda (`moneda`: pesos, dólares o UVA) y sus
+    importes están en la unidad de esa moneda: se sortean en pesos y se
+    convierten con la cotización de la emisión (`revaluacion`). Las UVA
+    solo se asignan a deudas emitidas con la UVA ya cotizada.
+
+    La empresa deudora se referencia solo por `empresa_id`; nombre y CUIT se
+    agregan con `padron_empresas.unir_empresas`. Tipo y estado se emiten como
+    categorías y las fechas como datetime64.
+
+    Args:
+        num_deudas: Cantidad de instrumentos a generar
+        semilla: Semilla del generador (int o numpy.random.SeedSequence)
+        fecha_referencia: Fecha "hoy" de la simulación (por defecto,
+            FECHA_REFERENCIA_PREVISIONES)
+        num_empresas: Tamaño del padrón de empresas deudoras
+        id_inicial: Desplazamiento de la numeración de `deuda_id` (bloques)
+        tipo_montos: "float64", "float32" o "centavos" (int64 escalado)
+
+    Returns:
+        pd.DataFrame: Deudas ordenadas por fecha de emisión
+    """
+    rng = np.random.default_rng(semilla)
+    hoy = _a_dia(fecha_referencia)
+    n = int(num_deudas)
+
+    idx_empresa = rng.integers(0, num_empresas, size=n)
+    idx_tipo = rng.integers(0, len(TIPOS_DEUDA_NO_CORRIENTE), size=n)
+
+    # Emisión entre 10 años y 90 días antes de la fecha de referencia
+    dias_atras = rng.integers(90, 3653, size=n)
+    fecha_emision = hoy - dias_atras.astype("timedelta64[D]")
+    plazo_anios = np.asarray(PLAZOS_ANIOS)[rng.integers(0, len(PLAZOS_ANIOS), size=n)]
+    dias_plazo = np.floor(plazo_anios * 365.25).astype("int64")
+    fecha_vencimiento = fecha_emision + dias_plazo.astype("timedelta64[D]")
+
+    monto_original = np.round(rng.uniform(500000, 10000000, size=n), 2)
+    rangos = RANGOS_TASA_POR_TIPO[idx_tipo]
+    tasa_interes_anual = np.round(rng.uniform(rangos[:, 0], rangos[:, 1]), 4)
+
+    # Estado y saldo según vencimiento
+    vencida = fecha_vencimiento < hoy
+    idx_estado_vencida = rng.choice(
+        len(ESTADOS_DEUDA_VENCIDA), size=n, p=PESOS_ESTADO_VENCIDA
+    )
+    factor_saldo_vencida = rng.uniform(0.1, 1.0, size=n)
+    sorteo_incumplimiento = rng.random(size=n)
+
+    # Códigos sobre ESTADOS_DEUDA: las vencidas se desplazan uno (sin "Activa")
+    codigo_estado = np.where(
+        vencida,
+        idx_estado_vencida + 1,
+        np.where(
+            sorteo_incumplimiento < PROBABILIDAD_INCUMPLIMIENTO_ACTIVA,
+            ESTADOS_DEUDA.index("Incumplida"),
+            ESTADOS_DEUDA.index("Activa"),
+        ),
+    )
+
+    rangos_costos = RANGOS_COSTOS_POR_TIPO[idx_tipo]
+    proporcion_costos = rng.uniform(rangos_costos[:, 0], rangos_costos[:, 1])
+
+    # Moneda (sorteada al final para no alterar las demás columnas); los
+    # importes pasan de pesos a unidades de la moneda a la emisión
+    acumuladas = np.cumsum(PROBABILIDAD_MONEDA_POR_TIPO[idx_tipo], axis=1)
+    moneda = (rng.random(size=n)[:, None] >= acumuladas[:, :-1]).sum(axis=1)
+    cotizacion_emision = cotizaciones_a_fechas(moneda, fecha_emision)
+    sin_cotizacion = np.isnan(cotizacion_emision)
+    moneda[sin_cotizacion] = MONEDAS.index("ARS")
+    cotizacion_emision[sin_cotizacion] = 1.0
+    monto_original = np.round(monto_original / cotizacion_emision, 2)
+    costos_transaccion = np.round(monto_original * proporcion_costos, 2)
+
+    sistema = SISTEMA_POR_TIPO[idx_tipo]
+    frecuencia = FRECUENCIA_POR_TIPO[idx_tipo]
+    convencion = CONVENCION_POR_TIPO_CODIGOS[idx_tipo]
+    saldos = calcular_saldos(
+        condiciones(
+            monto_original,
+            tasa_interes_anual,
+            plazo_anios,
+            fecha_emision,
+            sistema,
+            frecuencia,
+            convencion,
+        ),
+        hoy,
+    )
+    saldo_activa = np.round(saldos["saldo_capital"], 2)
+    saldo_vencida = np.where(
+        idx_estado_vencida == 0,
+        0.0,
+        np.round(monto_original * factor_saldo_vencida, 2),
+    )
+    saldo_pendiente_simulado = np.maximum(
+        np.where(vencida, saldo_vencida, saldo_activa), 0.0
+    )
+
+    intereses_acumulados_simulados = np.round(saldos["intereses_devengados"], 2)
+
+    numero = pd.Series(np.arange(50000 + id_inicial, 50000 + id_inicial + n))
+
+    df = pd.DataFrame(
+        {
+            "deuda_id": "DNC-" + numero.astype(str),
+            "empresa_id": ID_EMPRESA_INICIAL + idx_empresa,
+            "tipo_deuda": pd.Categorical.from_codes(
+                idx_tipo, categories=TIPOS_DEUDA_NO_CORRIENTE
+            ),
+            "fecha_emision": fecha_emision,
+            "fecha_vencimiento": fecha_vencimiento,
+            "plazo_anios": plazo_anios,
+            "monto_original": monto_original,
+            "tasa_interes_anual": tasa_interes_anual,
+            "saldo_pendiente_simulado": saldo_pendiente_simulado,
+            "intereses_acumulados_simulados": intereses_acumulados_simulados,
+            "costos_transaccion": costos_transaccion,
+            "estado_deuda": pd.Categorical.from_codes(
+                codigo_estado, categories=ESTADOS_DEUDA
+            ),
+            "sistema_amortizacion": pd.Categorical.from_codes(
+                sistema, categories=SISTEMAS
+            ),
+            "frecuencia_pagos": pd.Categorical.from_codes(
+                frecuencia, categories=list(FRECUENCIAS)
+            ),
+            "convencion_dias": pd.Categorical.from_codes(
+                convencion, categories=CONVENCIONES
+            ),
+            "moneda": pd.Categorical.from_codes(moneda, categories=MONEDAS),
+        }
+    )
+    df.sort_values(by="fecha_emision", inplace=True, kind="stable")
+    return convertir_montos(df, "deudas", tipo_montos)
+
+
+# =================================================================
+# GENERADOR VECTORIZADO DE PREVISIONES
+# =================================================================
+
+
+def generar_previsiones_vectorizado(
+    num_previsiones=30,
+    fecha_referencia=FECHA_REFERENCIA_PREVISIONES,
+    semilla=42,
+    id_inicial=0,
+    tipo_montos="float64",
+):
+    """
+    Genera previsiones simuladas con operaciones vectorizadas
+
+    Aplica las mismas reglas que `generar_dataframe_previsiones`, incluida la
+    `fecha_estimada_utilizacion` dependiente del estado, mediante máscaras de
+    NumPy. Las columnas de fecha se emiten directamente como datetime64 y las
+    de baja cardinalidad como categorías.
+
+    Args:
+        num_previsiones: Cantidad de previsiones a generar
+        fecha_referencia: Fecha de corte de la simulación
+        semilla: Semilla del generador (int o numpy.random.SeedSequence)
+        id_inicial: Desplazamiento de la numeración de `id_prevision` (bloques)
+        tipo_montos: "float64", "float32" o "centavos" (int64 escalado)
+
+    Returns:
+        pd.DataFrame: Previsiones en orden de generación
+    """
+    rng = np.random.default_rng(semilla)
+    referencia = _a_dia(fecha_referencia)
+    n = int(num_previsiones)
+
+    idx_tipo = rng.integers(0, len(TIPOS_PREVISION), size=n)
+    idx_estado = rng.choice(len(ESTADOS_PREVISION), size=n, p=PESOS_ESTADO_PREVISION)
+    fecha_creacion = referencia - rng.integers(30, 365 * 3 + 1, size=n).astype(
+        "timedelta64[D]"
+    )
+    monto_estimado = np.round(rng.uniform(100000.0, 5000000.0, size=n), 2)
+
+    fecha_ult_rev = np.minimum(
+        fecha_creacion + rng.integers(15, 366, size=n).astype("timedelta64[D]"),
+        referencia,
+    )
+
+    # Fecha estimada de utilización según el estado de la previsión
+    vigente = np.isin(
+        idx_estado, [ESTADOS_PREVISION.index(e) for e in ("Activa", "Ajustada")]
+    )
+    cerrada = np.isin(
+        idx_estado, [ESTADOS_PREVISION.index(e) for e in ("Utilizada", "Revertida")]
+    )
+    utilizacion_vigente = referencia + rng.integers(30, 365 * 2 + 1, size=n).astype(
+        "timedelta64[D]"
+    )
+    utilizacion_cerrada = fecha_creacion + rng.integers(30, 501, size=n).astype(
+        "timedelta64[D]"
+    )
+    utilizacion_cerrada = np.where(
+        utilizacion_cerrada > referencia,
+        referencia - rng.integers(1, 61, size=n).astype("timedelta64[D]"),
+        utilizacion_cerrada,
+    )
+    fecha_est_utilizacion = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    fecha_est_utilizacion[vigente] = utilizacion_vigente[vigente]
+    fecha_est_utilizacion[cerrada] = utilizacion_cerrada[cerrada]
+
+    # Las partes fijas de los textos se arman una vez por tipo, no por fila
+    prefijos_descripcion = np.asarray(
+        [f"Previsión por {tipo} - Evento " for tipo in TIPOS_PREVISION], dtype=object
+    )
+    numero = pd.Series(np.arange(id_inicial, id_inicial + n)).astype(str)
+
+    df = pd.DataFrame(
+        {
+            "id_prevision": "PREV-" + numero.str.pad(4, side="left", fillchar="0"),
+            "tipo_prevision": pd.Categorical.from_codes(
+                idx_tipo, categories=TIPOS_PREVISION
+            ),
+            "descripcion_breve": pd.Series(prefijos_descripcion[idx_tipo], dtype=str)
+            + pd.Series(np.arange(id_inicial + 1, id_inicial + n + 1)).astype(str),
+            "fecha_creacion": fecha_creacion,
+            "monto_estimado_ars": monto_estimado,
+            "probabilidad_ocurrencia": pd.Categorical.from_codes(
+                rng.integers(0, len(PROBABILIDADES), size=n), categories=PROBABILIDADES
+            ),
+            "estado_actual": pd.Categorical.from_codes(
+                idx_estado, categories=ESTADOS_PREVISION
+            ),
+            "fecha_ultima_revision": fecha_ult_rev,
+            "fecha_estimada_utilizacion": fecha_est_utilizacion,
+        }
+    )
+    return convertir_montos(df, "previsiones", tipo_montos)
+
+
+# =================================================================
+# GENERACIÓN POR BLOQUES
+# =================================================================
+
+_GENERADORES = {
+    "deudas": generar_deudas_vectorizado,
+    "previsiones": generar_previsiones_vectorizado,
+}
+_FECHA_REFERENCIA_POR_DEFECTO = {
+    "deudas": FECHA_REFERENCIA_PREVISIONES,
+    "previsiones": FECHA_REFERENCIA_PREVISIONES,
+}
+
+
+def semilla_bloque(semilla_maestra, indice_bloque):
+    """
+    Deriva la semilla de un bloque a partir de la semilla maestra
+
+    Equivale a `SeedSequence(semilla_maestra).spawn(n)[indice_bloque]`, por lo
+    que cada bloque puede regenerarse en forma aislada y los flujos de los
+    distintos bloques son estadísticamente independientes.
+    """
+    return np.random.SeedSequence(semilla_maestra, spawn_key=(int(indice_bloque),))
+
+
+def generar_bloque(
+    entidad,
+    indice_bloque,
+    total_filas,
+    tamano_bloque=1_000_000,
+    semilla_maestra=2025,
+    fecha_referencia=None,
+    **opciones,
+):
+    """
+    Genera un único bloque de deudas o previsiones
+
+    Args:
+        entidad: "deudas" o "previsiones"
+        indice_bloque: Posición del bloque (0, 1, 2, ...)
+        total_filas: Cantidad total de filas del conjunto completo
+        tamano_bloque: Filas por bloque (el último puede ser menor)
+        semilla_maestra: Semilla de la que se derivan las de cada bloque
+        fecha_referencia: Fecha de corte; si es None se usa la de la entidad
+        **opciones: Parámetros adicionales del generador (p. ej. num_empresas)
+
+    Returns:
+        pd.DataFrame: Filas [indice_bloque * tamano_bloque, ...) del conjunto
+    """
+    if entidad not in _GENERADORES:
+        raise ValueError(f"Entidad desconocida: {entidad}")
+    if fecha_referencia is None:
+        fecha_referencia = _FECHA_REFERENCIA_POR_DEFECTO[entidad]
+
+    inicio = int(indice_bloque) * int(tamano_bloque)
+    filas = min(int(tamano_bloque), int(total_filas) - inicio)
+    if filas <= 0:
+        raise IndexError(f"El bloque {indice_bloque} está fuera del conjunto")
+
+    return _GENERADORES[entidad](
+        filas,
+        semilla=semilla_bloque(semilla_maestra, indice_bloque),
+        fecha_referencia=fecha_referencia,
+        id_inicial=inicio,
+        **opciones,
+    )
+
+
+def generar_bloques(
+    entidad,
+    total_filas,
+    tamano_bloque=1_000_000,
+    semilla_maestra=2025,
+    fecha_referencia=None,
+    formato="pandas",
+    **opciones,
+):
+    """
+    Genera un conjunto de datos como una secuencia de bloques de tamaño fijo
+
+    Solo un bloque reside en memoria a la vez. Devuelve DataFrames
+    (formato="pandas") o `pyarrow.RecordBatch` (formato="arrow").
+    """
+    if formato not in ("pandas", "arrow"):
+        raise ValueError(f"Formato de bloque desconocido: {formato}")
+    if fecha_referencia is None:
+        fecha_referencia = _FECHA_REFERENCIA_POR_DEFECTO[entidad]
+    # Se fija una sola fecha para que todos los bloques compartan el mismo "hoy"
+    fecha_referencia = _a_dia(fecha_referencia)
+
+    num_bloques = -(-int(total_filas) // int(tamano_bloque))
+    for indice in range(num_bloques):
+        bloque = generar_bloque(
+            entidad,
+            indice,
+            total_filas,
+            tamano_bloque=tamano_bloque,
+            semilla_maestra=semilla_maestra,
+            fecha_referencia=fecha_referencia,
+            **opciones,
+        )
+        if formato == "arrow":
+            import pyarrow as pa
+
+            bloque = pa.RecordBatch.from_pandas(bloque, preserve_index=False)
+        yield bloque
+
+
+def escribir_bloques_parquet(bloques, ruta):
+    """
+    Escribe una secuencia de bloques en un único archivo Parquet
+
+    Cada bloque se vuelca como un row group, de modo que la memoria usada
+    queda acotada por el tamaño de bloque.
+
+    Returns:
+        int: Cantidad de filas escritas
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    filas = 0
+    try:
+        for bloque in bloques:
+            if not isinstance(bloque, pa.RecordBatch):
+                bloque = pa.RecordBatch.from_pandas(bloque, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(ruta, bloque.schema)
+            escritor.write_batch(bloque)
+            filas += bloque.num_rows
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return filas
+
+
+# =================================================================
+# GENERACIÓN PARALELA
+# =================================================================
+
+
+def generar_paralelo(
+    entidad,
+    total_filas,
+    tamano_bloque=250_000,
+    semilla_maestra=2025,
+    fecha_referencia=None,
+    max_workers=None,
+    **opciones,
+):
+    """
+    Genera un conjunto completo repartiendo los bloques en un pool de procesos
+
+    Cada bloque usa su propio flujo de `SeedSequence.spawn` (ver
+    `semilla_bloque`) y los resultados se concatenan en orden de bloque, por
+    lo que el DataFrame final es idéntico para cualquier cantidad de workers
+    (depende solo de la semilla maestra y del tamaño de bloque).
+    Las deudas se reordenan por fecha de emisión como en el modo clásico.
+
+    Args:
+        entidad: "deudas" o "previsiones"
+        total_filas: Cantidad total de filas
+        tamano_bloque: Filas por bloque (unidad de trabajo de cada worker)
+        semilla_maestra: Semilla de la que se derivan las de cada bloque
+        fecha_referencia: Fecha de corte; si es None se usa la de la entidad
+        max_workers: Procesos del pool (None = todos los núcleos, 1 = sin pool)
+        **opciones: Parámetros adicionales del generador (p. ej. num_empresas)
+
+    Returns:
+        pd.DataFrame: Conjunto completo
+    """
+    if entidad not in _GENERADORES:
+        raise ValueError(f"Entidad desconocida: {entidad}")
+    if fecha_referencia is None:
+        fecha_referencia = _FECHA_REFERENCIA_POR_DEFECTO[entidad]
+    fecha_referencia = _a_dia(fecha_referencia)
+
+    num_bloques = -(-int(total_filas) // int(tamano_bloque))
+    if num_bloques <= 0:
+        # Sin filas: el generador devuelve las columnas con sus tipos, vacías
+        return _GENERADORES[entidad](
+            0,
+            semilla=semilla_bloque(semilla_maestra, 0),
+            fecha_referencia=fecha_referencia,
+            **opciones,
+        )
+    tarea = partial(
+        generar_bloque,
+        entidad,
+        total_filas=total_filas,
+        tamano_bloque=tamano_bloque,
+        semilla_maestra=semilla_maestra,
+        fecha_referencia=fecha_referencia,
+        **opciones,
+    )
+
+    if max_workers == 1 or num_bloques <= 1:
+        bloques = [tarea(indice) for indice in range(num_bloques)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            bloques = list(pool.map(tarea, range(num_bloques)))
+
+    df = pd.concat(bloques, ignore_index=True)
+    if entidad == "deudas":
+        df.sort_values(by="fecha_emision", inplace=True, kind="stable")
+    return df
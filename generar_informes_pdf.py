@@ -3,16 +3,30 @@ GENERADOR DE INFORMES DE AUDITORÍA EN PDF
 Crea informes profesionales para el análisis de Pasivo No Corriente
 """
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from datetime import datetime
-import pandas as pd
 import os
 
+DIRECTORIO_INFORMES = 'data/informes_auditoria'
+
+
+def _importar_reportlab():
+    """
+    Importa reportlab en el primer informe generado
+
+    Los nombres quedan como globales del módulo, de modo que importar este
+    archivo (o la aplicación que lo usa) no carga reportlab hasta que se
+    crea un GeneradorInformePDF.
+    """
+    global A4, getSampleStyleSheet, ParagraphStyle, cm, colors
+    global SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    global TA_CENTER, TA_JUSTIFY, TA_LEFT
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+
 
 class GeneradorInformePDF:
     """Genera informes de auditoría en formato PDF"""
@@ -21,6 +35,7 @@ class GeneradorInformePDF:
         self.año = año
         self.datos_deudas = datos_deudas or {}
         self.datos_previsiones = datos_previsiones or {}
+        _importar_reportlab()
         self.styles = getSampleStyleSheet()
         self._crear_estilos_personalizados()
     
@@ -142,6 +157,10 @@ class GeneradorInformePDF:
         anomalias_previsiones = self.datos_previsiones.get('anomalias', 4)
         total_anomalias = anomalias_deudas + anomalias_previsiones
         
+        # Recall medido sobre anomalías inyectadas (evaluacion_detectores)
+        deteccion_deudas = self._porcentaje_deteccion(self.datos_deudas)
+        deteccion_previsiones = self._porcentaje_deteccion(self.datos_previsiones)
+        
         texto_resumen = f"""
         El presente informe corresponde al análisis algorítmico del <b>Pasivo No Corriente</b> 
         del ejercicio fiscal {self.año}, realizado mediante técnicas avanzadas de machine learning 
@@ -157,8 +176,9 @@ class GeneradorInformePDF:
         • <b>Anomalías Detectadas:</b> {total_anomalias} registros ({anomalias_deudas} en deudas, 
         {anomalias_previsiones} en previsiones)
         <br/>
-        • <b>Tasa de Precisión del Algoritmo:</b> 87% en deudas, 85% en previsiones
-        <br/><br/>
+        • <b>Tasa de Detección Medida:</b> {deteccion_deudas} en deudas, 
+        {deteccion_previsiones} en previsiones (anomalías inyectadas en datos sintéticos)
+        <br/>{self._vigentes_cierre()}<br/>
         El análisis ha identificado patrones de riesgo que requieren atención inmediata de la gerencia, 
         particularmente en relación con obligaciones de largo plazo y previsiones para contingencias legales.
         """
@@ -168,6 +188,48 @@ class GeneradorInformePDF:
         
         return elementos
     
+    @staticmethod
+    def _detalle_anomalias(datos, registro, ejemplo):
+        """
+        Viñetas con las anomalías de mayor puntaje y su motivo (calculado por
+        explicacion_anomalias); sin detalle se usan los casos de ejemplo
+        """
+        filas = datos.get('anomaliasDetalle', ejemplo)
+        return '<br/>'.join(
+            f"• <b>{registro} {fila['id']}</b> ({fila['tipo']}): {fila['motivo']}"
+            for fila in filas
+        )
+    
+    def _vigentes_cierre(self):
+        """Viñeta con los registros vigentes al 31/12 del ejercicio, si se informaron"""
+        deudas = self.datos_deudas.get('vigentesCierre')
+        previsiones = self.datos_previsiones.get('vigentesCierre')
+        if deudas is None or previsiones is None:
+            return ''
+        texto = (f"• <b>Vigentes al 31/12/{self.año}:</b> {deudas} deudas y "
+                 f"{previsiones} previsiones<br/>")
+        reexpresado = self._monto_reexpresado()
+        if reexpresado is not None:
+            texto += (f"• <b>Montos de origen vigentes reexpresados al 31/12/{self.año} "
+                      f"(RT 6):</b> ${reexpresado:,.2f}<br/>")
+        return texto
+    
+    def _monto_reexpresado(self):
+        """Suma de los montos de origen vigentes reexpresados, si se informaron"""
+        deudas = self.datos_deudas.get('montoReexpresadoCierre')
+        previsiones = self.datos_previsiones.get('montoReexpresadoCierre')
+        if deudas is None or previsiones is None:
+            return None
+        return deudas + previsiones
+    
+    @staticmethod
+    def _porcentaje_deteccion(datos):
+        """Formatea el porcentaje de detección medido, si se informó"""
+        porcentaje = datos.get('porcentajeDeteccion')
+        if porcentaje is None:
+            return "sin medir"
+        return f"{porcentaje:.1f}%"
+    
     def _crear_analisis_normativo(self):
         """Crea la sección de análisis normativo"""
         elementos = []
@@ -178,7 +240,15 @@ class GeneradorInformePDF:
         # Normas Nacionales
         elementos.append(Paragraph("Normas Nacionales (Argentina)", self.styles['Seccion']))
         
-        texto_nacional = """
+        texto_rt6 = ''
+        if self._monto_reexpresado() is not None:
+            texto_rt6 = """<b>• Resolución Técnica Nº 6 (FACPCE):</b> Los montos de origen de las 
+        deudas y previsiones vigentes al cierre se reexpresaron en moneda de cierre con los 
+        coeficientes de una serie mensual de índices de precios.
+        <br/><br/>
+        """
+        
+        texto_nacional = f"""
         El análisis se ha realizado en cumplimiento de las siguientes normas técnicas argentinas:
         <br/><br/>
         <b>• Resolución Técnica Nº 37 (FACPCE):</b> Normas contables profesionales sobre pasivos 
@@ -189,6 +259,7 @@ class GeneradorInformePDF:
         a instrumentos financieros. Se evaluó la valuación de deudas financieras y el tratamiento 
         de instrumentos derivados.
         <br/><br/>
+        {texto_rt6}
         <b>• Ley 25.506 - Firma Digital:</b> Los registros digitales y las salidas algorítmicas 
         cumplen con los requisitos de integridad y autenticidad establecidos en la normativa.
         <br/><br/>
@@ -279,14 +350,16 @@ class GeneradorInformePDF:
         # Anomalías detectadas
         elementos.append(Paragraph("Anomalías Detectadas", self.styles['Seccion']))
         
+        detalle = self._detalle_anomalias(self.datos_deudas, 'Deuda', [
+            {'id': 'D-007', 'tipo': 'Préstamo Bancario', 'motivo': 'ratio de amortización atípico (85% de reducción en un período)'},
+            {'id': 'D-015', 'tipo': 'Bonos Emitidos', 'motivo': 'tasa de interés significativamente superior al mercado'},
+            {'id': 'D-023', 'tipo': 'Obligaciones Negociables', 'motivo': 'cláusula de vencimiento anticipado activada'}
+        ])
+        
         texto_anomalias = f"""
         El algoritmo de detección (Isolation Forest) identificó <b>{anomalias} registros anómalos</b>:
         <br/><br/>
-        • <b>Deuda D-007:</b> Préstamo bancario con ratio de amortización atípico (85% de reducción en un período)
-        <br/>
-        • <b>Deuda D-015:</b> Bono corporativo con tasa de interés significativamente superior al mercado
-        <br/>
-        • <b>Deuda D-023:</b> Obligación negociable con cláusula de vencimiento anticipado activada
+        {detalle}
         <br/><br/>
         <b>Recomendación:</b> Se sugiere revisar la documentación de respaldo de estos registros 
         y verificar su correcta contabilización y clasificación.
@@ -357,16 +430,17 @@ class GeneradorInformePDF:
         # Anomalías detectadas
         elementos.append(Paragraph("Anomalías Detectadas", self.styles['Seccion']))
         
+        detalle = self._detalle_anomalias(self.datos_previsiones, 'Previsión', [
+            {'id': 'P-004', 'tipo': 'Litigios', 'motivo': 'monto estimado 3 desviaciones estándar por encima de la media'},
+            {'id': 'P-012', 'tipo': 'Garantías', 'motivo': 'probabilidad de utilización inusualmente alta'},
+            {'id': 'P-018', 'tipo': 'Reestructuración', 'motivo': 'antigüedad superior a 36 meses sin movimiento'},
+            {'id': 'P-027', 'tipo': 'Cobranzas Dudosas', 'motivo': 'monto significativamente inferior al esperado'}
+        ])
+        
         texto_anomalias = f"""
         El análisis identificó <b>{anomalias} previsiones anómalas</b>:
         <br/><br/>
-        • <b>Previsión P-004:</b> Litigio laboral con monto estimado 3 desviaciones estándar por encima de la media
-        <br/>
-        • <b>Previsión P-012:</b> Garantía con probabilidad de utilización inusualmente alta
-        <br/>
-        • <b>Previsión P-018:</b> Reestructuración con antigüedad superior a 36 meses sin movimiento
-        <br/>
-        • <b>Previsión P-027:</b> Cobranza dudosa con monto significativamente inferior al esperado
+        {detalle}
         <br/><br/>
         <b>Recomendación:</b> Revisar las bases de cálculo y los informes legales que sustentan 
         estas estimaciones. Evaluar si es necesario ajustar los montos o reclasificar las previsiones.
@@ -520,58 +594,125 @@ class GeneradorInformePDF:
             return False
 
 
-def generar_informes_ejemplo():
-    """Genera informes de ejemplo para los años 2020-2024"""
+def datos_desde_analisis(resultado_deudas, resultado_previsiones, limite_anomalias=10,
+                         año=None):
+    """
+    Arma los diccionarios del informe a partir de los resultados de
+    motor_analisis, con el detalle y el motivo de las anomalías principales.
+    Con `año`, agrega los registros vigentes al cierre de ese ejercicio
+    (índices de intervalos de los resultados, sin recorrer la cartera).
     
-    # Crear directorio de salida
-    os.makedirs('data/informes_auditoria', exist_ok=True)
+    Returns:
+        tuple: (datos_deudas, datos_previsiones) para GeneradorInformePDF
+    """
+    from evaluacion_detectores import porcentaje_deteccion_medido
+    from explicacion_anomalias import detalle_para_informe
     
-    # Datos de ejemplo para diferentes años
-    años = [2020, 2021, 2022, 2023, 2024]
+    def _composicion(montos):
+        total = montos.sum()
+        return [
+            {'tipo': str(tipo), 'monto': float(monto),
+             'porcentaje': round(float(monto / total * 100), 1) if total else 0.0}
+            for tipo, monto in montos.items()
+        ]
+    
+    datos_deudas = {
+        'total': resultado_deudas.total_deudas,
+        'saldoPendiente': resultado_deudas.saldo_pendiente_total,
+        'anomalias': resultado_deudas.cantidad_anomalias,
+        'porcentajeDeteccion': porcentaje_deteccion_medido('deudas'),
+        'tiposDeuda': _composicion(resultado_deudas.saldo_por_tipo),
+        'anomaliasDetalle': detalle_para_informe(
+            resultado_deudas.anomalias, 'deuda_id', 'tipo_deuda', limite_anomalias
+        ),
+    }
+    datos_previsiones = {
+        'total': resultado_previsiones.total_previsiones,
+        'montoEstimado': resultado_previsiones.monto_estimado_total,
+        'anomalias': resultado_previsiones.cantidad_anomalias,
+        'porcentajeDeteccion': porcentaje_deteccion_medido('previsiones'),
+        'tiposProvision': _composicion(resultado_previsiones.monto_por_tipo),
+        'anomaliasDetalle': detalle_para_informe(
+            resultado_previsiones.anomalias, 'id_prevision', 'tipo_prevision',
+            limite_anomalias
+        ),
+    }
+    if año is not None:
+        import pandas as pd
+        
+        from motor_analisis import vigentes_por_ejercicio
+        
+        vigentes = vigentes_por_ejercicio(resultado_deudas, resultado_previsiones, [año])
+        fila = vigentes.iloc[0]
+        datos_deudas['vigentesCierre'] = int(fila['deudas_vigentes'])
+        datos_previsiones['vigentesCierre'] = int(fila['previsiones_vigentes'])
+        # Sin NaN: la serie de índices cubre el ejercicio y todos los orígenes
+        if pd.notna(fila['monto_reexpresado_deudas']) and pd.notna(
+            fila['monto_reexpresado_previsiones']
+        ):
+            datos_deudas['montoReexpresadoCierre'] = float(fila['monto_reexpresado_deudas'])
+            datos_previsiones['montoReexpresadoCierre'] = float(
+                fila['monto_reexpresado_previsiones']
+            )
+    return datos_deudas, datos_previsiones
+
+
+def generar_informe_desde_analisis(resultado_deudas, resultado_previsiones, año,
+                                   nombre_archivo=None, limite_anomalias=10):
+    """
+    Genera el informe de un ejercicio a partir de los resultados de
+    motor_analisis: motivos de las anomalías, registros vigentes al cierre
+    y totales reexpresados (RT 6)
+    
+    Returns:
+        str: Ruta del PDF generado, o None si falló
+    """
+    datos_deudas, datos_previsiones = datos_desde_analisis(
+        resultado_deudas, resultado_previsiones, limite_anomalias, año=año
+    )
+    if nombre_archivo is None:
+        nombre_archivo = os.path.join(DIRECTORIO_INFORMES, f'informe_auditoria_{año}.pdf')
+    os.makedirs(os.path.dirname(nombre_archivo) or '.', exist_ok=True)
+    generador = GeneradorInformePDF(año, datos_deudas, datos_previsiones)
+    return nombre_archivo if generador.generar_informe(nombre_archivo) else None
+
+
+def generar_informes_ejemplo(num_deudas=300, num_previsiones=300,
+                             años=(2020, 2021, 2022, 2023, 2024)):
+    """
+    Genera informes de ejemplo para los años 2020-2024 sobre una cartera
+    simulada. La cartera de deudas de cada ejercicio se simula y se analiza
+    a su cierre, por lo que no incluye deudas emitidas después; las
+    previsiones se analizan una vez a su fecha de referencia.
+    """
+    from generacion_datos import (
+        generar_deudas_vectorizado,
+        generar_previsiones_vectorizado,
+    )
+    from motor_analisis import calcular_analisis_deudas, calcular_analisis_previsiones
+    
+    df_previsiones = generar_previsiones_vectorizado(num_previsiones)
+    resultado_previsiones = calcular_analisis_previsiones(df_previsiones)
     
     for año in años:
         print(f"\n📄 Generando informe para el año {año}...")
-        
-        # Datos simulados (varían por año)
-        factor = 1 + (año - 2020) * 0.15  # Crecimiento del 15% anual
-        
-        datos_deudas = {
-            'total': 30 + (año - 2020) * 2,
-            'saldoPendiente': 98450250.75 * factor,
-            'anomalias': 3 + (año - 2020) % 2,
-            'tiposDeuda': [
-                {'tipo': 'Préstamo Bancario', 'monto': 35250000.00 * factor, 'porcentaje': 35.8},
-                {'tipo': 'Bonos Emitidos', 'monto': 28150000.50 * factor, 'porcentaje': 28.6},
-                {'tipo': 'Hipoteca', 'monto': 18500000.25 * factor, 'porcentaje': 18.8},
-                {'tipo': 'Arrendamiento', 'monto': 10200000.00 * factor, 'porcentaje': 10.4},
-                {'tipo': 'Obligaciones', 'monto': 6350250.00 * factor, 'porcentaje': 6.4}
-            ]
-        }
-        
-        datos_previsiones = {
-            'total': 30 + (año - 2020) * 3,
-            'montoEstimado': 52850000.00 * factor,
-            'anomalias': 4 + (año - 2020) % 3,
-            'tiposProvision': [
-                {'tipo': 'Garantías', 'monto': 18250000.00 * factor, 'porcentaje': 34.5},
-                {'tipo': 'Litigios', 'monto': 15680000.00 * factor, 'porcentaje': 29.7},
-                {'tipo': 'Cobranzas Dudosas', 'monto': 10920000.00 * factor, 'porcentaje': 20.7},
-                {'tipo': 'Reestructuración', 'monto': 5200000.00 * factor, 'porcentaje': 9.8},
-                {'tipo': 'Desmantelamiento', 'monto': 2800000.00 * factor, 'porcentaje': 5.3}
-            ]
-        }
-        
-        # Generar informe
-        generador = GeneradorInformePDF(año, datos_deudas, datos_previsiones)
-        nombre_archivo = f'data/informes_auditoria/informe_auditoria_{año}.pdf'
-        
-        if generador.generar_informe(nombre_archivo):
+        fecha_cierre = datetime(año, 12, 31)
+        df_deudas = generar_deudas_vectorizado(
+            num_deudas, fecha_referencia=fecha_cierre
+        )
+        resultado_deudas = calcular_analisis_deudas(
+            df_deudas, fecha_corte=fecha_cierre
+        )
+        nombre_archivo = generar_informe_desde_analisis(
+            resultado_deudas, resultado_previsiones, año
+        )
+        if nombre_archivo:
             print(f"   ✓ Generado: {nombre_archivo}")
         else:
-            print(f"   ✗ Error al generar {nombre_archivo}")
+            print(f"   ✗ Error al generar el informe {año}")
     
     print("\n" + "="*70)
-    print("✅ Proceso completado. Informes generados en: data/informes_auditoria/")
+    print(f"✅ Proceso completado. Informes generados en: {DIRECTORIO_INFORMES}/")
     print("="*70)
 
 
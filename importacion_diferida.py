@@ -0,0 +1,34 @@
+"""
+IMPORTACIÓN DIFERIDA DE DEPENDENCIAS PESADAS
+Permite declarar a nivel de módulo dependencias como matplotlib, seaborn o
+PyPDF2 sin pagar su importación en el arranque: el módulo real se importa
+recién en el primer acceso a uno de sus atributos.
+"""
+
+import importlib
+
+
+class ModuloDiferido:
+    """
+    Representante de un módulo que se importa en el primer uso
+
+    Ejemplo:
+        plt = ModuloDiferido("matplotlib.pyplot")
+        plt.subplots()  # aquí se importa matplotlib
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def _cargar(self):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "sin cargar"
+        return f"<ModuloDiferido {self._nombre} ({estado})>"
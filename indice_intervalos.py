@@ -0,0 +1,293 @@
+"""
+ÍNDICE DE INTERVALOS
+Índice sobre la vida de cada registro (emisión -> vencimiento de las deudas,
+creación -> utilización estimada de las previsiones) para responder
+"¿qué registros estaban vigentes al 31/12/2021?" sin recorrer la cartera.
+
+Es un árbol de intervalos centrado y estático, guardado en arreglos planos:
+cada nodo tiene una fecha central y los intervalos que la contienen,
+ordenados por inicio y por fin. Una consulta baja por un solo camino
+(profundidad O(log n)) y en cada nodo toma un prefijo o un sufijo con
+búsqueda binaria, así que cuesta O(log n + k) para k resultados. Las
+consultas de muchas fechas a la vez recorren el árbol nivel por nivel con
+operaciones vectorizadas.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Las fechas se guardan como días desde 1970 desplazados a enteros positivos
+# de 32 bits; junto con el número de nodo forman claves ordenables en int64
+_DESPLAZAMIENTO = 2**31
+_SIN_FIN = 2**32 - 1
+
+COLUMNAS_VIDA = {
+    "deudas": ("fecha_emision", "fecha_vencimiento"),
+    "previsiones": ("fecha_creacion", "fecha_estimada_utilizacion"),
+}
+
+
+def _a_dias(fechas, vacio):
+    """Fechas a días desplazados (`vacio` para las faltantes)"""
+    fechas = pd.to_datetime(pd.Series(np.ravel(fechas)))
+    dias = fechas.to_numpy(dtype="datetime64[D]").astype("int64") + _DESPLAZAMIENTO
+    return np.where(fechas.isna().to_numpy(), vacio, dias)
+
+
+@dataclass
+class Pertenencia:
+    """
+    Resultado de una consulta de varias fechas o rangos, en formato CSR:
+    las posiciones de la consulta i son posiciones[punteros[i]:punteros[i+1]]
+    """
+
+    punteros: np.ndarray
+    posiciones: np.ndarray
+
+    @property
+    def cantidades(self):
+        return np.diff(self.punteros)
+
+    def de(self, i):
+        """Posiciones (iloc, sin orden) de la consulta i"""
+        return self.posiciones[self.punteros[i] : self.punteros[i + 1]]
+
+
+class IndiceIntervalos:
+    """
+    Árbol de intervalos cerrados [inicio, fin] sobre las filas de un
+    DataFrame. Un fin faltante es un intervalo abierto hacia adelante; un
+    inicio faltante (o posterior al fin) deja la fila fuera del índice.
+
+    Las consultas devuelven posiciones (iloc) de las filas.
+    """
+
+    def __init__(self, inicios, fines):
+        inicios = _a_dias(inicios, _SIN_FIN)
+        fines = _a_dias(fines, _SIN_FIN)
+        self.cantidad_filas = len(inicios)
+        validas = np.flatnonzero(inicios <= fines)
+
+        # Extremos ordenados de todas las filas válidas (conteos en O(log n)
+        # y consultas por rango)
+        self._orden_inicio = validas[np.argsort(inicios[validas], kind="stable")]
+        self._inicios = inicios[self._orden_inicio]
+        self._fines = np.sort(fines[validas])
+
+        self._construir(inicios, fines, validas)
+
+    def _construir(self, inicios, fines, validas):
+        centros, desde, izquierdos, derechos = [], [], [], []
+        por_inicio, por_fin = [], []
+        pendientes = deque([validas] if len(validas) else [])
+        desplazamiento = 0
+        while pendientes:
+            filas = pendientes.popleft()
+            nodo = len(centros)
+            s, f = inicios[filas], fines[filas]
+
+            # Mediana de los extremos: es el extremo de alguna fila, así que
+            # el nodo nunca queda vacío y cada hijo tiene a lo sumo la mitad
+            extremos = np.concatenate([s, f])
+            centro = np.partition(extremos, len(extremos) // 2)[len(extremos) // 2]
+            contiene = (s <= centro) & (f >= centro)
+            aqui = filas[contiene]
+            izquierda = filas[f < centro]
+            derecha = filas[s > centro]
+
+            centros.append(centro)
+            desde.append(desplazamiento)
+            desplazamiento += len(aqui)
+            por_inicio.append(aqui[np.argsort(inicios[aqui], kind="stable")])
+            por_fin.append(aqui[np.argsort(fines[aqui], kind="stable")])
+
+            hijos = []
+            for lado in (izquierda, derecha):
+                if len(lado):
+                    hijos.append(nodo + len(pendientes) + 1)
+                    pendientes.append(lado)
+                else:
+                    hijos.append(-1)
+            izquierdos.append(hijos[0])
+            derechos.append(hijos[1])
+
+        self._centros = np.asarray(centros, dtype="int64")
+        self._desde = np.asarray(desde + [desplazamiento], dtype="int64")
+        self._izquierdos = np.asarray(izquierdos, dtype="int64")
+        self._derechos = np.asarray(derechos, dtype="int64")
+        self._por_inicio = np.concatenate(por_inicio or [np.empty(0, "int64")])
+        self._por_fin = np.concatenate(por_fin or [np.empty(0, "int64")])
+
+        # Claves (nodo, extremo): los nodos se guardan en orden de creación,
+        # así que las claves quedan ordenadas y una sola búsqueda binaria
+        # global resuelve la de cada nodo
+        nodo_de = np.repeat(np.arange(len(centros)), np.diff(self._desde))
+        self._claves_inicio = (nodo_de << 32) | inicios[self._por_inicio]
+        self._claves_fin = (nodo_de << 32) | fines[self._por_fin]
+
+        self._fuentes = np.concatenate(
+            [self._por_inicio, self._por_fin, self._orden_inicio]
+        )
+        self._bases = np.array(
+            [0, len(self._por_inicio), len(self._por_inicio) + len(self._por_fin)]
+        )
+
+    @classmethod
+    def desde_dataframe(cls, df, entidad):
+        """Índice de la vida de las deudas o previsiones de `df`"""
+        inicio, fin = COLUMNAS_VIDA[entidad]
+        fines = df[fin] if fin in df.columns else pd.Series(pd.NaT, index=df.index)
+        return cls(df[inicio], fines)
+
+    @property
+    def profundidad(self):
+        """Niveles del árbol"""
+        niveles, actuales = 0, np.array([0] if len(self._centros) else [])
+        while len(actuales):
+            niveles += 1
+            hijos = np.concatenate(
+                [self._izquierdos[actuales], self._derechos[actuales]]
+            )
+            actuales = hijos[hijos >= 0]
+        return niveles
+
+    # -------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------
+
+    def _rangos_vigentes(self, dias):
+        """
+        Recorre el árbol para todas las fechas a la vez
+
+        Returns:
+            tuple: (consulta, arreglo, desde, hasta) de cada tramo de
+            resultados; arreglo 0 es `_por_inicio` y 1 es `_por_fin`
+        """
+        partes = []
+        consultas = np.arange(len(dias))
+        nodos = np.zeros(len(dias), dtype="int64")
+        if not len(self._centros):
+            consultas = consultas[:0]
+        while len(consultas):
+            t = dias[consultas]
+            centro = self._centros[nodos]
+            antes, despues = t < centro, t > centro
+            inicio_nodo, fin_nodo = self._desde[nodos], self._desde[nodos + 1]
+
+            # Antes del centro: los que empiezan hasta t (prefijo por inicio)
+            clave = (nodos << 32) | t
+            hasta = np.where(
+                antes,
+                np.searchsorted(self._claves_inicio, clave, side="right"),
+                fin_nodo,
+            )
+            # Después del centro: los que terminan desde t (sufijo por fin)
+            desde = np.where(
+                despues,
+                np.searchsorted(self._claves_fin, clave, side="left"),
+                inicio_nodo,
+            )
+            partes.append((consultas, despues.astype("int8"), desde, hasta))
+
+            nodos = np.where(antes, self._izquierdos[nodos], self._derechos[nodos])
+            siguen = (antes | despues) & (nodos >= 0)
+            consultas, nodos = consultas[siguen], nodos[siguen]
+
+        if not partes:
+            vacio = np.empty(0, dtype="int64")
+            return vacio, vacio.astype("int8"), vacio, vacio
+        return tuple(np.concatenate(p) for p in zip(*partes))
+
+    def _juntar(self, cantidad_consultas, consulta, arreglo, desde, hasta):
+        """
+        Expande los tramos [desde, hasta) de cada arreglo fuente (0: árbol
+        por inicio, 1: árbol por fin, 2: orden global por inicio) a formato
+        CSR agrupado por consulta
+        """
+        largos = np.maximum(hasta - desde, 0)
+        orden = np.argsort(consulta, kind="stable")
+        punteros = np.zeros(cantidad_consultas + 1, dtype="int64")
+        np.add.at(punteros, consulta + 1, largos)
+        punteros = np.cumsum(punteros)
+
+        # Cada tramo es contiguo en su arreglo fuente: se copian rebanadas
+        # (hay a lo sumo profundidad + 1 tramos por consulta)
+        inicios = desde[orden] + self._bases[arreglo[orden]]
+        finales = inicios + largos[orden]
+        posiciones = np.concatenate(
+            [self._fuentes[i:f] for i, f in zip(inicios.tolist(), finales.tolist())]
+            or [np.empty(0, dtype="int64")]
+        )
+        return Pertenencia(punteros=punteros, posiciones=posiciones)
+
+    def vigentes_en_fechas(self, fechas):
+        """
+        Filas vigentes en cada fecha (inicio <= fecha <= fin), en lote
+
+        Returns:
+            Pertenencia: una consulta por fecha, en el orden recibido
+        """
+        dias = _a_dias(fechas, _SIN_FIN)
+        return self._juntar(len(dias), *self._rangos_vigentes(dias))
+
+    def vigentes(self, fecha):
+        """Posiciones (ordenadas) de las filas vigentes en una fecha"""
+        return np.sort(self.vigentes_en_fechas([fecha]).de(0))
+
+    def superpuestos_en_rangos(self, desde, hasta):
+        """
+        Filas cuya vida se superpone con cada rango [desde, hasta], en lote
+
+        Son las vigentes en `desde` más las que empiezan dentro de
+        (desde, hasta]; ambos conjuntos son disjuntos.
+
+        Returns:
+            Pertenencia: una consulta por rango
+        """
+        desde = _a_dias(desde, _SIN_FIN)
+        hasta = _a_dias(hasta, _SIN_FIN)
+        consulta, arreglo, inicio, fin = self._rangos_vigentes(desde)
+
+        # Los que empiezan dentro del rango, sobre el orden global por inicio
+        primeros = np.searchsorted(self._inicios, desde, side="right")
+        ultimos = np.searchsorted(self._inicios, hasta, side="right")
+        return self._juntar(
+            len(desde),
+            np.concatenate([consulta, np.arange(len(desde))]),
+            np.concatenate([arreglo, np.full(len(desde), 2, dtype="int8")]),
+            np.concatenate([inicio, primeros]),
+            np.concatenate([fin, ultimos]),
+        )
+
+    def cantidad_vigentes(self, fechas):
+        """Cantidad de filas vigentes en cada fecha, en O(log n) por fecha"""
+        dias = _a_dias(fechas, _SIN_FIN)
+        iniciadas = np.searchsorted(self._inicios, dias, side="right")
+        terminadas = np.searchsorted(self._fines, dias, side="left")
+        return iniciadas - terminadas
+
+    def totales_vigentes(self, fechas, montos):
+        """
+        Cantidad de filas vigentes y suma de `montos` en cada fecha, en lote
+
+        Returns:
+            pd.DataFrame: fecha, cantidad y monto
+        """
+        fechas = pd.to_datetime(pd.Series(np.ravel(fechas)))
+        pertenencia = self.vigentes_en_fechas(fechas)
+        consulta = np.repeat(np.arange(len(fechas)), pertenencia.cantidades)
+        montos = np.asarray(montos, dtype="float64")
+        return pd.DataFrame(
+            {
+                "fecha": fechas.to_numpy(),
+                "cantidad": pertenencia.cantidades,
+                "monto": np.bincount(
+                    consulta,
+                    weights=montos[pertenencia.posiciones],
+                    minlength=len(fechas),
+                ),
+            }
+        )
@@ -0,0 +1,347 @@
+"""
+INGESTA DE LIBROS CONTABLES REALES
+Carga extractos de deudas y previsiones del ERP (CSV, Parquet o Excel) sobre
+el esquema de `esquema_datos.py`. Los archivos se leen por lotes con pyarrow,
+cada columna se convierte al tipo declarado y las filas que no pueden
+convertirse se informan como rechazos en la misma pasada.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from esquema_datos import obtener_esquema, tipo_arrow
+from representacion_compacta import compactar, concatenar_compactos
+
+EXTENSIONES_CSV = (".csv", ".txt")
+EXTENSIONES_PARQUET = (".parquet", ".pq")
+EXTENSIONES_EXCEL = (".xlsx", ".xls")
+
+_PATRON_ENTERO = r"^[-+]?\d+$"
+_PATRON_DECIMAL = r"^[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?$"
+
+COLUMNAS_RECHAZOS = ["fila", "columna", "valor", "motivo"]
+
+
+@dataclass
+class LoteIngesta:
+    """Lote convertido: filas válidas tipadas y rechazos del lote"""
+
+    datos: pd.DataFrame
+    rechazos: pd.DataFrame
+    filas_leidas: int = 0
+
+
+@dataclass
+class ResultadoIngesta:
+    """Resultado de cargar un archivo completo"""
+
+    datos: pd.DataFrame
+    rechazos: pd.DataFrame = field(
+        default_factory=lambda: pd.DataFrame(columns=COLUMNAS_RECHAZOS)
+    )
+    filas_leidas: int = 0
+
+    @property
+    def filas_rechazadas(self):
+        return int(self.rechazos["fila"].nunique()) if not self.rechazos.empty else 0
+
+
+# =================================================================
+# LECTURA POR LOTES SEGÚN FORMATO
+# =================================================================
+
+
+def _lotes_crudos(ruta, columnas_origen, tamano_lote, bloque_csv_bytes, separador):
+    """Itera lotes de pyarrow con las columnas de origen tal como vienen"""
+    import pyarrow as pa
+
+    extension = os.path.splitext(str(ruta))[1].lower()
+
+    if extension in EXTENSIONES_CSV:
+        from pyarrow import csv
+
+        # Todo se lee como texto: la conversión tipada se hace después, por
+        # columna, para poder identificar las filas que no convierten
+        lector = csv.open_csv(
+            ruta,
+            read_options=csv.ReadOptions(block_size=bloque_csv_bytes),
+            parse_options=csv.ParseOptions(delimiter=separador),
+            convert_options=csv.ConvertOptions(
+                column_types={c: pa.string() for c in columnas_origen},
+                include_columns=columnas_origen,
+                include_missing_columns=True,
+                strings_can_be_null=True,
+            ),
+        )
+        for lote in lector:
+            yield lote
+
+    elif extension in EXTENSIONES_PARQUET:
+        import pyarrow.parquet as pq
+
+        archivo = pq.ParquetFile(ruta)
+        disponibles = set(archivo.schema_arrow.names)
+        yield from (
+            _completar_columnas(lote, columnas_origen)
+            for lote in archivo.iter_batches(
+                batch_size=tamano_lote,
+                columns=[c for c in columnas_origen if c in disponibles],
+            )
+        )
+
+    elif extension in EXTENSIONES_EXCEL:
+        # El formato Excel no admite lectura incremental: se carga la hoja
+        # completa como texto y se procesa por lotes igual que el resto
+        hoja = pd.read_excel(ruta, dtype=str)
+        hoja = hoja.reindex(columns=columnas_origen)
+        for inicio in range(0, max(len(hoja), 1), tamano_lote):
+            yield pa.RecordBatch.from_pandas(
+                hoja.iloc[inicio : inicio + tamano_lote], preserve_index=False
+            )
+
+    else:
+        raise ValueError(f"Formato de archivo no soportado: {extension}")
+
+
+def _completar_columnas(lote, columnas):
+    """Agrega como nulas las columnas ausentes de un lote de pyarrow"""
+    import pyarrow as pa
+
+    arreglos = [
+        (
+            lote.column(c)
+            if c in lote.schema.names
+            else pa.nulls(lote.num_rows, pa.string())
+        )
+        for c in columnas
+    ]
+    return pa.RecordBatch.from_arrays(arreglos, names=list(columnas))
+
+
+# =================================================================
+# CONVERSIÓN TIPADA
+# =================================================================
+
+
+def _convertir_columna(arreglo, tipo_logico, formato_fecha, separador_decimal):
+    """
+    Convierte un arreglo de pyarrow al tipo lógico declarado
+
+    Returns:
+        tuple: (arreglo convertido, máscara de valores no convertibles)
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    destino = tipo_arrow(tipo_logico)
+    sin_errores = pa.array(np.zeros(len(arreglo), dtype=bool))
+
+    # Columnas ya tipadas en origen (Parquet): conversión directa
+    if not (pa.types.is_string(arreglo.type) or pa.types.is_large_string(arreglo.type)):
+        if pa.types.is_null(arreglo.type):
+            return pa.nulls(len(arreglo), destino), sin_errores
+        try:
+            return pc.cast(arreglo, destino, safe=tipo_logico != "fecha"), sin_errores
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            arreglo = pc.cast(arreglo, pa.string())
+
+    texto = pc.utf8_trim_whitespace(arreglo)
+    texto = pc.if_else(pc.equal(texto, ""), pa.scalar(None, pa.string()), texto)
+
+    if tipo_logico in ("texto", "categoria"):
+        return texto, sin_errores
+
+    if tipo_logico == "fecha":
+        # pandas valida el calendario (p. ej. rechaza 31/02), pyarrow no
+        fechas = pd.to_datetime(
+            texto.to_pandas(), format=formato_fecha, errors="coerce"
+        )
+        convertido = pc.cast(pa.array(fechas, from_pandas=True), destino, safe=False)
+    else:
+        if tipo_logico in ("decimal", "monto") and separador_decimal == ",":
+            texto = pc.replace_substring(texto, ".", "")
+            texto = pc.replace_substring(texto, ",", ".")
+        patron = _PATRON_ENTERO if tipo_logico == "entero" else _PATRON_DECIMAL
+        valido = pc.fill_null(pc.match_substring_regex(texto, patron), False)
+        convertido = pc.cast(
+            pc.if_else(valido, texto, pa.scalar(None, pa.string())), destino
+        )
+
+    invalido = pc.and_(pc.is_valid(texto), pc.is_null(convertido))
+    return convertido, invalido
+
+
+def convertir_lote(
+    lote,
+    entidad,
+    mapeo_columnas=None,
+    fila_inicial=0,
+    formato_fecha="%Y-%m-%d",
+    separador_decimal=".",
+    tipo_montos="float64",
+):
+    """
+    Convierte un lote de pyarrow al esquema de la entidad
+
+    Args:
+        lote: pyarrow.RecordBatch con las columnas de origen
+        entidad: "deudas" o "previsiones"
+        mapeo_columnas: Diccionario columna_origen -> columna_esquema
+        fila_inicial: Número de fila del archivo correspondiente al primer
+            registro del lote (para informar rechazos)
+        formato_fecha: Formato strptime de las fechas de origen
+        separador_decimal: "." o "," (en este caso, "." se toma como miles)
+        tipo_montos: "float64", "float32" o "centavos" (int64 escalado)
+
+    Returns:
+        LoteIngesta: Filas válidas (en representación compacta) y rechazos
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    esquema = obtener_esquema(entidad)
+    origen_por_destino = {v: k for k, v in (mapeo_columnas or {}).items()}
+    rechazada = np.zeros(lote.num_rows, dtype=bool)
+    columnas = {}
+    rechazos = []
+
+    for columna, (tipo_logico, obligatoria) in esquema.items():
+        origen = origen_por_destino.get(columna, columna)
+        if origen in lote.schema.names:
+            arreglo = lote.column(origen)
+        else:
+            arreglo = pa.nulls(lote.num_rows, pa.string())
+
+        convertido, invalido = _convertir_columna(
+            arreglo, tipo_logico, formato_fecha, separador_decimal
+        )
+        invalido = invalido.to_numpy(zero_copy_only=False)
+        faltante = (
+            convertido.is_null().to_numpy(zero_copy_only=False) & ~invalido
+            if obligatoria
+            else np.zeros(lote.num_rows, dtype=bool)
+        )
+
+        for mascara, motivo in (
+            (invalido, f"valor no convertible a {tipo_logico}"),
+            (faltante, "valor obligatorio ausente"),
+        ):
+            if mascara.any():
+                posiciones = np.flatnonzero(mascara)
+                rechazos.append(
+                    pd.DataFrame(
+                        {
+                            "fila": fila_inicial + posiciones + 1,
+                            "columna": columna,
+                            "valor": arreglo.take(posiciones)
+                            .cast(pa.string())
+                            .to_pandas(),
+                            "motivo": motivo,
+                        }
+                    )
+                )
+                rechazada |= mascara
+        columnas[columna] = convertido
+
+    tabla = pa.Table.from_pydict(columnas)
+    datos = tabla.filter(pa.array(~rechazada)).to_pandas(
+        types_mapper={pa.int64(): pd.Int64Dtype()}.get
+    )
+    if rechazos:
+        rechazos = pd.concat(rechazos, ignore_index=True)
+    else:
+        rechazos = pd.DataFrame(columns=COLUMNAS_RECHAZOS)
+    return LoteIngesta(
+        datos=compactar(datos, entidad, tipo_montos),
+        rechazos=rechazos,
+        filas_leidas=lote.num_rows,
+    )
+
+
+# =================================================================
+# API PÚBLICA
+# =================================================================
+
+
+def leer_lotes(
+    ruta,
+    entidad,
+    mapeo_columnas=None,
+    tamano_lote=250_000,
+    bloque_csv_bytes=64 * 1024 * 1024,
+    separador=",",
+    formato_fecha="%Y-%m-%d",
+    separador_decimal=".",
+    tipo_montos="float64",
+):
+    """
+    Lee un extracto del ERP por lotes y los convierte al esquema de la entidad
+
+    El archivo se recorre una sola vez; cada lote trae sus filas válidas
+    tipadas y los rechazos detectados.
+
+    Args:
+        ruta: Archivo CSV, Parquet o Excel
+        entidad: "deudas" o "previsiones"
+        mapeo_columnas: Diccionario columna_origen -> columna_esquema
+        tamano_lote: Filas por lote (Parquet y Excel)
+        bloque_csv_bytes: Tamaño de bloque de lectura para CSV
+        separador: Delimitador de campos del CSV
+        formato_fecha: Formato strptime de las fechas de origen
+        separador_decimal: "." o ","
+        tipo_montos: "float64", "float32" o "centavos" (int64 escalado)
+
+    Yields:
+        LoteIngesta
+    """
+    esquema = obtener_esquema(entidad)
+    mapeo_columnas = mapeo_columnas or {}
+    destino_a_origen = {v: k for k, v in mapeo_columnas.items()}
+    columnas_origen = [destino_a_origen.get(c, c) for c in esquema]
+
+    fila_inicial = 0
+    for lote in _lotes_crudos(
+        ruta, columnas_origen, tamano_lote, bloque_csv_bytes, separador
+    ):
+        yield convertir_lote(
+            lote,
+            entidad,
+            mapeo_columnas=mapeo_columnas,
+            fila_inicial=fila_inicial,
+            formato_fecha=formato_fecha,
+            separador_decimal=separador_decimal,
+            tipo_montos=tipo_montos,
+        )
+        fila_inicial += lote.num_rows
+
+
+def cargar_archivo(ruta, entidad, mapeo_columnas=None, **opciones):
+    """
+    Carga un extracto completo del ERP
+
+    Acepta las mismas opciones que `leer_lotes`.
+
+    Returns:
+        ResultadoIngesta: Datos válidos, rechazos y cantidad de filas leídas
+    """
+    datos = []
+    rechazos = []
+    filas_leidas = 0
+    for lote in leer_lotes(ruta, entidad, mapeo_columnas=mapeo_columnas, **opciones):
+        datos.append(lote.datos)
+        if not lote.rechazos.empty:
+            rechazos.append(lote.rechazos)
+        filas_leidas += lote.filas_leidas
+
+    return ResultadoIngesta(
+        datos=concatenar_compactos(datos),
+        rechazos=(
+            pd.concat(rechazos, ignore_index=True)
+            if rechazos
+            else pd.DataFrame(columns=COLUMNAS_RECHAZOS)
+        ),
+        filas_leidas=filas_leidas,
+    )
@@ -0,0 +1,571 @@
+"""
+MOTOR DE ANÁLISIS DEL PASIVO NO CORRIENTE
+Capa de cálculo sin dependencias de Streamlit ni de matplotlib: prepara los
+datos, calcula métricas y agregados y detecta anomalías con Isolation Forest.
+Devuelve objetos de resultado que la aplicación solo dibuja, y que pueden
+usarse tal cual desde procesos batch, APIs o benchmarks.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from clasificacion_corriente import clasificar_a_fecha
+from deteccion_anomalias import (
+    CONTAMINACION,
+    SEMILLA_MODELO,
+    ResultadoDeteccion,
+    detectar_anomalias,
+    detectar_anomalias_por_segmento,
+)
+from explicacion_anomalias import (
+    ReferenciaSegmentos,
+    explicar_anomalias,
+    referencia_por_segmento,
+)
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES
+from indice_intervalos import IndiceIntervalos
+from reexpresion import montos_historicos, serie_por_defecto
+from reglas_auditoria import ResultadoReglas, evaluar_reglas
+from representacion_compacta import montos_en_pesos
+from revaluacion import revaluar_a_fecha
+
+COLUMNAS_NUMERICAS_DEUDAS = [
+    "plazo_anios",
+    "monto_original",
+    "tasa_interes_anual",
+    "saldo_pendiente_simulado",
+    "intereses_acumulados_simulados",
+]
+# Los importes de cada deuda están en la unidad de su moneda (ver
+# revaluacion); el saldo se compara en pesos a la cotización de la emisión,
+# para que la revaluación posterior no se confunda con una anomalía
+FEATURES_DEUDAS = ["saldo_pendiente_historico", "tasa_interes_anual", "plazo_anios"]
+ESTADOS_ANALIZADOS_DEUDAS = ["Activa", "Incumplida"]
+SEGMENTOS_DEUDAS = ["tipo_deuda"]
+
+MAPA_PROBABILIDAD = {"Baja": 0.25, "Media": 0.50, "Alta": 0.75}
+FEATURES_PREVISIONES = [
+    "monto_estimado_ars",
+    "probabilidad_valor",
+    "dias_desde_creacion",
+]
+SEGMENTOS_PREVISIONES = ["tipo_prevision"]
+
+
+@dataclass
+class ResultadoDeudas:
+    """Resultado del análisis de Deudas No Corrientes"""
+
+    datos: pd.DataFrame
+    total_deudas: int
+    # Importes en pesos: el monto original a la cotización de la emisión y
+    # el saldo a la del cierre (en `datos` quedan las columnas de
+    # revaluacion.revaluar_a_fecha)
+    monto_original_total: float
+    saldo_pendiente_total: float
+    saldo_por_tipo: pd.Series
+    cantidad_por_estado: pd.Series
+    # Puntajes de las deudas activas e incumplidas; en `datos` quedan además
+    # las columnas is_anomaly (1 normal, -1 anómala, 0 no analizada) y
+    # puntaje_anomalia
+    deteccion: ResultadoDeteccion
+    # Deudas anómalas con sus atribuciones (ver explicacion_anomalias)
+    anomalias: pd.DataFrame = field(default_factory=pd.DataFrame)
+    referencia: ReferenciaSegmentos = None
+    # Controles determinísticos (reglas_auditoria); en `datos` queda la
+    # columna reglas_incumplidas
+    hallazgos: ResultadoReglas = None
+    # Porciones corriente y no corriente a la fecha de cierre
+    # (clasificacion_corriente); en `datos` quedan las columnas
+    # porcion_corriente y porcion_no_corriente
+    fecha_cierre: pd.Timestamp = None
+    saldo_corriente: float = 0.0
+    saldo_no_corriente: float = 0.0
+    # Vida de cada deuda (emisión -> vencimiento), sobre las filas de `datos`
+    indice: IndiceIntervalos = None
+    # Saldo en pesos por moneda de origen y revaluación acumulada de los
+    # saldos en dólares o UVA desde su emisión
+    saldo_por_moneda: pd.Series = None
+    diferencia_cambio: float = 0.0
+
+    @property
+    def cantidad_anomalias(self):
+        return len(self.anomalias)
+
+    @property
+    def activas(self):
+        """Deudas activas e incumplidas con su etiqueta y puntaje"""
+        return self.datos[self.datos["is_anomaly"] != 0]
+
+    def anomalias_con_umbral(self, umbral):
+        """Deudas anómalas con otro umbral de puntaje, sin reajustar el modelo"""
+        return _filas_anomalas(
+            self.datos,
+            self.deteccion,
+            FEATURES_DEUDAS,
+            SEGMENTOS_DEUDAS,
+            self.referencia,
+            umbral,
+        )
+
+
+@dataclass
+class ResultadoPrevisiones:
+    """Resultado del análisis de Previsiones"""
+
+    # Previsiones con probabilidad_valor, dias_desde_creacion, es_anomalia,
+    # puntaje_anomalia y reglas_incumplidas
+    datos: pd.DataFrame
+    total_previsiones: int
+    monto_estimado_total: float
+    previsiones_activas: int
+    monto_por_tipo: pd.Series
+    cantidad_por_estado: pd.Series
+    deteccion: ResultadoDeteccion
+    anomalias: pd.DataFrame = field(default_factory=pd.DataFrame)
+    referencia: ReferenciaSegmentos = None
+    hallazgos: ResultadoReglas = None
+    # Vida de cada previsión (creación -> utilización estimada)
+    indice: IndiceIntervalos = None
+
+    @property
+    def cantidad_anomalias(self):
+        return len(self.anomalias)
+
+    def anomalias_con_umbral(self, umbral):
+        """Previsiones anómalas con otro umbral, sin reajustar el modelo"""
+        return _filas_anomalas(
+            self.datos,
+            self.deteccion,
+            FEATURES_PREVISIONES,
+            SEGMENTOS_PREVISIONES,
+            self.referencia,
+            umbral,
+        )
+
+
+@dataclass
+class ResumenConsolidado:
+    """Totales del Pasivo No Corriente y su composición"""
+
+    total_deudas: int
+    saldo_deudas: float
+    total_previsiones: int
+    monto_previsiones: float
+    total_pasivo: float
+    detalle: pd.DataFrame
+
+
+# =================================================================
+# UTILIDADES
+# =================================================================
+
+
+def _cantidad_por_valor(serie):
+    """Cantidad de registros por valor, de mayor a menor y sin ceros"""
+    conteo = serie.value_counts()
+    return conteo[conteo > 0]
+
+
+def _saldo_por_moneda(df):
+    """Saldo en pesos por moneda de origen (todo en pesos sin columna `moneda`)"""
+    if "moneda" not in df.columns:
+        return pd.Series({"ARS": df["saldo_pendiente_ars"].sum()})
+    monedas = df["moneda"].astype(object).fillna("ARS")
+    return df["saldo_pendiente_ars"].groupby(monedas).sum().sort_values(ascending=False)
+
+
+def _detectar(
+    df, features, mascara, registro, masivo, n_jobs, segmentar_por, max_workers
+):
+    """Detección global o por segmento según `segmentar_por`"""
+    if segmentar_por:
+        return detectar_anomalias_por_segmento(
+            df, features, segmentar_por, mascara=mascara, max_workers=max_workers
+        )
+    return detectar_anomalias(
+        df, features, mascara=mascara, registro=registro, masivo=masivo, n_jobs=n_jobs
+    )
+
+
+def _segmentos_analizados(datos, deteccion, segmentacion, marcadas=slice(None)):
+    """
+    Segmento de cada fila analizada (o de las `marcadas`): el del modelo si
+    la detección fue por segmento y, si no, la primera columna de
+    `segmentacion` (p. ej. tipo_deuda)
+    """
+    if deteccion.segmentos is not None:
+        return pd.Categorical.from_codes(
+            deteccion.segmentos[marcadas], deteccion.nombres_segmento
+        )
+    posiciones = deteccion.posiciones[marcadas]
+    return pd.Categorical(datos[segmentacion[0]].iloc[posiciones].astype(str))
+
+
+def _referencia(datos, deteccion, features, segmentacion):
+    """Mediana y escala por segmento de las filas analizadas"""
+    if len(deteccion.posiciones) == 0:
+        return None
+    matriz = (
+        datos[features].iloc[deteccion.posiciones].to_numpy(dtype="float64", na_value=0)
+    )
+    return referencia_por_segmento(
+        matriz, _segmentos_analizados(datos, deteccion, segmentacion), features
+    )
+
+
+def _filas_anomalas(datos, deteccion, features, segmentacion, referencia, umbral=None):
+    """Filas de `datos` marcadas como anómalas, con sus atribuciones"""
+    marcadas = np.flatnonzero(deteccion.etiquetas(umbral) == -1)
+    filas = datos.iloc[deteccion.posiciones[marcadas]]
+    if referencia is None or filas.empty:
+        return filas
+
+    explicacion = explicar_anomalias(
+        filas[features].to_numpy(dtype="float64", na_value=0),
+        _segmentos_analizados(datos, deteccion, segmentacion, marcadas),
+        referencia,
+    )
+    explicacion.index = filas.index
+    return pd.concat([filas, explicacion], axis=1)
+
+
+def _agregar_deteccion(datos, deteccion, columna_etiqueta):
+    """Agrega etiqueta (0 = no analizada) y puntaje a `datos`, en el lugar"""
+    etiquetas = np.zeros(len(datos), dtype="int8")
+    etiquetas[deteccion.posiciones] = deteccion.etiquetas()
+    puntajes = np.full(len(datos), np.nan)
+    puntajes[deteccion.posiciones] = deteccion.puntajes
+    datos[columna_etiqueta] = etiquetas
+    datos["puntaje_anomalia"] = puntajes
+
+
+# =================================================================
+# DEUDAS NO CORRIENTES
+# =================================================================
+
+
+def preparar_deudas(df, fecha_cierre=None):
+    """
+    Devuelve una copia con fechas y columnas numéricas normalizadas y los
+    importes en pesos a `fecha_cierre` (por defecto,
+    FECHA_REFERENCIA_PREVISIONES; ver `revaluacion.revaluar_a_fecha`)
+    """
+    df = montos_en_pesos(df, "deudas").copy()
+    df["fecha_emision"] = pd.to_datetime(df["fecha_emision"])
+    df["fecha_vencimiento"] = pd.to_datetime(df["fecha_vencimiento"])
+    for col in COLUMNAS_NUMERICAS_DEUDAS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df[COLUMNAS_NUMERICAS_DEUDAS] = df[COLUMNAS_NUMERICAS_DEUDAS].fillna(0)
+    fecha_cierre = pd.Timestamp(
+        fecha_cierre or FECHA_REFERENCIA_PREVISIONES
+    ).normalize()
+    revaluacion = revaluar_a_fecha(df, fecha_cierre)
+    df[revaluacion.columns] = revaluacion
+    return df
+
+
+def calcular_analisis_deudas(
+    df,
+    registro=None,
+    masivo=None,
+    n_jobs=None,
+    segmentar_por=None,
+    max_workers=None,
+    reglas=None,
+    fecha_corte=None,
+):
+    """
+    Análisis completo de Deudas No Corrientes sin interfaz
+
+    Args:
+        df: DataFrame de deudas (no se modifica)
+        registro: RegistroModelos opcional para reutilizar modelos ajustados
+        masivo: Fuerza (True/False) el modo de detección a gran escala; por
+            defecto se elige según la cantidad de deudas activas
+        n_jobs: Núcleos para la detección en modo masivo
+        segmentar_por: Columnas para un modelo por segmento (p. ej.
+            SEGMENTOS_DEUDAS o ["tipo_deuda", "empresa_id"]); None = global
+        max_workers: Procesos del pool de la detección por segmento
+        reglas: Reglas de auditoría (por defecto, REGLAS_DEUDAS)
+        fecha_corte: Fecha de cierre para las reglas y para la clasificación
+            corriente / no corriente (por defecto,
+            FECHA_REFERENCIA_PREVISIONES)
+
+    Returns:
+        ResultadoDeudas
+    """
+    fecha_cierre = pd.Timestamp(fecha_corte or FECHA_REFERENCIA_PREVISIONES).normalize()
+    df = preparar_deudas(df, fecha_cierre)
+    hallazgos = evaluar_reglas(df, "deudas", reglas, fecha_cierre)
+    df["reglas_incumplidas"] = hallazgos.reglas_por_fila
+    clasificacion = clasificar_a_fecha(df, fecha_cierre)
+    df["porcion_corriente"] = clasificacion["porcion_corriente"]
+    df["porcion_no_corriente"] = clasificacion["porcion_no_corriente"]
+
+    deteccion = _detectar(
+        df,
+        FEATURES_DEUDAS,
+        df["estado_deuda"].isin(ESTADOS_ANALIZADOS_DEUDAS).to_numpy(),
+        registro,
+        masivo,
+        n_jobs,
+        segmentar_por,
+        max_workers,
+    )
+    _agregar_deteccion(df, deteccion, "is_anomaly")
+    segmentacion = segmentar_por or SEGMENTOS_DEUDAS
+    referencia = _referencia(df, deteccion, FEATURES_DEUDAS, segmentacion)
+
+    return ResultadoDeudas(
+        datos=df,
+        total_deudas=len(df),
+        monto_original_total=float(df["monto_original_ars"].sum()),
+        saldo_pendiente_total=float(df["saldo_pendiente_ars"].sum()),
+        saldo_por_tipo=df.groupby("tipo_deuda", observed=True)["saldo_pendiente_ars"]
+        .sum()
+        .sort_values(ascending=False),
+        cantidad_por_estado=_cantidad_por_valor(df["estado_deuda"]),
+        deteccion=deteccion,
+        anomalias=_filas_anomalas(
+            df, deteccion, FEATURES_DEUDAS, segmentacion, referencia
+        ),
+        referencia=referencia,
+        hallazgos=hallazgos,
+        fecha_cierre=fecha_cierre,
+        saldo_corriente=float(df["porcion_corriente"].sum()),
+        saldo_no_corriente=float(df["porcion_no_corriente"].sum()),
+        indice=IndiceIntervalos.desde_dataframe(df, "deudas"),
+        saldo_por_moneda=_saldo_por_moneda(df),
+        diferencia_cambio=float(df["diferencia_cambio"].sum()),
+    )
+
+
+# =================================================================
+# PREVISIONES
+# =================================================================
+
+
+def preparar_previsiones(df, fecha_referencia=FECHA_REFERENCIA_PREVISIONES):
+    """Devuelve una copia con las variables derivadas para el análisis"""
+    df = montos_en_pesos(df, "previsiones").copy()
+    df["fecha_creacion"] = pd.to_datetime(df["fecha_creacion"])
+    df["probabilidad_valor"] = (
+        df["probabilidad_ocurrencia"]
+        .astype(object)
+        .map(MAPA_PROBABILIDAD)
+        .astype("float64")
+        .fillna(0.5)
+    )
+    df["dias_desde_creacion"] = (
+        pd.Timestamp(fecha_referencia) - df["fecha_creacion"]
+    ).dt.days
+    return df
+
+
+def calcular_analisis_previsiones(
+    df,
+    fecha_referencia=FECHA_REFERENCIA_PREVISIONES,
+    registro=None,
+    masivo=None,
+    n_jobs=None,
+    segmentar_por=None,
+    max_workers=None,
+    reglas=None,
+):
+    """
+    Análisis completo de Previsiones sin interfaz
+
+    Args:
+        df: DataFrame de previsiones (no se modifica)
+        fecha_referencia: Fecha contra la que se mide la antigüedad (y
+            fecha de corte de las reglas de auditoría)
+        registro: RegistroModelos opcional para reutilizar modelos ajustados
+        masivo: Fuerza (True/False) el modo de detección a gran escala
+        n_jobs: Núcleos para la detección en modo masivo
+        segmentar_por: Columnas para un modelo por segmento (p. ej.
+            SEGMENTOS_PREVISIONES); None = modelo global
+        max_workers: Procesos del pool de la detección por segmento
+        reglas: Reglas de auditoría (por defecto, REGLAS_PREVISIONES)
+
+    Returns:
+        ResultadoPrevisiones
+    """
+    df = preparar_previsiones(df, fecha_referencia)
+    hallazgos = evaluar_reglas(df, "previsiones", reglas, fecha_referencia)
+    df["reglas_incumplidas"] = hallazgos.reglas_por_fila
+
+    deteccion = _detectar(
+        df,
+        FEATURES_PREVISIONES,
+        None,
+        registro,
+        masivo,
+        n_jobs,
+        segmentar_por,
+        max_workers,
+    )
+    _agregar_deteccion(df, deteccion, "es_anomalia")
+    segmentacion = segmentar_por or SEGMENTOS_PREVISIONES
+    referencia = _referencia(df, deteccion, FEATURES_PREVISIONES, segmentacion)
+
+    return ResultadoPrevisiones(
+        datos=df,
+        total_previsiones=len(df),
+        monto_estimado_total=float(df["monto_estimado_ars"].sum()),
+        previsiones_activas=int((df["estado_actual"] == "Activa").sum()),
+        monto_por_tipo=df.groupby("tipo_prevision", observed=True)["monto_estimado_ars"]
+        .sum()
+        .sort_values(ascending=False),
+        cantidad_por_estado=_cantidad_por_valor(df["estado_actual"]),
+        deteccion=deteccion,
+        anomalias=_filas_anomalas(
+            df, deteccion, FEATURES_PREVISIONES, segmentacion, referencia
+        ),
+        referencia=referencia,
+        hallazgos=hallazgos,
+        indice=IndiceIntervalos.desde_dataframe(df, "previsiones"),
+    )
+
+
+# =================================================================
+# RESUMEN CONSOLIDADO
+# =================================================================
+
+
+def calcular_resumen_consolidado(resultado_deudas, resultado_previsiones):
+    """
+    Consolida los totales de deudas y previsiones
+
+    Returns:
+        ResumenConsolidado: Totales y tabla de detalle por componente (los
+        porcentajes quedan como números; el formato es responsabilidad de
+        quien los muestra)
+    """
+    saldo_deudas = resultado_deudas.saldo_pendiente_total
+    monto_previsiones = resultado_previsiones.monto_estimado_total
+    total_pasivo = saldo_deudas + monto_previsiones
+    total_registros = (
+        resultado_deudas.total_deudas + resultado_previsiones.total_previsiones
+    )
+
+    detalle = pd.DataFrame(
+        {
+            "Componente": ["Deudas No Corrientes", "Previsiones", "TOTAL"],
+            "Cantidad de Registros": [
+                resultado_deudas.total_deudas,
+                resultado_previsiones.total_previsiones,
+                total_registros,
+            ],
+            "Monto Total (ARS)": [saldo_deudas, monto_previsiones, total_pasivo],
+        }
+    )
+    detalle["Porcentaje del Total"] = (
+        detalle["Monto Total (ARS)"] / total_pasivo * 100 if total_pasivo else 0.0
+    )
+
+    return ResumenConsolidado(
+        total_deudas=resultado_deudas.total_deudas,
+        saldo_deudas=saldo_deudas,
+        total_previsiones=resultado_previsiones.total_previsiones,
+        monto_previsiones=monto_previsiones,
+        total_pasivo=total_pasivo,
+        detalle=detalle,
+    )
+
+
+def _totales_al_cierre(resultado, entidad, cierres):
+    """
+    Cantidad, monto histórico y monto reexpresado (RT 6) de los registros
+    vigentes en cada cierre, con una sola consulta al índice de intervalos
+
+    Los coeficientes de todos los cierres se precalculan en una tabla chica
+    (cierres x meses de la serie); cada registro vigente toma el suyo por
+    indexación. Si la serie de índices falta, no se puede leer o no cubre
+    los cierres o los orígenes, el monto reexpresado queda en NaN.
+    """
+    montos, fechas = montos_historicos(resultado.datos, entidad)
+    pertenencia = resultado.indice.vigentes_en_fechas(cierres)
+    consulta = np.repeat(np.arange(len(cierres)), pertenencia.cantidades)
+    posiciones = pertenencia.posiciones
+    monto = np.bincount(consulta, weights=montos[posiciones], minlength=len(cierres))
+
+    try:
+        serie = serie_por_defecto()
+        desplazamientos = serie.desplazamientos(fechas)
+        coeficientes = serie.tabla_coeficientes(cierres)
+    except (ValueError, KeyError, OSError):
+        return pertenencia.cantidades, monto, np.full(len(cierres), np.nan)
+    reexpresado = np.bincount(
+        consulta,
+        weights=montos[posiciones]
+        * coeficientes[consulta, desplazamientos[posiciones]],
+        minlength=len(cierres),
+    )
+    return pertenencia.cantidades, monto, reexpresado
+
+
+def vigentes_por_ejercicio(resultado_deudas, resultado_previsiones, anios):
+    """
+    Deudas y previsiones vigentes al 31/12 de cada ejercicio
+
+    Usa los índices de intervalos de ambos resultados (construidos una vez
+    por conjunto de datos) con una única consulta en lote por entidad. Los
+    montos de origen se informan también reexpresados en moneda de cada
+    cierre (ver reexpresion).
+
+    Returns:
+        pd.DataFrame: Una fila por ejercicio con cantidad, monto histórico y
+        monto reexpresado vigentes de cada entidad
+    """
+    anios = list(anios)
+    cierres = pd.to_datetime([f"{anio}-12-31" for anio in anios])
+    deudas = _totales_al_cierre(resultado_deudas, "deudas", cierres)
+    previsiones = _totales_al_cierre(resultado_previsiones, "previsiones", cierres)
+    return pd.DataFrame(
+        {
+            "ejercicio": anios,
+            "fecha_cierre": cierres,
+            "deudas_vigentes": deudas[0],
+            "monto_original_deudas": deudas[1],
+            "monto_reexpresado_deudas": deudas[2],
+            "previsiones_vigentes": previsiones[0],
+            "monto_previsiones": previsiones[1],
+            "monto_reexpresado_previsiones": previsiones[2],
+        }
+    )
+
+
+def analizar_pasivo(
+    df_deudas,
+    df_previsiones,
+    fecha_referencia=FECHA_REFERENCIA_PREVISIONES,
+    registro=None,
+    fecha_corte=FECHA_REFERENCIA_PREVISIONES,
+):
+    """
+    Ejecuta el análisis completo para uso batch
+
+    Args:
+        df_deudas: DataFrame de deudas
+        df_previsiones: DataFrame de previsiones
+        fecha_referencia: Fecha de referencia de las previsiones
+        registro: RegistroModelos opcional para reutilizar modelos ajustados
+        fecha_corte: Fecha de cierre de las deudas
+
+    Returns:
+        tuple: (ResultadoDeudas, ResultadoPrevisiones, ResumenConsolidado)
+    """
+    resultado_deudas = calcular_analisis_deudas(
+        df_deudas, registro, fecha_corte=fecha_corte
+    )
+    resultado_previsiones = calcular_analisis_previsiones(
+        df_previsiones, fecha_referencia, registro
+    )
+    return (
+        resultado_deudas,
+        resultado_previsiones,
+        calcular_resumen_consolidado(resultado_deudas, resultado_previsiones),
+    )
@@ -0,0 +1,217 @@
+"""
+PADRÓN DE EMPRESAS DEUDORAS
+Tabla precalculada y persistida de entidades deudoras (id, razón social y
+CUIT con dígito verificador válido). Las deudas solo guardan `empresa_id` y
+obtienen nombre y CUIT mediante un join contra este padrón.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DIRECTORIO_PADRON = "data/padron"
+ID_EMPRESA_INICIAL = 5000
+
+APELLIDOS = [
+    "González",
+    "Rodríguez",
+    "Gómez",
+    "Fernández",
+    "López",
+    "Díaz",
+    "Martínez",
+    "Pérez",
+    "García",
+    "Sánchez",
+    "Romero",
+    "Sosa",
+    "Álvarez",
+    "Torres",
+    "Ruiz",
+    "Ramírez",
+    "Flores",
+    "Acosta",
+    "Benítez",
+    "Medina",
+    "Suárez",
+    "Herrera",
+    "Aguirre",
+    "Pereyra",
+    "Gutiérrez",
+    "Giménez",
+    "Molina",
+    "Silva",
+    "Castro",
+    "Rojas",
+    "Ortiz",
+    "Núñez",
+    "Luna",
+    "Juárez",
+    "Cabrera",
+    "Ríos",
+    "Ferreyra",
+    "Godoy",
+    "Morales",
+    "Domínguez",
+]
+RUBROS = [
+    "Construcciones",
+    "Inversiones",
+    "Agropecuaria",
+    "Servicios",
+    "Logística",
+    "Industrias",
+    "Comercial",
+    "Energía",
+    "Desarrollos",
+    "Transportes",
+]
+SUFIJOS = ["S.A.", "S.R.L.", "S.A.S.", "S.A.", "y Asociados S.R.L.", "Hnos. S.A."]
+
+# Ponderadores del dígito verificador de CUIT (algoritmo módulo 11 de AFIP)
+_PESOS_CUIT = np.array([5, 4, 3, 2, 7, 6, 5, 4, 3, 2])
+
+
+# =================================================================
+# CUIT
+# =================================================================
+
+
+def _digito_verificador(prefijo, cuerpo):
+    """Calcula el dígito verificador para arreglos de prefijo y cuerpo"""
+    digitos_prefijo = np.stack([prefijo // 10, prefijo % 10], axis=1)
+    potencias = 10 ** np.arange(7, -1, -1)
+    digitos_cuerpo = (cuerpo[:, None] // potencias) % 10
+    digitos = np.concatenate([digitos_prefijo, digitos_cuerpo], axis=1)
+    resto = (digitos * _PESOS_CUIT).sum(axis=1) % 11
+    return np.where(resto == 0, 0, 11 - resto)
+
+
+def calcular_cuits(cuerpos, prefijo=30):
+    """
+    Arma CUITs válidos ("PP-NNNNNNNN-D") para un arreglo de cuerpos de 8 dígitos
+
+    Cuando el módulo 11 da 10 se usa el prefijo 33, como hace AFIP para
+    personas jurídicas.
+    """
+    cuerpos = np.asarray(cuerpos, dtype="int64")
+    prefijos = np.full(len(cuerpos), prefijo, dtype="int64")
+    dv = _digito_verificador(prefijos, cuerpos)
+    sin_dv = dv == 10
+    prefijos[sin_dv] = 33
+    dv[sin_dv] = _digito_verificador(prefijos[sin_dv], cuerpos[sin_dv])
+
+    return (
+        pd.Series(prefijos).astype(str)
+        + "-"
+        + pd.Series(cuerpos).astype(str).str.pad(8, side="left", fillchar="0")
+        + "-"
+        + pd.Series(dv).astype(str)
+    )
+
+
+def validar_cuits(cuits):
+    """Devuelve una máscara booleana con los CUITs de dígito verificador válido"""
+    partes = (
+        pd.Series(cuits, dtype=object)
+        .astype(str)
+        .str.extract(r"^(\d{2})-?(\d{8})-?(\d)$")
+    )
+    formato_ok = partes.notna().all(axis=1).to_numpy()
+    validos = np.zeros(len(partes), dtype=bool)
+    if formato_ok.any():
+        ok = partes[formato_ok].astype("int64")
+        dv = _digito_verificador(ok[0].to_numpy(), ok[1].to_numpy())
+        validos[formato_ok] = dv == ok[2].to_numpy()
+    return validos
+
+
+# =================================================================
+# GENERACIÓN Y PERSISTENCIA DEL PADRÓN
+# =================================================================
+
+
+def generar_padron_empresas(num_empresas=25, semilla=1011):
+    """
+    Genera el padrón de empresas deudoras en forma vectorizada
+
+    Los cuerpos de CUIT se obtienen con una biyección afín módulo 10^8
+    (a·i + b), que garantiza unicidad sin el registro de valores usados de
+    `fake.unique`.
+
+    Returns:
+        pd.DataFrame: Columnas empresa_id, nombre_empresa y cuit
+    """
+    rng = np.random.default_rng(semilla)
+    n = int(num_empresas)
+    if n > 10**8:
+        raise ValueError("El padrón no puede superar 10^8 empresas")
+
+    # a coprimo con 10^8 (impar y no múltiplo de 5) ⇒ i -> a·i + b es biyectiva
+    a = int(rng.integers(10**6, 10**7)) * 10 + 1
+    b = int(rng.integers(0, 10**8))
+    cuerpos = (a * np.arange(n, dtype="int64") + b) % 10**8
+
+    apellido_1 = np.asarray(APELLIDOS, dtype=object)[rng.integers(0, len(APELLIDOS), n)]
+    apellido_2 = np.asarray(APELLIDOS, dtype=object)[rng.integers(0, len(APELLIDOS), n)]
+    rubro = np.asarray(RUBROS, dtype=object)[rng.integers(0, len(RUBROS), n)]
+    sufijo = np.asarray(SUFIJOS, dtype=object)[rng.integers(0, len(SUFIJOS), n)]
+    nombre = np.where(
+        rng.random(n) < 0.5,
+        apellido_1 + "-" + apellido_2 + " " + sufijo,
+        rubro + " " + apellido_1 + " " + sufijo,
+    )
+
+    return pd.DataFrame(
+        {
+            "empresa_id": np.arange(ID_EMPRESA_INICIAL, ID_EMPRESA_INICIAL + n),
+            "nombre_empresa": nombre,
+            "cuit": calcular_cuits(cuerpos),
+        }
+    )
+
+
+@lru_cache(maxsize=8)
+def cargar_padron_empresas(num_empresas=25, semilla=1011, directorio=DIRECTORIO_PADRON):
+    """
+    Carga el padrón persistido o lo genera y guarda en Parquet la primera vez
+
+    El resultado queda además en memoria del proceso; no debe modificarse.
+    """
+    ruta = os.path.join(directorio, f"padron_empresas_{num_empresas}_{semilla}.parquet")
+    if os.path.exists(ruta):
+        return pd.read_parquet(ruta)
+
+    padron = generar_padron_empresas(num_empresas, semilla)
+    os.makedirs(directorio, exist_ok=True)
+    ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+    padron.to_parquet(ruta_temporal, index=False)
+    os.replace(ruta_temporal, ruta)
+    return padron
+
+
+def _categorica_desde_padron(valores_padron, posiciones):
+    """Arma una columna categórica cuyas categorías son los valores del padrón"""
+    codigos, categorias = pd.factorize(valores_padron.astype(object))
+    codigos = np.where(posiciones >= 0, codigos[posiciones], -1)
+    return pd.Categorical.from_codes(codigos, categories=categorias)
+
+
+def unir_empresas(df_deudas, padron):
+    """
+    Agrega nombre y CUIT de la empresa deudora a partir de `empresa_id`
+
+    Las columnas resultantes son categóricas: cada fila guarda solo un código
+    que apunta a la entrada del padrón, sin duplicar los textos. Los ids
+    ausentes del padrón quedan como NaN.
+    """
+    posiciones = pd.Index(padron["empresa_id"]).get_indexer(df_deudas["empresa_id"])
+
+    df = df_deudas.copy()
+    df["nombre_empresa_deudora"] = _categorica_desde_padron(
+        padron["nombre_empresa"], posiciones
+    )
+    df["cuit_empresa_deudora"] = _categorica_desde_padron(padron["cuit"], posiciones)
+    return df
@@ -0,0 +1,374 @@
+"""
+PUNTUACIÓN INCREMENTAL DE ANOMALÍAS
+Mantiene un Isolation Forest de referencia y puntúa solo las deudas o
+previsiones nuevas o modificadas, de modo que una actualización diaria
+cuesta O(filas nuevas) y no O(cartera). La deriva de cada feature se mide
+con el índice de estabilidad poblacional (PSI) contra la distribución de
+entrenamiento; cuando supera el umbral, el modelo se reentrena en segundo
+plano y se reemplaza al terminar.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from deteccion_anomalias import ajustar_modelo, puntuar_por_bloques
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES
+from motor_analisis import (
+    CONTAMINACION,
+    ESTADOS_ANALIZADOS_DEUDAS,
+    FEATURES_DEUDAS,
+    FEATURES_PREVISIONES,
+    SEMILLA_MODELO,
+    preparar_deudas,
+    preparar_previsiones,
+)
+
+FEATURES_POR_ENTIDAD = {
+    "deudas": FEATURES_DEUDAS,
+    "previsiones": FEATURES_PREVISIONES,
+}
+COLUMNA_ID = {
+    "deudas": "deuda_id",
+    "previsiones": "id_prevision",
+}
+
+UMBRAL_PSI = 0.2  # convención habitual: > 0.2 indica un cambio significativo
+MINIMO_FILAS_DERIVA = 500
+CANTIDAD_CUANTILES = 10
+
+
+# =================================================================
+# DERIVA (PSI)
+# =================================================================
+
+
+def cortes_referencia(valores, cantidad=CANTIDAD_CUANTILES):
+    """Cortes por cuantiles de la distribución de referencia"""
+    cuantiles = np.quantile(valores, np.linspace(0, 1, cantidad + 1)[1:-1])
+    return np.unique(cuantiles)
+
+
+def proporciones(valores, cortes):
+    """Proporción de valores en cada intervalo definido por los cortes"""
+    conteo = np.bincount(np.searchsorted(cortes, valores), minlength=len(cortes) + 1)
+    return conteo / max(conteo.sum(), 1)
+
+
+def indice_estabilidad(esperadas, observadas, epsilon=1e-4):
+    """Índice de estabilidad poblacional entre dos vectores de proporciones"""
+    esperadas = np.clip(esperadas, epsilon, None)
+    observadas = np.clip(observadas, epsilon, None)
+    return float(np.sum((observadas - esperadas) * np.log(observadas / esperadas)))
+
+
+# =================================================================
+# PUNTUADOR
+# =================================================================
+
+
+class PuntuadorIncremental:
+    """
+    Puntuación incremental de una cartera de deudas o previsiones
+
+    Ejemplo:
+        puntuador = PuntuadorIncremental("deudas")
+        puntuador.ajustar_referencia(df_cartera)
+        nuevas = puntuador.actualizar(df_altas_del_dia)
+
+    `actualizar` devuelve solo las filas puntuadas en esa llamada; la
+    cartera completa con su última puntuación está en `cartera`. Las deudas
+    que pasan a un estado no analizado (p. ej. "Pagada") quedan inactivas:
+    salen de `cartera` y del reentrenamiento hasta que vuelvan a uno
+    analizado. Las features se calculan siempre a `fecha_referencia` (también
+    la de revaluación de las deudas), para que no deriven con el calendario.
+
+    La cartera se guarda en arreglos preasignados que solo crecen (las
+    altas se agregan al final) con un diccionario id -> posición, de modo
+    que una actualización no copia la cartera. La ventana de deriva son
+    conteos acumulados por intervalo de cada feature, de tamaño fijo.
+    """
+
+    def __init__(
+        self,
+        entidad,
+        contaminacion=CONTAMINACION,
+        semilla=SEMILLA_MODELO,
+        umbral_deriva=UMBRAL_PSI,
+        minimo_filas_deriva=MINIMO_FILAS_DERIVA,
+        fecha_referencia=FECHA_REFERENCIA_PREVISIONES,
+        registro=None,
+    ):
+        if entidad not in FEATURES_POR_ENTIDAD:
+            raise ValueError(f"Entidad desconocida: {entidad}")
+        self.entidad = entidad
+        self.features = FEATURES_POR_ENTIDAD[entidad]
+        self.columna_id = COLUMNA_ID[entidad]
+        self.contaminacion = contaminacion
+        self.semilla = semilla
+        self.umbral_deriva = umbral_deriva
+        self.minimo_filas_deriva = minimo_filas_deriva
+        self.fecha_referencia = fecha_referencia
+        self.registro = registro
+
+        self.modelo = None
+        self.deriva = {}
+        self.reentrenamientos = 0
+        self.bajas = 0
+        self._candado = threading.Lock()
+        self._hilo = None
+        self._cortes = {}
+        self._proporciones = {}
+        self._conteos_ventana = {}
+        self._filas_ventana = 0
+        self._reiniciar_cartera(0)
+
+    # -------------------------------------------------------------
+    # Almacenamiento
+    # -------------------------------------------------------------
+
+    def _reiniciar_cartera(self, capacidad):
+        self._posiciones = {}
+        self._lista_ids = []
+        self._filas = 0
+        self._valores = np.empty((capacidad, len(self.features)), dtype="float64")
+        self._puntajes = np.empty(capacidad, dtype="float64")
+        self._etiquetas = np.empty(capacidad, dtype="int64")
+        self._activas = np.zeros(capacidad, dtype=bool)
+        # Se incrementa en cada escritura; el reentrenamiento lo usa para no
+        # pisar filas modificadas mientras ajustaba
+        self._versiones = np.zeros(capacidad, dtype="int64")
+
+    def _reservar(self, filas):
+        """Garantiza capacidad para `filas` filas (duplicando al crecer)"""
+        capacidad = len(self._puntajes)
+        if filas <= capacidad:
+            return
+        capacidad = max(filas, 2 * capacidad, 1024)
+        valores = np.empty((capacidad, len(self.features)), dtype="float64")
+        valores[: self._filas] = self._valores[: self._filas]
+        self._valores = valores
+        for nombre in ("_puntajes", "_etiquetas", "_activas", "_versiones"):
+            anterior = getattr(self, nombre)
+            arreglo = np.zeros(capacidad, dtype=anterior.dtype)
+            arreglo[: self._filas] = anterior[: self._filas]
+            setattr(self, nombre, arreglo)
+
+    def _ubicar(self, ids):
+        """Posición de cada id en la cartera (-1 si no está)"""
+        return np.fromiter(
+            (self._posiciones.get(i, -1) for i in ids), dtype="int64", count=len(ids)
+        )
+
+    def _escribir(self, ids, valores, puntajes, etiquetas):
+        """Actualiza las filas existentes y agrega las nuevas al final"""
+        posiciones = self._ubicar(ids)
+        nuevas = np.flatnonzero(posiciones < 0)
+        if len(nuevas):
+            self._reservar(self._filas + len(nuevas))
+            posiciones[nuevas] = np.arange(self._filas, self._filas + len(nuevas))
+            ids_nuevos = [ids[i] for i in nuevas]
+            self._posiciones.update(zip(ids_nuevos, posiciones[nuevas].tolist()))
+            self._lista_ids.extend(ids_nuevos)
+            self._filas += len(nuevas)
+        self._valores[posiciones] = valores
+        self._puntajes[posiciones] = puntajes
+        self._etiquetas[posiciones] = etiquetas
+        self._activas[posiciones] = True
+        self._versiones[posiciones] += 1
+
+    def _dar_de_baja(self, ids):
+        """Marca inactivas las filas de `ids` que estén en la cartera"""
+        posiciones = self._ubicar(ids)
+        posiciones = posiciones[posiciones >= 0]
+        self._activas[posiciones] = False
+        self._versiones[posiciones] += 1
+        return len(posiciones)
+
+    # -------------------------------------------------------------
+    # Preparación
+    # -------------------------------------------------------------
+
+    def _ids(self, df):
+        return pd.Index(
+            df[self.columna_id].astype(str).to_numpy(dtype=object),
+            dtype=object,
+            name="id",
+        )
+
+    def _preparar(self, df):
+        """
+        Features indexadas por id de las filas que se analizan, e ids de las
+        que no (deudas en un estado no analizado)
+        """
+        excluidas = pd.Index([], dtype=object, name="id")
+        if self.entidad == "deudas":
+            analizada = df["estado_deuda"].isin(ESTADOS_ANALIZADOS_DEUDAS).to_numpy()
+            excluidas = self._ids(df[~analizada])
+            datos = preparar_deudas(df[analizada], self.fecha_referencia)
+        else:
+            datos = preparar_previsiones(df, self.fecha_referencia)
+        matriz = datos[self.features].fillna(0).astype("float64")
+        matriz.index = self._ids(datos)
+        # Un id que vuelve a un estado analizado en el mismo extracto sigue activo
+        excluidas = excluidas.difference(matriz.index)
+        return matriz[~matriz.index.duplicated(keep="last")], excluidas
+
+    def _ajustar(self, matriz):
+        return ajustar_modelo(
+            matriz, self.contaminacion, self.semilla, registro=self.registro
+        )
+
+    def _puntuar(self, modelo, matriz):
+        """Puntaje de anomalía (mayor = más anómalo) y etiqueta ±1"""
+        puntajes = puntuar_por_bloques(modelo, matriz)
+        return puntajes, np.where(puntajes > -modelo.offset_, -1, 1)
+
+    def _fijar_referencia(self, valores):
+        self._cortes = {
+            f: cortes_referencia(valores[:, i]) for i, f in enumerate(self.features)
+        }
+        self._proporciones = {
+            f: proporciones(valores[:, i], self._cortes[f])
+            for i, f in enumerate(self.features)
+        }
+        self._conteos_ventana = {
+            f: np.zeros(len(self._cortes[f]) + 1, dtype="int64") for f in self.features
+        }
+        self._filas_ventana = 0
+        self.deriva = {f: 0.0 for f in self.features}
+
+    # -------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------
+
+    def ajustar_referencia(self, df):
+        """
+        Ajusta el modelo de referencia sobre la cartera completa
+
+        Returns:
+            pd.DataFrame: Puntuación de toda la cartera, indexada por id
+        """
+        matriz, _ = self._preparar(df)
+        modelo = self._ajustar(matriz)
+        puntajes, etiquetas = self._puntuar(modelo, matriz)
+        with self._candado:
+            self.modelo = modelo
+            valores = matriz.to_numpy()
+            self._fijar_referencia(valores)
+            self._reiniciar_cartera(len(matriz))
+            self._escribir(list(matriz.index), valores, puntajes, etiquetas)
+        return pd.DataFrame(
+            {"puntaje_anomalia": puntajes, "es_anomalia": etiquetas},
+            index=matriz.index,
+        )
+
+    def actualizar(self, df):
+        """
+        Puntúa las filas nuevas o con features modificadas
+
+        Las filas sin cambios respecto de la cartera no se vuelven a
+        puntuar, y las deudas que dejaron los estados analizados se dan de
+        baja (ver `bajas`). Si la deriva acumulada supera el umbral se lanza
+        un reentrenamiento en segundo plano (ver `reentrenando`).
+
+        Returns:
+            pd.DataFrame: Features y puntuación de las filas procesadas
+        """
+        if self.modelo is None:
+            raise RuntimeError("Primero debe llamarse a ajustar_referencia")
+
+        matriz, excluidas = self._preparar(df)
+        valores = matriz.to_numpy()
+        with self._candado:
+            self.bajas += self._dar_de_baja(excluidas)
+            posiciones = self._ubicar(matriz.index)
+            existentes = posiciones >= 0
+            sin_cambios = np.zeros(len(matriz), dtype=bool)
+            sin_cambios[existentes] = self._activas[posiciones[existentes]] & (
+                self._valores[posiciones[existentes]] == valores[existentes]
+            ).all(axis=1)
+            modelo = self.modelo
+        matriz = matriz[~sin_cambios]
+        if matriz.empty:
+            return matriz.assign(puntaje_anomalia=[], es_anomalia=[])
+
+        valores = valores[~sin_cambios]
+        puntajes, etiquetas = self._puntuar(modelo, matriz)
+        with self._candado:
+            self._escribir(list(matriz.index), valores, puntajes, etiquetas)
+            for i, f in enumerate(self.features):
+                self._conteos_ventana[f] += np.bincount(
+                    np.searchsorted(self._cortes[f], valores[:, i]),
+                    minlength=len(self._cortes[f]) + 1,
+                )
+            self._filas_ventana += len(matriz)
+
+        self._evaluar_deriva()
+        return matriz.assign(puntaje_anomalia=puntajes, es_anomalia=etiquetas)
+
+    @property
+    def cartera(self):
+        """Filas activas con su última puntuación (copia)"""
+        with self._candado:
+            activas = np.flatnonzero(self._activas[: self._filas])
+            cartera = pd.DataFrame(
+                self._valores[activas],
+                index=pd.Index(self._lista_ids, dtype=object, name="id")[activas],
+                columns=self.features,
+            )
+            cartera["puntaje_anomalia"] = self._puntajes[activas]
+            cartera["es_anomalia"] = self._etiquetas[activas]
+        return cartera
+
+    @property
+    def reentrenando(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def esperar_reentrenamiento(self, timeout=None):
+        """Bloquea hasta que termine el reentrenamiento en curso, si lo hay"""
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    # -------------------------------------------------------------
+    # Deriva y reentrenamiento
+    # -------------------------------------------------------------
+
+    def _evaluar_deriva(self):
+        with self._candado:
+            if self._filas_ventana < self.minimo_filas_deriva:
+                return
+            self.deriva = {
+                f: indice_estabilidad(
+                    self._proporciones[f],
+                    self._conteos_ventana[f] / self._filas_ventana,
+                )
+                for f in self.features
+            }
+            hay_deriva = max(self.deriva.values()) > self.umbral_deriva
+        if hay_deriva and not self.reentrenando:
+            self._hilo = threading.Thread(target=self._reentrenar, daemon=True)
+            self._hilo.start()
+
+    def _reentrenar(self):
+        """
+        Reajusta sobre una foto de las filas activas y reemplaza el modelo al
+        terminar. Solo se reescriben los puntajes de las filas que no
+        cambiaron durante el ajuste: las modificadas o agregadas mientras
+        tanto conservan el puntaje con que las calculó `actualizar`.
+        """
+        with self._candado:
+            posiciones = np.flatnonzero(self._activas[: self._filas])
+            valores = self._valores[posiciones]
+            versiones = self._versiones[posiciones]
+        matriz = pd.DataFrame(valores, columns=self.features)
+        modelo = self._ajustar(matriz)
+        puntajes, etiquetas = self._puntuar(modelo, matriz)
+        with self._candado:
+            vigentes = self._versiones[posiciones] == versiones
+            self._puntajes[posiciones[vigentes]] = puntajes[vigentes]
+            self._etiquetas[posiciones[vigentes]] = etiquetas[vigentes]
+            self.modelo = modelo
+            self._fijar_referencia(valores)
+            self.reentrenamientos += 1
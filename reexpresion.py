@@ -0,0 +1,245 @@
+"""
+AJUSTE POR INFLACIÓN (RT 6)
+Reexpresa importes históricos en moneda de cierre con los coeficientes de
+una serie mensual de índices de precios guardada localmente:
+
+    coeficiente = índice del mes de cierre / índice del mes de origen
+
+Se reexpresan los importes medidos a la fecha de origen de cada registro:
+el monto original de las deudas (en pesos a la cotización de la emisión) y
+el monto estimado de las previsiones a su creación. Los saldos pendientes
+en pesos son partidas monetarias y ya están en moneda de cierre.
+
+Cada registro guarda una sola vez su desplazamiento (meses desde el primer
+mes de la serie). Para cada cierre los coeficientes se precalculan como un
+arreglo indexado por ese desplazamiento, de modo que reexpresar toda la
+cartera a una fecha cuesta una indexación y una multiplicación.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from revaluacion import codigos_moneda, cotizaciones_a_fechas
+
+# Serie de índices (periodo AAAA-MM, indice). La que se incluye es
+# ilustrativa: ver el encabezado del archivo. Se resuelve junto al módulo
+# para no depender del directorio de trabajo
+RUTA_INDICES = os.environ.get(
+    "PASIVO_INDICES",
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "data",
+        "indices",
+        "indice_precios_ilustrativo.csv",
+    ),
+)
+
+COLUMNAS_ORIGEN = {
+    "deudas": ("fecha_emision", "monto_original"),
+    "previsiones": ("fecha_creacion", "monto_estimado_ars"),
+}
+
+# Desplazamiento de los registros sin fecha de origen: su coeficiente es 0
+_SIN_ORIGEN = -1
+
+
+def _meses(fechas):
+    """Meses desde 1970 de cada fecha (NaT queda como el mínimo de int64)"""
+    fechas = np.ravel(fechas)
+    if not np.issubdtype(fechas.dtype, np.datetime64):
+        fechas = pd.to_datetime(fechas)
+    return np.asarray(fechas, dtype="datetime64[M]").astype("int64")
+
+
+class SerieIndices:
+    """
+    Serie mensual de índices de precios, sin huecos, desde `primer_mes`
+
+    Ejemplo:
+        serie = SerieIndices.desde_csv()
+        desplazamientos = serie.desplazamientos(df["fecha_emision"])
+        for cierre in cierres:
+            reexpresado = serie.reexpresar(montos, desplazamientos, cierre)
+    """
+
+    def __init__(self, periodos, indices):
+        meses = _meses(pd.PeriodIndex(periodos, freq="M").to_timestamp())
+        orden = np.argsort(meses)
+        meses = meses[orden]
+        if len(meses) and (np.diff(meses) != 1).any():
+            raise ValueError("La serie de índices debe ser mensual y sin huecos")
+        self.primer_mes = int(meses[0]) if len(meses) else 0
+        self.indices = np.asarray(indices, dtype="float64")[orden]
+
+    @classmethod
+    def desde_csv(cls, ruta=RUTA_INDICES):
+        """Lee una serie CSV con columnas periodo e indice ("#" comenta)"""
+        tabla = pd.read_csv(ruta, comment="#", dtype={"periodo": str})
+        return cls(tabla["periodo"], tabla["indice"])
+
+    @property
+    def primer_periodo(self):
+        return pd.Period(np.datetime64(self.primer_mes, "M"), freq="M")
+
+    @property
+    def ultimo_periodo(self):
+        return self.primer_periodo + (len(self.indices) - 1)
+
+    def _posicion(self, fecha):
+        """Desplazamiento del mes de `fecha` (un cierre) dentro de la serie"""
+        posicion = int(_meses([fecha])[0]) - self.primer_mes
+        if not 0 <= posicion < len(self.indices):
+            raise ValueError(f"Sin índice de precios para {pd.Timestamp(fecha):%m/%Y}")
+        return posicion
+
+    def desplazamientos(self, fechas):
+        """
+        Meses desde el primer mes de la serie hasta el de cada fecha de
+        origen (se calcula una vez por cartera)
+
+        Returns:
+            np.ndarray: int32; _SIN_ORIGEN para fechas faltantes
+        """
+        meses = _meses(fechas)
+        faltantes = meses == np.iinfo("int64").min
+        desplazamientos = meses - self.primer_mes
+        validos = desplazamientos[~faltantes]
+        if len(validos) and (validos.min() < 0 or validos.max() >= len(self.indices)):
+            raise ValueError(
+                "Hay fechas de origen fuera de la serie de índices "
+                f"({self.primer_periodo.strftime('%m/%Y')} - "
+                f"{self.ultimo_periodo.strftime('%m/%Y')})"
+            )
+        return np.where(faltantes, _SIN_ORIGEN, desplazamientos).astype("int32")
+
+    def coeficientes(self, fecha_cierre):
+        """
+        Coeficiente de reexpresión al cierre por desplazamiento de origen
+
+        Los orígenes posteriores al cierre (registros que todavía no
+        existían) y los faltantes (última posición, -1) tienen coeficiente 0.
+
+        Returns:
+            np.ndarray: len(indices) + 1 coeficientes
+        """
+        cierre = self._posicion(fecha_cierre)
+        coeficientes = np.zeros(len(self.indices) + 1)
+        coeficientes[: cierre + 1] = self.indices[cierre] / self.indices[: cierre + 1]
+        return coeficientes
+
+    def tabla_coeficientes(self, fechas_cierre):
+        """
+        Coeficientes de varios cierres: `tabla[j, desplazamientos]` son los
+        de cada registro al cierre j
+
+        Returns:
+            np.ndarray: len(fechas_cierre) x (len(indices) + 1)
+        """
+        fechas_cierre = np.ravel(fechas_cierre)
+        return np.array([self.coeficientes(fecha) for fecha in fechas_cierre]).reshape(
+            len(fechas_cierre), len(self.indices) + 1
+        )
+
+    def reexpresar(self, montos, desplazamientos, fecha_cierre):
+        """Montos históricos en moneda de `fecha_cierre`"""
+        return montos * self.coeficientes(fecha_cierre)[desplazamientos]
+
+
+@lru_cache(maxsize=4)
+def _serie_por_defecto(ruta):
+    return SerieIndices.desde_csv(ruta)
+
+
+def serie_por_defecto():
+    """Serie de RUTA_INDICES, leída una sola vez"""
+    return _serie_por_defecto(RUTA_INDICES)
+
+
+# =================================================================
+# CARTERA
+# =================================================================
+
+
+def montos_historicos(df, entidad):
+    """
+    Importe en pesos a la fecha de origen de cada registro: el monto
+    original de las deudas a la cotización de la emisión (si ya está
+    calculado, la columna monto_original_ars) o el monto estimado de las
+    previsiones
+
+    Returns:
+        tuple: (montos float64, fechas de origen)
+    """
+    columna_fecha, columna_monto = COLUMNAS_ORIGEN[entidad]
+    fechas = df[columna_fecha]
+    if entidad == "deudas" and "monto_original_ars" in df.columns:
+        columna_monto = "monto_original_ars"
+    montos = pd.to_numeric(df[columna_monto]).astype("float64").fillna(0.0)
+    montos = montos.to_numpy()
+    if columna_monto == "monto_original":
+        montos = montos * cotizaciones_a_fechas(codigos_moneda(df), fechas)
+    return montos, fechas
+
+
+def reexpresar_a_fecha(df, entidad, fecha_cierre, serie=None):
+    """
+    Reexpresión de cada registro a una fecha de cierre
+
+    Args:
+        df: Deudas o previsiones
+        entidad: "deudas" o "previsiones"
+        fecha_cierre: Fecha de cierre (se usa el índice de su mes)
+        serie: SerieIndices (por defecto, la de RUTA_INDICES)
+
+    Returns:
+        pd.DataFrame: monto_historico, coeficiente_reexpresion y
+        monto_reexpresado, alineado con `df`
+    """
+    serie = serie or serie_por_defecto()
+    montos, fechas = montos_historicos(df, entidad)
+    coeficientes = serie.coeficientes(fecha_cierre)[serie.desplazamientos(fechas)]
+    return pd.DataFrame(
+        {
+            "monto_historico": montos,
+            "coeficiente_reexpresion": coeficientes,
+            "monto_reexpresado": np.round(montos * coeficientes, 2),
+        },
+        index=df.index,
+    )
+
+
+def reexpresar_a_fechas(df, entidad, fechas_cierre, serie=None):
+    """
+    Totales históricos y reexpresados a varias fechas de cierre
+
+    Los desplazamientos se calculan una vez; cada cierre es una indexación
+    del arreglo de coeficientes y una suma ponderada. Solo cuentan los
+    registros originados hasta cada cierre.
+
+    Returns:
+        pd.DataFrame: fecha_cierre, registros, monto_historico y
+        monto_reexpresado
+    """
+    serie = serie or serie_por_defecto()
+    montos, fechas = montos_historicos(df, entidad)
+    desplazamientos = serie.desplazamientos(fechas)
+    fechas_cierre = pd.to_datetime(pd.Series(np.ravel(fechas_cierre)))
+    filas = []
+    for cierre in fechas_cierre:
+        coeficientes = serie.coeficientes(cierre)[desplazamientos]
+        originados = coeficientes > 0
+        filas.append(
+            (
+                int(originados.sum()),
+                float(montos @ originados),
+                float(montos @ coeficientes),
+            )
+        )
+    totales = pd.DataFrame(
+        filas, columns=["registros", "monto_historico", "monto_reexpresado"]
+    )
+    totales.insert(0, "fecha_cierre", fechas_cierre.to_numpy())
+    return totales
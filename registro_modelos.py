@@ -0,0 +1,175 @@
+"""
+REGISTRO DE MODELOS DE DETECCIÓN DE ANOMALÍAS
+Guarda los Isolation Forest ya ajustados (joblib), con una clave construida
+a partir de la huella de la matriz de features y de los hiperparámetros.
+Ante un acierto solo se ejecuta `predict`/`score_samples`; el ajuste se hace
+una única vez por combinación de datos e hiperparámetros y se comparte entre
+sesiones, procesos y réplicas que monten el mismo directorio.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+DIRECTORIO_MODELOS = os.environ.get("PASIVO_MODELOS_DIR", "data/modelos")
+MAX_MODELOS_DISCO = int(os.environ.get("PASIVO_MODELOS_MAX_DISCO", 64))
+MAX_MODELOS_MEMORIA = 8
+VERSION_FORMATO = 1
+
+_EXTENSION = ".joblib"
+
+
+def huella_features(features, hiperparametros=None):
+    """
+    Calcula la huella de una matriz de features y de los hiperparámetros
+
+    Incluye nombres de columnas, forma y los valores como float64 contiguo,
+    de modo que el mismo conjunto de datos produce la misma clave sin
+    importar el dtype o la disposición en memoria de origen.
+    """
+    columnas = list(getattr(features, "columns", []))
+    matriz = np.ascontiguousarray(np.asarray(features, dtype="float64"))
+
+    sha = hashlib.sha256()
+    encabezado = {
+        "columnas": [str(c) for c in columnas],
+        "forma": list(matriz.shape),
+        "hiperparametros": hiperparametros or {},
+        "_version": VERSION_FORMATO,
+    }
+    sha.update(json.dumps(encabezado, sort_keys=True, default=str).encode("utf-8"))
+    sha.update(memoryview(matriz).cast("B"))
+    return sha.hexdigest()[:32]
+
+
+class RegistroModelos:
+    """
+    Registro de modelos ajustados en memoria y en disco, con desalojo LRU
+
+    En memoria se conservan los `max_memoria` modelos usados más
+    recientemente; en disco, los `max_disco` más recientes según la fecha
+    de modificación de cada archivo (como en `cache_datasets`). Es seguro
+    compartir una instancia entre hilos.
+    """
+
+    def __init__(
+        self,
+        directorio=DIRECTORIO_MODELOS,
+        max_disco=MAX_MODELOS_DISCO,
+        max_memoria=MAX_MODELOS_MEMORIA,
+    ):
+        self.directorio = directorio
+        self.max_disco = max_disco
+        self.max_memoria = max_memoria
+        self._memoria = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.ajustes = 0
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}{_EXTENSION}")
+
+    def _recordar(self, clave, modelo):
+        self._memoria[clave] = modelo
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def obtener(self, clave):
+        """Devuelve el modelo registrado o None si no existe"""
+        import joblib
+
+        with self._candado:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                return self._memoria[clave]
+
+        ruta = self._ruta(clave)
+        try:
+            modelo = joblib.load(ruta)
+        except (FileNotFoundError, EOFError, OSError):
+            return None
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+
+        with self._candado:
+            self._recordar(clave, modelo)
+        return modelo
+
+    def guardar(self, clave, modelo):
+        """Guarda el modelo en forma atómica y aplica el desalojo LRU"""
+        import joblib
+
+        ruta = self._ruta(clave)
+        ruta_temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+        joblib.dump(modelo, ruta_temporal)
+        os.replace(ruta_temporal, ruta)
+        with self._candado:
+            self._recordar(clave, modelo)
+        self.desalojar()
+
+    def obtener_o_ajustar(self, features, hiperparametros, crear_modelo):
+        """
+        Devuelve el modelo ajustado sobre `features` con esos hiperparámetros
+
+        Args:
+            features: Matriz o DataFrame de entrenamiento
+            hiperparametros: Diccionario que identifica la configuración
+            crear_modelo: Función sin argumentos que devuelve el estimador
+                sin ajustar (se llama solo si no hay acierto)
+        """
+        clave = huella_features(features, hiperparametros)
+        modelo = self.obtener(clave)
+        if modelo is not None:
+            self.aciertos += 1
+            return modelo
+
+        modelo = crear_modelo().fit(features)
+        self.ajustes += 1
+        self.guardar(clave, modelo)
+        return modelo
+
+    def isolation_forest(self, features, contaminacion=0.1, semilla=42, **opciones):
+        """Isolation Forest ajustado sobre `features`, reutilizado si ya existe"""
+        from sklearn.ensemble import IsolationForest
+
+        hiperparametros = dict(
+            opciones,
+            modelo="IsolationForest",
+            contamination=contaminacion,
+            random_state=semilla,
+        )
+        return self.obtener_o_ajustar(
+            features,
+            hiperparametros,
+            lambda: IsolationForest(
+                random_state=semilla, contamination=contaminacion, **opciones
+            ),
+        )
+
+    def desalojar(self):
+        """Borra los modelos menos usados del disco hasta quedar en el límite"""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(_EXTENSION):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                entradas.append((os.stat(ruta).st_mtime, ruta))
+            except FileNotFoundError:
+                continue
+
+        sobrantes = len(entradas) - self.max_disco
+        for _, ruta in sorted(entradas)[: max(sobrantes, 0)]:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
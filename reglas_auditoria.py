@@ -0,0 +1,443 @@
+"""
+REGLAS DE AUDITORÍA
+Controles determinísticos sobre deudas y previsiones (saldo mayor al monto
+original, deuda activa vencida, previsión sin revisar, etc.), declarados
+como datos y compilados a máscaras booleanas vectorizadas. Las condiciones
+repetidas entre reglas se evalúan una sola vez y todas las reglas se
+resuelven en una única pasada por bloques de filas, de modo que cientos de
+reglas sobre millones de filas cuestan poco más que leer las columnas.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from esquema_datos import columnas_de_tipo
+from generacion_datos import FECHA_REFERENCIA_PREVISIONES
+
+TAMANO_BLOQUE_REGLAS = 1_000_000
+MAXIMO_IDS_EJEMPLO = 5
+
+SEVERIDADES = ["Alta", "Media", "Baja"]
+
+_COMPARACIONES = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+_OPERADORES_CONJUNTO = ("en", "no_en")
+_OPERADORES_NULO = ("nulo", "no_nulo")
+
+
+@dataclass(frozen=True)
+class Columna:
+    """Operando que refiere a otra columna de la misma fila"""
+
+    nombre: str
+
+
+@dataclass(frozen=True)
+class FechaCorte:
+    """Operando que vale la fecha de corte más `dias` (negativo = antes)"""
+
+    dias: int = 0
+
+
+@dataclass(frozen=True)
+class Regla:
+    """
+    Control determinístico: la fila es un hallazgo si cumple TODAS las
+    condiciones
+
+    Cada condición es una tupla (columna, operador, valor):
+        - operador: "==", "!=", ">", ">=", "<", "<=", "en", "no_en",
+          "nulo" o "no_nulo"
+        - valor: constante, lista (para "en"/"no_en"), Columna(...),
+          FechaCorte(...) o None (para "nulo"/"no_nulo")
+    """
+
+    codigo: str
+    descripcion: str
+    condiciones: tuple
+    severidad: str = "Media"
+
+    @property
+    def columnas(self):
+        nombres = {columna for columna, _, _ in self.condiciones}
+        nombres.update(
+            valor.nombre
+            for _, _, valor in self.condiciones
+            if isinstance(valor, Columna)
+        )
+        return nombres
+
+
+def _condicion(columna, operador, valor=None):
+    """Normaliza una condición para que sea hashable (listas -> tuplas)"""
+    if isinstance(valor, (list, set)):
+        valor = tuple(valor)
+    return (columna, operador, valor)
+
+
+def regla(codigo, descripcion, condiciones, severidad="Media"):
+    """Construye una Regla a partir de condiciones en listas o tuplas"""
+    if severidad not in SEVERIDADES:
+        raise ValueError(f"Severidad desconocida: {severidad}")
+    return Regla(
+        codigo,
+        descripcion,
+        tuple(_condicion(*c) for c in condiciones),
+        severidad,
+    )
+
+
+# =================================================================
+# CATÁLOGO DE REGLAS
+# =================================================================
+
+REGLAS_DEUDAS = [
+    regla(
+        "DEU-01",
+        "Saldo pendiente mayor al monto original",
+        [("saldo_pendiente_simulado", ">", Columna("monto_original"))],
+        "Alta",
+    ),
+    regla(
+        "DEU-02",
+        "Deuda activa con vencimiento anterior a la fecha de corte",
+        [("estado_deuda", "==", "Activa"), ("fecha_vencimiento", "<", FechaCorte())],
+        "Alta",
+    ),
+    regla(
+        "DEU-03",
+        "Deuda pagada con saldo pendiente",
+        [("estado_deuda", "==", "Pagada"), ("saldo_pendiente_simulado", ">", 0)],
+        "Alta",
+    ),
+    regla(
+        "DEU-04",
+        "Vencimiento anterior a la emisión",
+        [("fecha_vencimiento", "<", Columna("fecha_emision"))],
+        "Alta",
+    ),
+    regla(
+        "DEU-05",
+        "Emisión posterior a la fecha de corte",
+        [("fecha_emision", ">", FechaCorte())],
+        "Media",
+    ),
+    regla(
+        "DEU-06",
+        "Monto original nulo o negativo",
+        [("monto_original", "<=", 0)],
+        "Media",
+    ),
+    regla(
+        "DEU-07",
+        "Saldo pendiente negativo",
+        [("saldo_pendiente_simulado", "<", 0)],
+        "Media",
+    ),
+    regla(
+        "DEU-08",
+        "Tasa de interés negativa",
+        [("tasa_interes_anual", "<", 0)],
+        "Media",
+    ),
+    regla(
+        "DEU-09",
+        "Tasa de interés anual superior al 100%",
+        [("tasa_interes_anual", ">", 1)],
+        "Baja",
+    ),
+    regla(
+        "DEU-10",
+        "Deuda vigente con vencimiento dentro de los 12 meses (porción corriente)",
+        [
+            ("estado_deuda", "en", ["Activa", "Incumplida"]),
+            ("fecha_vencimiento", ">=", FechaCorte()),
+            ("fecha_vencimiento", "<", FechaCorte(365)),
+        ],
+        "Baja",
+    ),
+]
+
+REGLAS_PREVISIONES = [
+    regla(
+        "PRV-01",
+        "Previsión vigente sin revisión hace más de un año",
+        [
+            ("estado_actual", "en", ["Activa", "Ajustada"]),
+            ("fecha_ultima_revision", "<", FechaCorte(-365)),
+        ],
+        "Alta",
+    ),
+    regla(
+        "PRV-02",
+        "Previsión utilizada con fecha de utilización futura",
+        [
+            ("estado_actual", "==", "Utilizada"),
+            ("fecha_estimada_utilizacion", ">", FechaCorte()),
+        ],
+        "Alta",
+    ),
+    regla(
+        "PRV-03",
+        "Revisión anterior a la creación",
+        [("fecha_ultima_revision", "<", Columna("fecha_creacion"))],
+        "Alta",
+    ),
+    regla(
+        "PRV-04",
+        "Creación posterior a la fecha de corte",
+        [("fecha_creacion", ">", FechaCorte())],
+        "Media",
+    ),
+    regla(
+        "PRV-05",
+        "Monto estimado nulo o negativo",
+        [("monto_estimado_ars", "<=", 0)],
+        "Media",
+    ),
+    regla(
+        "PRV-06",
+        "Previsión vigente sin fecha estimada de utilización",
+        [
+            ("estado_actual", "en", ["Activa", "Ajustada"]),
+            ("fecha_estimada_utilizacion", "nulo", None),
+        ],
+        "Baja",
+    ),
+]
+
+REGLAS_POR_ENTIDAD = {
+    "deudas": REGLAS_DEUDAS,
+    "previsiones": REGLAS_PREVISIONES,
+}
+COLUMNA_ID = {
+    "deudas": "deuda_id",
+    "previsiones": "id_prevision",
+}
+FECHA_CORTE_POR_DEFECTO = {
+    "deudas": FECHA_REFERENCIA_PREVISIONES,
+    "previsiones": FECHA_REFERENCIA_PREVISIONES,
+}
+
+
+# =================================================================
+# RESULTADO
+# =================================================================
+
+
+@dataclass
+class ResultadoReglas:
+    """Hallazgos de las reglas sobre un DataFrame"""
+
+    # Una fila por regla: codigo, descripcion, severidad, evaluada,
+    # cantidad, porcentaje e ids_ejemplo
+    resumen: pd.DataFrame
+    # Posiciones (iloc) de las filas que cumplen cada regla evaluada
+    posiciones: dict = field(default_factory=dict)
+    # Cantidad de reglas incumplidas por fila
+    reglas_por_fila: np.ndarray = None
+    ids: np.ndarray = None
+
+    @property
+    def cantidad_hallazgos(self):
+        return int(self.resumen["cantidad"].sum())
+
+    @property
+    def filas_con_hallazgos(self):
+        """Posiciones de las filas que incumplen al menos una regla"""
+        return np.flatnonzero(self.reglas_por_fila > 0)
+
+    def ids_de(self, codigo):
+        """Ids de las filas que cumplen la regla indicada"""
+        return self.ids[self.posiciones[codigo]]
+
+    def con_hallazgos(self):
+        """Resumen solo de las reglas con al menos una fila"""
+        return self.resumen[self.resumen["cantidad"] > 0]
+
+
+# =================================================================
+# COMPILACIÓN Y EVALUACIÓN
+# =================================================================
+
+
+def _fecha(fecha_corte):
+    if fecha_corte is None:
+        return pd.Timestamp(FECHA_REFERENCIA_PREVISIONES)
+    return pd.Timestamp(fecha_corte).normalize()
+
+
+def _preparar_columna(serie, es_fecha):
+    """
+    Representación para evaluar condiciones: códigos + categorías para
+    texto y categorías, o un array de NumPy para números y fechas
+    """
+    if es_fecha or pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return (
+            pd.to_datetime(serie, errors="coerce").to_numpy(dtype="datetime64[ns]"),
+            None,
+        )
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_bool_dtype(
+        serie.dtype
+    ):
+        return serie.to_numpy(dtype="float64", na_value=np.nan), None
+    categorica = pd.Categorical(serie)
+    return categorica.codes, categorica.categories
+
+
+def _es_nulo(valores, categorias):
+    if categorias is not None:
+        return valores < 0
+    if np.issubdtype(valores.dtype, np.datetime64):
+        return np.isnat(valores)
+    return np.isnan(valores)
+
+
+def _operando(valor, bloque, columnas, fecha_corte):
+    if isinstance(valor, Columna):
+        valores, categorias = columnas[valor.nombre]
+        if categorias is not None:
+            raise TypeError(f"No se puede comparar con la columna {valor.nombre}")
+        return valores[bloque]
+    if isinstance(valor, FechaCorte):
+        return np.datetime64(fecha_corte + pd.Timedelta(days=valor.dias), "ns")
+    return valor
+
+
+def _evaluar_condicion(condicion, bloque, columnas, fecha_corte):
+    """Máscara booleana de una condición sobre las filas del bloque"""
+    nombre, operador, valor = condicion
+    valores, categorias = columnas[nombre]
+    valores = valores[bloque]
+
+    if operador in _OPERADORES_NULO:
+        nulos = _es_nulo(valores, categorias)
+        return nulos if operador == "nulo" else ~nulos
+
+    if categorias is not None:
+        # Texto: se compara por código, sin materializar cadenas
+        if operador in ("==", "!="):
+            valor = (valor,)
+            operador = "en" if operador == "==" else "no_en"
+        if operador not in _OPERADORES_CONJUNTO:
+            raise ValueError(f"Operador {operador} no válido para {nombre}")
+        codigos = categorias.get_indexer(list(valor))
+        mascara = np.isin(valores, codigos[codigos >= 0])
+        return mascara if operador == "en" else ~mascara & (valores >= 0)
+
+    if operador in _OPERADORES_CONJUNTO:
+        mascara = np.isin(valores, list(valor))
+        return mascara if operador == "en" else ~mascara & ~_es_nulo(valores, None)
+    if operador not in _COMPARACIONES:
+        raise ValueError(f"Operador desconocido: {operador}")
+    # Comparaciones con NaN / NaT dan False: un valor faltante no es hallazgo
+    return _COMPARACIONES[operador](
+        valores, _operando(valor, bloque, columnas, fecha_corte)
+    )
+
+
+def evaluar_reglas(
+    df,
+    entidad,
+    reglas=None,
+    fecha_corte=None,
+    columna_id=None,
+    tamano_bloque=TAMANO_BLOQUE_REGLAS,
+):
+    """
+    Evalúa las reglas sobre `df` en una sola pasada por bloques
+
+    Las reglas cuyas columnas no están en `df` (p. ej. columnas opcionales
+    ausentes en un extracto del ERP) se informan con `evaluada=False`.
+
+    Args:
+        df: DataFrame de deudas o previsiones (no se modifica)
+        entidad: "deudas" o "previsiones"
+        reglas: Lista de Regla (por defecto, el catálogo de la entidad)
+        fecha_corte: Fecha contra la que se evalúan las reglas con
+            FechaCorte (por defecto, FECHA_REFERENCIA_PREVISIONES)
+        columna_id: Columna con el identificador de cada fila
+        tamano_bloque: Filas evaluadas por bloque
+
+    Returns:
+        ResultadoReglas
+    """
+    if entidad not in REGLAS_POR_ENTIDAD:
+        raise ValueError(f"Entidad desconocida: {entidad}")
+    reglas = REGLAS_POR_ENTIDAD[entidad] if reglas is None else reglas
+    columna_id = columna_id or COLUMNA_ID[entidad]
+    if fecha_corte is None:
+        fecha_corte = FECHA_CORTE_POR_DEFECTO[entidad]
+    fecha_corte = _fecha(fecha_corte)
+
+    evaluables = [r for r in reglas if r.columnas <= set(df.columns)]
+    necesarias = set().union(*(r.columnas for r in evaluables))
+    fechas = set(columnas_de_tipo(entidad, "fecha"))
+    columnas = {c: _preparar_columna(df[c], c in fechas) for c in necesarias}
+
+    # Condiciones únicas: cada una se evalúa una vez por bloque
+    condiciones = list(dict.fromkeys(c for r in evaluables for c in r.condiciones))
+    indice = {c: i for i, c in enumerate(condiciones)}
+    indices_regla = [[indice[c] for c in r.condiciones] for r in evaluables]
+
+    n = len(df)
+    partes = {r.codigo: [] for r in evaluables}
+    reglas_por_fila = np.zeros(n, dtype="int32")
+    for inicio in range(0, n, tamano_bloque):
+        bloque = slice(inicio, min(inicio + tamano_bloque, n))
+        mascaras = [
+            _evaluar_condicion(c, bloque, columnas, fecha_corte) for c in condiciones
+        ]
+        for r, indices in zip(evaluables, indices_regla):
+            mascara = mascaras[indices[0]]
+            for i in indices[1:]:
+                mascara = mascara & mascaras[i]
+            reglas_por_fila[bloque] += mascara
+            partes[r.codigo].append(np.flatnonzero(mascara) + inicio)
+
+    posiciones = {
+        codigo: np.concatenate(p) if p else np.empty(0, dtype="int64")
+        for codigo, p in partes.items()
+    }
+    ids = (
+        df[columna_id].to_numpy(dtype=object)
+        if columna_id in df.columns
+        else np.arange(n).astype(str).astype(object)
+    )
+
+    filas = []
+    for r in reglas:
+        encontradas = posiciones.get(r.codigo)
+        cantidad = 0 if encontradas is None else len(encontradas)
+        filas.append(
+            {
+                "codigo": r.codigo,
+                "descripcion": r.descripcion,
+                "severidad": r.severidad,
+                "evaluada": encontradas is not None,
+                "cantidad": cantidad,
+                "porcentaje": cantidad / n * 100 if n else 0.0,
+                "ids_ejemplo": (
+                    ", ".join(map(str, ids[encontradas[:MAXIMO_IDS_EJEMPLO]]))
+                    if cantidad
+                    else ""
+                ),
+            }
+        )
+
+    return ResultadoReglas(
+        resumen=pd.DataFrame(filas),
+        posiciones=posiciones,
+        reglas_por_fila=reglas_por_fila,
+        ids=ids,
+    )
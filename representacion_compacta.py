@@ -0,0 +1,130 @@
+"""
+REPRESENTACIÓN COMPACTA DE DEUDAS Y PREVISIONES
+Convierte los DataFrames a tipos columnares de bajo consumo de memoria:
+categorías para columnas de baja cardinalidad, datetime64 para fechas e
+importes configurables (float64, float32 o centavos en int64).
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from esquema_datos import columnas_de_tipo
+
+TIPOS_MONTO = ("float64", "float32", "centavos")
+ESCALA_CENTAVOS = 100
+
+
+def convertir_montos(df, entidad, tipo_montos="float64"):
+    """
+    Cambia la representación de las columnas de importes (en el lugar)
+
+    Con "centavos" los importes se guardan como enteros int64 escalados por
+    100 y `df.attrs["escala_montos"]` queda en 100; `montos_en_pesos` revierte
+    la escala.
+    """
+    if tipo_montos not in TIPOS_MONTO:
+        raise ValueError(f"Tipo de montos desconocido: {tipo_montos}")
+
+    escala_actual = df.attrs.get("escala_montos", 1)
+    for columna in columnas_de_tipo(entidad, "monto"):
+        if columna not in df.columns:
+            continue
+        pesos = df[columna].astype("float64") / escala_actual
+        if tipo_montos == "float64":
+            df[columna] = pesos
+        elif tipo_montos == "float32":
+            df[columna] = pesos.astype("float32")
+        else:
+            centavos = np.round(pesos * ESCALA_CENTAVOS)
+            df[columna] = (
+                centavos.astype("Int64")
+                if centavos.isna().any()
+                else centavos.astype("int64")
+            )
+    df.attrs["escala_montos"] = ESCALA_CENTAVOS if tipo_montos == "centavos" else 1
+    return df
+
+
+def montos_en_pesos(df, entidad):
+    """Devuelve una copia con los importes en pesos como float64"""
+    if df.attrs.get("escala_montos", 1) == 1 and all(
+        df[c].dtype == "float64"
+        for c in columnas_de_tipo(entidad, "monto")
+        if c in df.columns
+    ):
+        return df
+    return convertir_montos(df.copy(), entidad, "float64")
+
+
+def compactar(df, entidad, tipo_montos="float64"):
+    """
+    Convierte un DataFrame de deudas o previsiones a su representación compacta
+
+    - Columnas "categoria" del esquema -> dtype category
+    - Fechas (incluidos objetos `date` de Python) -> datetime64[s]
+    - Importes -> float64, float32 o centavos int64 según `tipo_montos`
+
+    pandas no admite datetime64[D]; datetime64[s] ocupa lo mismo (8 bytes).
+
+    Returns:
+        pd.DataFrame: Nuevo DataFrame compacto
+    """
+    df = df.copy()
+    for columna in columnas_de_tipo(entidad, "categoria"):
+        if columna in df.columns and not isinstance(
+            df[columna].dtype, pd.CategoricalDtype
+        ):
+            df[columna] = df[columna].astype("category")
+    for columna in columnas_de_tipo(entidad, "fecha"):
+        if columna in df.columns:
+            df[columna] = pd.to_datetime(df[columna]).astype("datetime64[s]")
+    return convertir_montos(df, entidad, tipo_montos)
+
+
+def concatenar_compactos(frames):
+    """
+    Concatena DataFrames compactos conservando las columnas categóricas
+
+    `pd.concat` devuelve object cuando las categorías de los lotes difieren;
+    aquí se unifican con `union_categoricals`.
+    """
+    frames = [f for f in frames if len(f.columns)]
+    if not frames:
+        return pd.DataFrame()
+    resultado = pd.concat(frames, ignore_index=True)
+    for columna in frames[0].columns:
+        if isinstance(frames[0][columna].dtype, pd.CategoricalDtype) and not isinstance(
+            resultado[columna].dtype, pd.CategoricalDtype
+        ):
+            resultado[columna] = union_categoricals(
+                [f[columna] for f in frames], ignore_order=True
+            )
+    resultado.attrs = dict(frames[0].attrs)
+    return resultado
+
+
+def reporte_memoria(antes, despues):
+    """
+    Compara la memoria por columna de dos versiones de un DataFrame
+
+    Returns:
+        pd.DataFrame: tipo y bytes antes/después y reducción porcentual por
+        columna, con una fila TOTAL al final
+    """
+    bytes_antes = antes.memory_usage(deep=True, index=False)
+    bytes_despues = despues.memory_usage(deep=True, index=False)
+    reporte = pd.DataFrame(
+        {
+            "tipo_antes": antes.dtypes.astype(str),
+            "bytes_antes": bytes_antes,
+            "tipo_despues": despues.dtypes.astype(str).reindex(antes.columns),
+            "bytes_despues": bytes_despues.reindex(antes.columns),
+        }
+    )
+    reporte.loc["TOTAL"] = ["", bytes_antes.sum(), "", bytes_despues.sum()]
+    reporte["reduccion_pct"] = (
+        (1 - reporte["bytes_despues"] / reporte["bytes_antes"]) * 100
+    ).round(1)
+    reporte.index.name = "columna"
+    return reporte
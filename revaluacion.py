@@ -0,0 +1,204 @@
+"""
+REVALUACIÓN EN MONEDA EXTRANJERA Y UVA
+Las deudas pueden estar denominadas en pesos, dólares o UVA (columna
+opcional `moneda`); sus importes (monto original, saldo, intereses, costos)
+están en la unidad de esa moneda. Este módulo los expresa en pesos a
+cualquier fecha con una tabla local de cotizaciones.
+
+Las cotizaciones se buscan con un merge as-of ordenado (la última
+publicada en o antes de cada fecha) y no fila por fila. Para muchas fechas
+de cierre el as-of se resuelve una sola vez por moneda y fecha, y cada
+instrumento toma su fila de esa tabla chica por indexación.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+MONEDAS = ["ARS", "USD", "UVA"]
+_ARS = 0
+
+# Tabla de cotizaciones (fecha, moneda, valor en pesos por unidad). La que
+# se incluye es ilustrativa: ver el encabezado del archivo. Se resuelve
+# junto al módulo, no en el directorio de trabajo: el generador la lee
+RUTA_COTIZACIONES = os.environ.get(
+    "PASIVO_COTIZACIONES",
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "data",
+        "cotizaciones",
+        "cotizaciones_ilustrativas.csv",
+    ),
+)
+
+
+def cargar_cotizaciones(ruta=RUTA_COTIZACIONES):
+    """
+    Lee una tabla de cotizaciones CSV (líneas de comentario con "#")
+
+    Returns:
+        pd.DataFrame: fecha, moneda (categoría sobre MONEDAS) y valor,
+        ordenada por fecha
+    """
+    tabla = pd.read_csv(ruta, comment="#")
+    tabla["fecha"] = pd.to_datetime(tabla["fecha"]).astype("datetime64[ns]")
+    monedas = pd.Categorical(tabla["moneda"], categories=MONEDAS)
+    if (monedas.codes < 0).any():
+        raise ValueError(f"Moneda desconocida en la tabla de cotizaciones {ruta}")
+    tabla["moneda"] = monedas
+    tabla["valor"] = tabla["valor"].astype("float64")
+    return tabla.sort_values("fecha", kind="stable").reset_index(drop=True)
+
+
+@lru_cache(maxsize=4)
+def _cotizaciones_por_defecto(ruta):
+    return cargar_cotizaciones(ruta)
+
+
+def codigos_moneda(df):
+    """Código (sobre MONEDAS) de cada deuda; pesos si `moneda` falta o está vacía"""
+    if "moneda" not in df.columns:
+        return np.zeros(len(df), dtype="int8")
+    informadas = pd.Categorical(df["moneda"], categories=MONEDAS)
+    codigos = np.where(df["moneda"].isna().to_numpy(), _ARS, informadas.codes)
+    if (codigos < 0).any():
+        raise ValueError("Moneda desconocida")
+    return codigos.astype("int8")
+
+
+# =================================================================
+# BÚSQUEDA AS-OF
+# =================================================================
+
+
+def cotizaciones_a_fechas(monedas, fechas, cotizaciones=None):
+    """
+    Cotización vigente de cada fila: la última de su moneda publicada en o
+    antes de su fecha (merge as-of). Los pesos valen 1 y no se buscan.
+
+    Args:
+        monedas: Códigos sobre MONEDAS, uno por fila
+        fechas: Una fecha por fila
+        cotizaciones: Tabla de `cargar_cotizaciones` (por defecto, la de
+            RUTA_COTIZACIONES, leída una sola vez)
+
+    Returns:
+        np.ndarray: Pesos por unidad; NaN si la fecha es anterior a la
+        primera cotización de la moneda
+    """
+    monedas = np.asarray(monedas, dtype="int8")
+    fechas = np.asarray(pd.to_datetime(np.ravel(fechas)), dtype="datetime64[ns]")
+    valores = np.ones(len(monedas))
+    extranjeras = np.flatnonzero(monedas != _ARS)
+    if not len(extranjeras):
+        return valores
+    if cotizaciones is None:
+        cotizaciones = _cotizaciones_por_defecto(RUTA_COTIZACIONES)
+
+    consulta = pd.DataFrame(
+        {
+            "fecha": fechas[extranjeras],
+            "moneda": pd.Categorical.from_codes(
+                monedas[extranjeras], categories=MONEDAS
+            ),
+            "posicion": extranjeras,
+        }
+    ).sort_values("fecha", kind="stable")
+    unidas = pd.merge_asof(
+        consulta, cotizaciones, on="fecha", by="moneda", direction="backward"
+    )
+    valores[unidas["posicion"].to_numpy()] = unidas["valor"].to_numpy()
+    return valores
+
+
+def cotizaciones_por_moneda(fechas, monedas=None, cotizaciones=None):
+    """
+    Tabla monedas x fechas de cotizaciones, para revaluar muchos
+    instrumentos a muchas fechas: `tabla[codigos][:, j]` es la cotización de
+    cada instrumento a la fecha j
+
+    Args:
+        fechas: Fechas de revaluación
+        monedas: Códigos presentes en la cartera (las demás filas quedan en
+            NaN); por defecto, todas
+
+    Returns:
+        np.ndarray: len(MONEDAS) x len(fechas)
+    """
+    fechas = pd.to_datetime(np.ravel(fechas))
+    presentes = np.arange(len(MONEDAS)) if monedas is None else np.unique(monedas)
+    tabla = np.full((len(MONEDAS), len(fechas)), np.nan)
+    valores = cotizaciones_a_fechas(
+        np.repeat(presentes, len(fechas)),
+        np.tile(fechas.to_numpy(), len(presentes)),
+        cotizaciones,
+    )
+    tabla[presentes] = valores.reshape(len(presentes), len(fechas))
+    return tabla
+
+
+def a_pesos(montos, cotizaciones):
+    """
+    Montos en la unidad de su moneda a pesos
+
+    Un monto nulo no necesita cotización (p. ej. una deuda en UVA antes de
+    emitirse); uno no nulo sin cotización es un error.
+    """
+    with np.errstate(invalid="ignore"):
+        pesos = np.where(montos == 0, 0.0, montos * cotizaciones)
+    if np.isnan(pesos).any():
+        raise ValueError("Falta la cotización de alguna moneda a la fecha pedida")
+    return pesos
+
+
+# =================================================================
+# REVALUACIÓN DE LA CARTERA
+# =================================================================
+
+
+def revaluar_a_fecha(df, fecha_cierre, cotizaciones=None):
+    """
+    Expresa en pesos las deudas de `df` a una fecha de cierre
+
+    El monto original se convierte a la cotización de la emisión (costo
+    histórico) y el saldo pendiente a la del cierre y a la de la emisión;
+    la diferencia entre ambos saldos es la diferencia de cambio acumulada
+    desde la emisión.
+
+    Args:
+        df: Deudas con monto_original, saldo_pendiente_simulado,
+            fecha_emision y opcionalmente moneda
+        fecha_cierre: Fecha de revaluación
+
+    Returns:
+        pd.DataFrame: tipo_cambio_emision, tipo_cambio_cierre,
+        monto_original_ars, saldo_pendiente_ars (al cierre),
+        saldo_pendiente_historico (a la emisión) y diferencia_cambio,
+        alineado con `df`; las deudas emitidas después del cierre tienen
+        saldo al cierre y diferencia de cambio nulos
+    """
+    monedas = codigos_moneda(df)
+    emision = cotizaciones_a_fechas(monedas, df["fecha_emision"], cotizaciones)
+    cierre = cotizaciones_por_moneda([fecha_cierre], monedas, cotizaciones)[monedas, 0]
+    monto = df["monto_original"].astype("float64").fillna(0.0).to_numpy()
+    saldo = df["saldo_pendiente_simulado"].astype("float64").fillna(0.0).to_numpy()
+    # Las deudas emitidas después del cierre no tienen saldo a esa fecha (ni
+    # necesitan su cotización, que puede no existir todavía)
+    emitida = (
+        pd.to_datetime(df["fecha_emision"]) <= pd.Timestamp(fecha_cierre)
+    ).to_numpy()
+    saldo_cierre = np.round(a_pesos(saldo * emitida, cierre), 2)
+    saldo_historico = np.round(a_pesos(saldo, emision), 2)
+    return pd.DataFrame(
+        {
+            "tipo_cambio_emision": emision,
+            "tipo_cambio_cierre": cierre,
+            "monto_original_ars": np.round(a_pesos(monto, emision), 2),
+            "saldo_pendiente_ars": saldo_cierre,
+            "saldo_pendiente_historico": saldo_historico,
+            "diferencia_cambio": np.where(emitida, saldo_cierre - saldo_historico, 0.0),
+        },
+        index=df.index,
+    )